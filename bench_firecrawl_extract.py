@@ -0,0 +1,101 @@
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import httpx
+import uvicorn
+
+os.environ.setdefault("FAKE_FIRECRAWL_LATENCY", "1.0")
+os.environ.setdefault("FAKE_FIRECRAWL_SLOW_LATENCY", "30.0")
+
+import fake_firecrawl  # noqa: E402
+
+
+# Compares /extract (all URLs as one Firecrawl job) with /extract/stream (one
+# job per URL) against the local Firecrawl stand-in. One URL is slow and one
+# fails: /extract/stream returns the healthy URLs as they finish, reports the
+# failure in its line, and cuts the slow URL off at BENCH_URL_TIMEOUT.
+
+URL_COUNT = int(os.environ.get("BENCH_URL_COUNT", "12"))
+URL_TIMEOUT = float(os.environ.get("BENCH_URL_TIMEOUT", "5"))
+UPSTREAM_PORT = fake_firecrawl.PORT
+API_PORT = int(os.environ.get("BENCH_API_PORT", "8900"))
+
+
+def start_upstream() -> None:
+    config = uvicorn.Config(fake_firecrawl.app, host="127.0.0.1", port=UPSTREAM_PORT, log_level="warning")
+    threading.Thread(target=uvicorn.Server(config).run, daemon=True).start()
+
+
+def start_api() -> subprocess.Popen:
+    env = dict(os.environ)
+    env["FIRECRAWL_API_URL"] = f"http://127.0.0.1:{UPSTREAM_PORT}"
+    env.setdefault("FIRECRAWL_API_KEY", "fc-bench")
+    env.setdefault("FIRECRAWL_POLL_INTERVAL", "0.25")
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "src.main:app", "--port", str(API_PORT), "--log-level", "warning"],
+        env=env,
+    )
+
+
+async def wait_for(url: str) -> None:
+    async with httpx.AsyncClient() as client:
+        for _ in range(100):
+            try:
+                await client.get(url)
+                return
+            except httpx.HTTPError:
+                await asyncio.sleep(0.2)
+    raise RuntimeError(f"{url} did not come up")
+
+
+async def run() -> None:
+    base = f"http://127.0.0.1:{API_PORT}"
+    await wait_for(f"{base}/metrics")
+    urls = [f"https://example.com/page-{i}" for i in range(URL_COUNT - 2)]
+    urls += ["https://example.com/slow", "https://example.com/fail"]
+    payload = {"urls": urls, "prompt": "Extract the title", "structure": {"title": "string"}}
+
+    async with httpx.AsyncClient(timeout=None) as client:
+        start = time.monotonic()
+        async with client.stream(
+            "POST", f"{base}/extract/stream", json={**payload, "timeout": URL_TIMEOUT}
+        ) as response:
+            first = None
+            lines = []
+            async for line in response.aiter_lines():
+                if not line:
+                    continue
+                first = first or time.monotonic() - start
+                lines.append(json.loads(line))
+        total = time.monotonic() - start
+        errors = [item for item in lines if item["error"]]
+        print(f"/extract/stream: {len(lines)} results, first after {first:.2f}s, all after {total:.2f}s")
+        for item in errors:
+            print(f"  {item['url']}: {item['error']}")
+
+        start = time.monotonic()
+        single = await client.post(f"{base}/extract", json={**payload, "urls": urls[:-2]})
+        print(f"/extract (one job, healthy URLs only): {single.status_code} after {time.monotonic() - start:.2f}s")
+
+        metrics = (await client.get(f"{base}/metrics")).json()
+        print(json.dumps(metrics["firecrawl"], indent=2))
+        print(json.dumps((await client.get(f"http://127.0.0.1:{UPSTREAM_PORT}/stats")).json()))
+
+
+def main() -> None:
+    start_upstream()
+    api = start_api()
+    try:
+        asyncio.run(run())
+    finally:
+        api.terminate()
+        api.wait()
+
+
+if __name__ == "__main__":
+    main()
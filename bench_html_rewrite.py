@@ -0,0 +1,62 @@
+import os
+import time
+
+from src.utils.pdf_utils import (
+    inline_purged_local_stylesheets,
+    rewrite_html_for_pdf,
+    rewrite_local_css_hrefs_to_file_urls,
+    rewrite_tailwind_play_to_static,
+)
+
+
+RUNS = int(os.environ.get("BENCH_RUNS", "20"))
+SIZES_MB = [float(x) for x in os.environ.get("BENCH_SIZES_MB", "1,5,20").split(",")]
+
+HEAD = (
+    '<html><head><meta charset="utf-8">'
+    '<script src="https://cdn.tailwindcss.com"></script>'
+    '<link rel="stylesheet" href="/assets/tailwind.min.css">'
+    '<link rel="stylesheet" href="https://fonts.example.com/inter.css">'
+    "</head><body class=\"p-10\">"
+)
+ROW = '<div class="flex justify-between border-b py-2"><span class="font-semibold">Metric</span><span class="text-right">42</span></div>\n'
+
+
+def build_html(size_mb: float) -> str:
+    rows = int(size_mb * 1024 * 1024 / len(ROW))
+    return HEAD + ROW * rows + "</body></html>"
+
+
+def multi_pass(html: str) -> str:
+    html = rewrite_tailwind_play_to_static(html)
+    html = inline_purged_local_stylesheets(html)
+    return rewrite_local_css_hrefs_to_file_urls(html)
+
+
+def single_pass(html: str) -> str:
+    return rewrite_html_for_pdf(html)
+
+
+def bench(fn, html: str) -> float:
+    fn(html)  # warm purge cache
+    start = time.perf_counter()
+    for _ in range(RUNS):
+        fn(html)
+    return (time.perf_counter() - start) / RUNS * 1000
+
+
+def main():
+    print("=== HTML ASSET REWRITE BENCHMARK ===")
+    for size in SIZES_MB:
+        html = build_html(size)
+        assert multi_pass(html) == single_pass(html)
+        multi_ms = bench(multi_pass, html)
+        single_ms = bench(single_pass, html)
+        print(
+            f"{size:>5.1f} MB: multi-pass {multi_ms:8.2f} ms, single-pass {single_ms:8.2f} ms "
+            f"({multi_ms / single_ms:.2f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+import asyncio
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import httpx
+import uvicorn
+from fastapi import FastAPI
+
+
+# Load test for the async LLM request path: a fake OpenAI upstream answers
+# every chat completion after UPSTREAM_LATENCY seconds, and CONCURRENCY
+# /generate requests are fired at once. With sync handlers the process tops
+# out at AnyIO's 40 threadpool slots; with async handlers it is bounded only
+# by LLM_MAX_CONCURRENCY.
+
+CONCURRENCY = int(os.environ.get("BENCH_CONCURRENCY", "200"))
+UPSTREAM_LATENCY = float(os.environ.get("BENCH_UPSTREAM_LATENCY", "5.0"))
+UPSTREAM_PORT = int(os.environ.get("BENCH_UPSTREAM_PORT", "8901"))
+API_PORT = int(os.environ.get("BENCH_API_PORT", "8900"))
+
+upstream = FastAPI()
+
+
+@upstream.post("/v1/chat/completions")
+async def fake_chat_completion(body: dict):
+    await asyncio.sleep(UPSTREAM_LATENCY)
+    return {
+        "id": "chatcmpl-bench",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "gpt-4o-mini"),
+        "choices": [
+            {
+                "index": 0,
+                "message": {"role": "assistant", "content": '{"answer": "ok"}'},
+                "finish_reason": "stop",
+            }
+        ],
+        "usage": {"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15},
+    }
+
+
+def start_upstream() -> None:
+    config = uvicorn.Config(upstream, host="127.0.0.1", port=UPSTREAM_PORT, log_level="warning")
+    threading.Thread(target=uvicorn.Server(config).run, daemon=True).start()
+
+
+def start_api() -> subprocess.Popen:
+    env = dict(os.environ)
+    env.setdefault("OPENAI_API_KEY", "sk-bench")
+    env.setdefault("OPENAI_MAX_CONNECTIONS", str(CONCURRENCY))
+    env["OPENAI_BASE_URL"] = f"http://127.0.0.1:{UPSTREAM_PORT}/v1"
+    env["OPENAI_API_BASE"] = env["OPENAI_BASE_URL"]
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "src.main:app", "--port", str(API_PORT), "--log-level", "warning"],
+        env=env,
+    )
+
+
+async def wait_for(url: str) -> None:
+    async with httpx.AsyncClient() as client:
+        for _ in range(100):
+            try:
+                await client.get(url)
+                return
+            except httpx.HTTPError:
+                await asyncio.sleep(0.2)
+    raise RuntimeError(f"{url} did not come up")
+
+
+async def run_load() -> None:
+    base = f"http://127.0.0.1:{API_PORT}"
+    await wait_for(f"{base}/metrics")
+    # Distinct prompts so single-flight coalescing does not collapse the load
+    payloads = [
+        {"user_prompt": f"Say ok #{i}", "structure": {"answer": "string"}, "model": "gpt-4o-mini"}
+        for i in range(CONCURRENCY)
+    ]
+    limits = httpx.Limits(max_connections=CONCURRENCY)
+    async with httpx.AsyncClient(base_url=base, limits=limits, timeout=120) as client:
+        start = time.perf_counter()
+        responses = await asyncio.gather(*(client.post("/generate", json=payload) for payload in payloads))
+        elapsed = time.perf_counter() - start
+        metrics = (await client.get("/metrics")).json()
+
+    ok = sum(1 for r in responses if r.status_code == 200)
+    print("=== LLM CONCURRENCY LOAD TEST ===")
+    print(f"requests: {CONCURRENCY}, ok: {ok}, upstream latency: {UPSTREAM_LATENCY}s")
+    print(f"elapsed: {elapsed:.2f}s")
+    print(f"effective concurrency: {CONCURRENCY * UPSTREAM_LATENCY / elapsed:.1f} (threadpool ceiling was 40)")
+    print(f"40-thread lower bound for the same load: {-(-CONCURRENCY // 40) * UPSTREAM_LATENCY:.1f}s")
+    print(f"llm limiter: {metrics.get('concurrency', {}).get('llm')}")
+    print(f"scheduler: {metrics.get('llm_clients', {}).get('scheduler')}")
+
+
+def main():
+    start_upstream()
+    api = start_api()
+    try:
+        asyncio.run(run_load())
+    finally:
+        api.terminate()
+        api.wait()
+
+
+if __name__ == "__main__":
+    main()
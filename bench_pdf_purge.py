@@ -0,0 +1,72 @@
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+
+RUNS = int(os.environ.get("BENCH_RUNS", "5"))
+
+SAMPLE_HTML = """<html><head><meta charset="utf-8"><title>Invoice</title>
+<link rel="stylesheet" href="/assets/tailwind.min.css"></head>
+<body class="p-10 text-gray-800">
+  <h1 class="text-3xl font-bold mb-4">Invoice #1042</h1>
+  <table class="w-full text-sm border">
+    <thead class="bg-gray-100"><tr><th class="p-2 text-left">Item</th><th class="p-2 text-right">Amount</th></tr></thead>
+    <tbody>
+      %s
+    </tbody>
+  </table>
+  <p class="mt-6 text-right font-semibold">Total: $1,234.00</p>
+</body></html>
+""" % "\n".join(
+    f'<tr class="border-t"><td class="p-2">Line item {i}</td><td class="p-2 text-right">$10.00</td></tr>'
+    for i in range(200)
+)
+
+
+def run_mode(purge: bool) -> dict:
+    """Render SAMPLE_HTML RUNS times in this process and report timings.
+
+    Peak RSS of wkhtmltopdf is read from RUSAGE_CHILDREN, so each mode must
+    run in its own process.
+    """
+    from src.service.pdf_service import render_html_to_pdf_bytes
+
+    timings = []
+    size = 0
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        pdf = render_html_to_pdf_bytes(SAMPLE_HTML, javascript_delay_ms=0, purge_css=purge)
+        timings.append(time.perf_counter() - start)
+        size = len(pdf)
+    return {
+        "purge_css": purge,
+        "runs": RUNS,
+        "avg_ms": round(sum(timings) / len(timings) * 1000, 1),
+        "min_ms": round(min(timings) * 1000, 1),
+        "pdf_bytes": size,
+        "wkhtmltopdf_peak_rss_kb": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+    }
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] in ("purge", "full"):
+        print(json.dumps(run_mode(sys.argv[1] == "purge")))
+        return
+
+    print("=== PDF RENDER BENCHMARK: CSS PURGING ===")
+    for mode in ("full", "purge"):
+        out = subprocess.run(
+            [sys.executable, __file__, mode], capture_output=True, text=True, check=True
+        )
+        result = json.loads(out.stdout.strip().splitlines()[-1])
+        print(
+            f"{mode:>5}: avg {result['avg_ms']} ms, min {result['min_ms']} ms, "
+            f"peak RSS {result['wkhtmltopdf_peak_rss_kb']} KB, pdf {result['pdf_bytes']} bytes"
+        )
+
+
+if __name__ == "__main__":
+    main()
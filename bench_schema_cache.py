@@ -0,0 +1,55 @@
+import os
+import time
+
+from src.utils import schema_builder
+from src.utils.schema_builder import build_pydantic_model, get_model_cache_info
+
+
+RUNS = int(os.environ.get("BENCH_RUNS", "200"))
+
+EXAMPLE_STRUCTURE = {
+    "invoice_number": "INV-1042",
+    "issued": "2025-01-01",
+    "total": 1234.5,
+    "paid": False,
+    "customer": {"name": "Luka", "email": "luka@example.com", "address": {"street": "Main", "city": "Zagreb"}},
+    "items": [{"description": "Consulting", "quantity": 3, "unit_price": 100.0, "tags": ["a"]}],
+}
+
+JSON_SCHEMA_STRUCTURE = {
+    "type": "object",
+    "required": ["summary", "entities"],
+    "properties": {
+        "summary": {"type": "string"},
+        "entities": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {"name": {"type": "string"}, "score": {"type": "number"}},
+            },
+        },
+        "meta": {"type": "object", "properties": {"source": {"type": "string"}, "pages": {"type": "integer"}}},
+    },
+}
+
+
+def bench(structure, uncached: bool) -> float:
+    build = schema_builder._build_pydantic_model_uncached if uncached else build_pydantic_model
+    build(structure)
+    start = time.perf_counter()
+    for _ in range(RUNS):
+        build(structure)
+    return (time.perf_counter() - start) / RUNS * 1000
+
+
+def main():
+    print("=== DYNAMIC MODEL BUILD BENCHMARK ===")
+    for label, structure in (("example dict", EXAMPLE_STRUCTURE), ("json schema", JSON_SCHEMA_STRUCTURE)):
+        before = bench(structure, uncached=True)
+        after = bench(structure, uncached=False)
+        print(f"{label:>12}: uncached {before:.3f} ms/build, cached {after:.4f} ms/build ({before / after:.0f}x)")
+    print("cache:", get_model_cache_info())
+
+
+if __name__ == "__main__":
+    main()
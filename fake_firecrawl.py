@@ -0,0 +1,129 @@
+import asyncio
+import base64
+import os
+import struct
+import time
+import uuid
+import zlib
+
+import uvicorn
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import Response
+
+
+# Local stand-in for the Firecrawl API, for running /extract, /extract/stream
+# and /screenshot offline:
+#
+#   python fake_firecrawl.py            # listens on FAKE_FIRECRAWL_PORT (8902)
+#   FIRECRAWL_API_URL=http://127.0.0.1:8902 FIRECRAWL_API_KEY=fc-fake \
+#   FIRECRAWL_SCREENSHOT_API=fc-fake uvicorn src.main:app
+#
+# Extract jobs complete after FAKE_FIRECRAWL_LATENCY seconds. URLs containing
+# "slow" take FAKE_FIRECRAWL_SLOW_LATENCY, URL patterns ending in "/*" take
+# three times the base latency, and URLs containing "fail" end as failed jobs.
+# Extracted data is the schema filled with placeholder values. Scrapes return
+# a hosted screenshot URL, or an inline base64 data URL with
+# FAKE_FIRECRAWL_INLINE_SCREENSHOTS=1.
+
+LATENCY = float(os.environ.get("FAKE_FIRECRAWL_LATENCY", "2.0"))
+SLOW_LATENCY = float(os.environ.get("FAKE_FIRECRAWL_SLOW_LATENCY", "30.0"))
+SCRAPE_LATENCY = float(os.environ.get("FAKE_FIRECRAWL_SCRAPE_LATENCY", "1.0"))
+INLINE_SCREENSHOTS = os.environ.get("FAKE_FIRECRAWL_INLINE_SCREENSHOTS", "0") == "1"
+PORT = int(os.environ.get("FAKE_FIRECRAWL_PORT", "8902"))
+
+app = FastAPI()
+jobs = {}
+stats = {"extract_jobs": 0, "status_polls": 0, "scrapes": 0}
+
+
+def _latency(urls) -> float:
+    latency = LATENCY
+    for url in urls:
+        if "slow" in url:
+            latency = max(latency, SLOW_LATENCY)
+        elif url.endswith("/*"):
+            latency = max(latency, LATENCY * 3)
+    return latency
+
+
+def _sample(schema: dict, url: str):
+    kind = schema.get("type")
+    if kind == "object" or "properties" in schema:
+        return {name: _sample(prop, url) for name, prop in schema.get("properties", {}).items()}
+    if kind == "array":
+        return [_sample(schema.get("items", {}), url)]
+    if kind in ("integer", "number"):
+        return 1
+    if kind == "boolean":
+        return True
+    return f"value from {url}"
+
+
+def _png(width: int, height: int) -> bytes:
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF)
+
+    row = b"\x00" + b"\x4f\x46\xe5" * width
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+        + chunk(b"IDAT", zlib.compress(row * height))
+        + chunk(b"IEND", b"")
+    )
+
+
+@app.post("/v1/extract")
+async def start_extract(body: dict):
+    urls = body.get("urls") or []
+    job_id = str(uuid.uuid4())
+    stats["extract_jobs"] += 1
+    jobs[job_id] = {"urls": urls, "schema": body.get("schema") or {}, "done_at": time.monotonic() + _latency(urls)}
+    return {"success": True, "id": job_id}
+
+
+@app.get("/v1/extract/{job_id}")
+async def extract_status(job_id: str):
+    stats["status_polls"] += 1
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if time.monotonic() < job["done_at"]:
+        return {"success": True, "status": "processing"}
+    if any("fail" in url for url in job["urls"]):
+        return {"success": True, "status": "failed", "error": "Could not scrape the page"}
+    urls = job["urls"]
+    return {"success": True, "status": "completed", "data": _sample(job["schema"], ", ".join(urls)), "sources": urls}
+
+
+@app.post("/v2/scrape")
+async def scrape(body: dict, request: Request):
+    stats["scrapes"] += 1
+    await asyncio.sleep(SCRAPE_LATENCY)
+    url = body.get("url", "")
+    if "fail" in url:
+        return {"success": False, "error": "Could not scrape the page"}
+    if INLINE_SCREENSHOTS:
+        screenshot = "data:image/png;base64," + base64.b64encode(_png(1280, 2400)).decode("ascii")
+    else:
+        screenshot = f"{str(request.base_url).rstrip('/')}/screenshots/{uuid.uuid4().hex}.png"
+    return {
+        "success": True,
+        "data": {
+            "screenshot": screenshot,
+            "metadata": {"sourceURL": url, "statusCode": 200},
+        },
+    }
+
+
+@app.get("/screenshots/{name}")
+async def screenshot_file(name: str):
+    return Response(content=_png(1280, 2400), media_type="image/png")
+
+
+@app.get("/stats")
+async def get_stats():
+    return stats
+
+
+if __name__ == "__main__":
+    uvicorn.run(app, host="127.0.0.1", port=PORT, log_level="warning")
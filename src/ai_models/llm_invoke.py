@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+from typing import Any, Callable
+
+from ..utils.concurrency import get_limiter
+from ..utils.hedging import get_hedge_policy
+from ..utils.single_flight import flight_key, get_single_flight
+from .prompt_cache_stats import usage_config
+
+
+async def ainvoke_llm(
+    runnable_for: Callable[[str], Any], messages: list, model_name: str, temperature: float, tag: str, endpoint: str
+) -> Any:
+    """ainvoke `runnable_for(model_name)` under the "llm" limiter.
+
+    Concurrent callers with the same model, temperature, tag and messages
+    share one upstream call, and a slow call may be hedged (see
+    utils.hedging), possibly on a fallback model. Token usage is recorded
+    under `endpoint` (see ai_models.prompt_cache_stats).
+    """
+
+    async def _call(model: str) -> Any:
+        async with get_limiter("llm"):
+            return await runnable_for(model).ainvoke(messages, config=usage_config(endpoint))
+
+    async def _hedged() -> Any:
+        return await get_hedge_policy().run(model_name, _call)
+
+    return await get_single_flight("llm").ado(flight_key(model_name, temperature, tag, messages), _hedged)
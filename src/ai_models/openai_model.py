@@ -1,13 +1,211 @@
 
-from langchain_openai import ChatOpenAI
+import importlib.util
+import os
+import threading
+from dataclasses import dataclass
+from typing import Any, Optional, Type
+
+import httpx
+from langchain_core.runnables import Runnable
+from langchain_openai import ChatOpenAI, OpenAIEmbeddings
+from pydantic import BaseModel
 from dotenv import load_dotenv
 
+from ..utils.memory_lru import MemoryLRUCache
+from .upstream_scheduler import ScheduledAsyncTransport, ScheduledTransport, UpstreamScheduler
+
 load_dotenv()
 
+
+@dataclass(frozen=True)
+class ClientPoolConfig:
+    """Connection pool settings for the process-wide OpenAI HTTP clients."""
+
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 60.0
+    connect_timeout: float = 10.0
+    request_timeout: float = 120.0
+    http2: bool = True
+    model_cache_size: int = 64
+    runnable_cache_size: int = 256
+
+    @classmethod
+    def from_env(cls) -> "ClientPoolConfig":
+        return cls(
+            max_connections=int(os.environ.get("OPENAI_MAX_CONNECTIONS", cls.max_connections)),
+            max_keepalive_connections=int(os.environ.get("OPENAI_MAX_KEEPALIVE", cls.max_keepalive_connections)),
+            keepalive_expiry=float(os.environ.get("OPENAI_KEEPALIVE_EXPIRY", cls.keepalive_expiry)),
+            connect_timeout=float(os.environ.get("OPENAI_CONNECT_TIMEOUT", cls.connect_timeout)),
+            request_timeout=float(os.environ.get("OPENAI_TIMEOUT", cls.request_timeout)),
+            http2=os.environ.get("OPENAI_HTTP2", "1") not in ("0", "false", "False"),
+            model_cache_size=int(os.environ.get("OPENAI_MODEL_CACHE_SIZE", cls.model_cache_size)),
+            runnable_cache_size=int(os.environ.get("STRUCTURED_RUNNABLE_CACHE_SIZE", cls.runnable_cache_size)),
+        )
+
+
+class LLMClientRegistry:
+    """Process-wide registry of OpenAI clients.
+
+    Owns one pooled keep-alive httpx client (plus its async twin) and hands
+    out lightweight per-model wrappers that all share it:
+      - ChatOpenAI per (model, temperature)
+      - with_structured_output runnables per (model, temperature, structure hash, method)
+      - OpenAIEmbeddings per model
+    Requests are paced and retried by an UpstreamScheduler (per-model RPM/TPM
+    budgets, priorities, jittered backoff on 429/5xx). HTTP/2 is used when the optional `h2` package is installed.
+    """
+
+    def __init__(self, config: Optional[ClientPoolConfig] = None) -> None:
+        self.config = config or ClientPoolConfig.from_env()
+        http2 = self.config.http2 and importlib.util.find_spec("h2") is not None
+        limits = httpx.Limits(
+            max_connections=self.config.max_connections,
+            max_keepalive_connections=self.config.max_keepalive_connections,
+            keepalive_expiry=self.config.keepalive_expiry,
+        )
+        timeout = httpx.Timeout(self.config.request_timeout, connect=self.config.connect_timeout)
+        self.http2 = http2
+        # Every OpenAI request goes through the scheduler transports, which own
+        # pacing and retries; the SDK's own retries are disabled below
+        self.scheduler = UpstreamScheduler()
+        self.http_client = httpx.Client(
+            timeout=timeout,
+            transport=ScheduledTransport(httpx.HTTPTransport(limits=limits, http2=http2), self.scheduler),
+        )
+        self.async_http_client = httpx.AsyncClient(
+            timeout=timeout,
+            transport=ScheduledAsyncTransport(httpx.AsyncHTTPTransport(limits=limits, http2=http2), self.scheduler),
+        )
+        self._chat_models: MemoryLRUCache[ChatOpenAI] = MemoryLRUCache(self.config.model_cache_size)
+        self._structured: MemoryLRUCache[Runnable] = MemoryLRUCache(self.config.runnable_cache_size)
+        self._embeddings: MemoryLRUCache[OpenAIEmbeddings] = MemoryLRUCache(self.config.model_cache_size)
+
+    def chat_model(self, model_name: str, temperature: float = 0.0) -> ChatOpenAI:
+        key = (model_name, temperature)
+        cached = self._chat_models.get(key)
+        if cached is not None:
+            return cached
+        model = ChatOpenAI(
+            model=model_name,
+            temperature=temperature,
+            max_retries=0,
+            # Usage (including cached prompt tokens) is also reported on streamed responses
+            stream_usage=True,
+            http_client=self.http_client,
+            http_async_client=self.async_http_client,
+        )
+        return self._chat_models.put(key, model)
+
+    def structured_model(
+        self, model_name: str, temperature: float, output_model: Type[BaseModel], structure_key: str
+    ) -> Runnable:
+        key: Any = (model_name, temperature, structure_key, "json_schema")
+        cached = self._structured.get(key)
+        if cached is not None:
+            return cached
+        runnable = self.chat_model(model_name, temperature).with_structured_output(output_model, method="json_schema")
+        return self._structured.put(key, runnable)
+
+    def streaming_structured_model(
+        self, model_name: str, temperature: float, output_model: Type[BaseModel], structure_key: str
+    ) -> Runnable:
+        # Same response_format as structured_model, but parsed with JsonOutputParser
+        # (by passing the JSON Schema dict) so astream yields partial objects
+        key: Any = (model_name, temperature, structure_key, "json_schema_stream")
+        cached = self._structured.get(key)
+        if cached is not None:
+            return cached
+        runnable = self.chat_model(model_name, temperature).with_structured_output(
+            output_model.model_json_schema(), method="json_schema"
+        )
+        return self._structured.put(key, runnable)
+
+    def embeddings(self, model_name: str = "text-embedding-3-small") -> OpenAIEmbeddings:
+        cached = self._embeddings.get(model_name)
+        if cached is not None:
+            return cached
+        embedder = OpenAIEmbeddings(
+            model=model_name,
+            api_key=os.environ.get("OPENAI_API_KEY"),
+            max_retries=0,
+            http_client=self.http_client,
+            http_async_client=self.async_http_client,
+        )
+        return self._embeddings.put(model_name, embedder)
+
+    def stats(self) -> dict:
+        return {
+            "http2": self.http2,
+            "max_connections": self.config.max_connections,
+            "chat_models": self._chat_models.stats(),
+            "structured_runnables": self._structured.stats(),
+            "embeddings": self._embeddings.stats(),
+            "scheduler": self.scheduler.stats(),
+        }
+
+    async def aclose(self) -> None:
+        self._chat_models.clear()
+        self._structured.clear()
+        self._embeddings.clear()
+        self.http_client.close()
+        await self.async_http_client.aclose()
+
+
+_registry: Optional[LLMClientRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_client_registry() -> LLMClientRegistry:
+    """Return the process registry, creating it on first use.
+
+    The app lifespan creates it at startup and closes it on shutdown; lazy
+    creation keeps scripts and one-off imports working without the app.
+    """
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = LLMClientRegistry()
+    return _registry
+
+
+async def shutdown_client_registry() -> None:
+    global _registry
+    with _registry_lock:
+        registry, _registry = _registry, None
+    if registry is not None:
+        await registry.aclose()
+
+
 def get_openai_chat_model(model_name: str, temperature: float = 0.0) -> ChatOpenAI:
-    """Factory to create a ChatOpenAI client.
+    """Return the shared ChatOpenAI wrapper for this model and temperature.
 
     Relies on `OPENAI_API_KEY` env var unless `api_key` is explicit.
     """
-    return ChatOpenAI(model=model_name, temperature=temperature)
+    return get_client_registry().chat_model(model_name, temperature)
+
+
+def get_structured_chat_model(
+    model_name: str, temperature: float, output_model: Type[BaseModel], structure_key: str
+) -> Runnable:
+    """Return a ready-to-invoke `with_structured_output(output_model)` runnable.
+
+    Runnables are cached per (model_name, temperature, structure_key, method)
+    in a bounded LRU (STRUCTURED_RUNNABLE_CACHE_SIZE, default 256), so the
+    schema is converted to an OpenAI JSON schema once. `structure_key` is the
+    schema_builder.structure_hash of the structure `output_model` was built
+    from, so equal structures share an entry without relying on class identity.
+    """
+    return get_client_registry().structured_model(model_name, temperature, output_model, structure_key)
+
+
+def get_streaming_structured_chat_model(
+    model_name: str, temperature: float, output_model: Type[BaseModel], structure_key: str
+) -> Runnable:
+    """Return a structured-output runnable whose astream yields partial dicts."""
+    return get_client_registry().streaming_structured_model(model_name, temperature, output_model, structure_key)
+
 
+def get_openai_embeddings(model_name: str = "text-embedding-3-small") -> OpenAIEmbeddings:
+    return get_client_registry().embeddings(model_name)
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import threading
+from typing import Any, Dict, Optional
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+
+
+class PromptCacheStats:
+    """Per-endpoint input and cached-input token totals.
+
+    OpenAI caches prompt prefixes of 1024+ tokens automatically and reports
+    the reused part as `cached_tokens`; LangChain surfaces it as
+    usage_metadata.input_token_details.cache_read.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._endpoints: Dict[str, Dict[str, int]] = {}
+
+    def record(self, endpoint: str, usage: Optional[Dict[str, Any]]) -> None:
+        if not usage:
+            return
+        details = usage.get("input_token_details") or {}
+        with self._lock:
+            totals = self._endpoints.get(endpoint)
+            if totals is None:
+                totals = self._endpoints[endpoint] = {"calls": 0, "input_tokens": 0, "cached_tokens": 0, "output_tokens": 0}
+            totals["calls"] += 1
+            totals["input_tokens"] += usage.get("input_tokens", 0) or 0
+            totals["cached_tokens"] += details.get("cache_read", 0) or 0
+            totals["output_tokens"] += usage.get("output_tokens", 0) or 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                endpoint: {
+                    **totals,
+                    "cached_ratio": round(totals["cached_tokens"] / totals["input_tokens"], 4) if totals["input_tokens"] else 0.0,
+                }
+                for endpoint, totals in self._endpoints.items()
+            }
+
+
+_stats = PromptCacheStats()
+
+
+class UsageRecorder(BaseCallbackHandler):
+    """Callback that books each chat completion's token usage under `endpoint`."""
+
+    def __init__(self, endpoint: str) -> None:
+        self.endpoint = endpoint
+
+    def on_llm_end(self, response: LLMResult, **kwargs: Any) -> None:
+        for generations in response.generations:
+            for generation in generations:
+                message = getattr(generation, "message", None)
+                _stats.record(self.endpoint, getattr(message, "usage_metadata", None))
+
+
+_recorders: Dict[str, UsageRecorder] = {}
+
+
+def usage_config(endpoint: str) -> Dict[str, Any]:
+    """RunnableConfig that records token usage for `endpoint`."""
+    recorder = _recorders.get(endpoint)
+    if recorder is None:
+        recorder = _recorders.setdefault(endpoint, UsageRecorder(endpoint))
+    return {"callbacks": [recorder]}
+
+
+def get_prompt_cache_stats() -> Dict[str, Any]:
+    return _stats.stats()
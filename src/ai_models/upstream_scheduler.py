@@ -0,0 +1,342 @@
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import json
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+import httpx
+
+
+# Lower runs first. Interactive requests use the default; batch fan-outs
+# lower their own priority so they queue behind user-facing calls.
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BATCH = 10
+
+_priority: contextvars.ContextVar[int] = contextvars.ContextVar("upstream_priority", default=PRIORITY_INTERACTIVE)
+
+
+@contextmanager
+def upstream_priority(priority: int) -> Iterator[None]:
+    """Run the OpenAI calls made inside this block at the given priority."""
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def retry_after_seconds(response: httpx.Response) -> Optional[float]:
+    """Seconds the server asked to wait (retry-after-ms or retry-after), if any."""
+    value = response.headers.get("retry-after-ms")
+    if value:
+        try:
+            return float(value) / 1000
+        except ValueError:
+            pass
+    value = response.headers.get("retry-after")
+    if value:
+        try:
+            return float(value)
+        except ValueError:
+            pass
+    return None
+
+
+class _ModelBudget:
+    """Requests-per-minute and tokens-per-minute token buckets for one model.
+
+    Limits are unknown (unbounded) until configured through OPENAI_RPM_LIMIT /
+    OPENAI_TPM_LIMIT or learned from x-ratelimit-* response headers; the
+    remaining counts in each response resynchronise the buckets.
+    """
+
+    def __init__(self, rpm: Optional[float], tpm: Optional[float]) -> None:
+        self.rpm = rpm
+        self.tpm = tpm
+        self.requests = rpm if rpm else 0.0
+        self.tokens = tpm if tpm else 0.0
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self.updated
+        self.updated = now
+        if self.rpm:
+            self.requests = min(self.rpm, self.requests + elapsed * self.rpm / 60)
+        if self.tpm:
+            self.tokens = min(self.tpm, self.tokens + elapsed * self.tpm / 60)
+
+    def wait_time(self, tokens: int, now: float) -> float:
+        self._refill(now)
+        wait = 0.0
+        if self.rpm and self.requests < 1:
+            wait = max(wait, (1 - self.requests) * 60 / self.rpm)
+        if self.tpm:
+            # A request larger than the whole bucket waits for a full bucket only
+            needed = min(tokens, self.tpm)
+            if self.tokens < needed:
+                wait = max(wait, (needed - self.tokens) * 60 / self.tpm)
+        return wait
+
+    def take(self, tokens: int) -> None:
+        if self.rpm:
+            self.requests -= 1
+        if self.tpm:
+            self.tokens -= min(tokens, self.tpm)
+
+    def observe(self, headers: httpx.Headers, now: float) -> None:
+        self._refill(now)
+        for kind in ("requests", "tokens"):
+            limit = headers.get(f"x-ratelimit-limit-{kind}")
+            remaining = headers.get(f"x-ratelimit-remaining-{kind}")
+            if not limit or not remaining:
+                continue
+            try:
+                limit_value, remaining_value = float(limit), float(remaining)
+            except ValueError:
+                continue
+            if kind == "requests":
+                self.rpm, self.requests = limit_value, remaining_value
+            else:
+                self.tpm, self.tokens = limit_value, remaining_value
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "rpm_limit": self.rpm,
+            "tpm_limit": self.tpm,
+            "requests_available": round(self.requests, 2) if self.rpm else None,
+            "tokens_available": round(self.tokens) if self.tpm else None,
+        }
+
+
+class UpstreamScheduler:
+    """Paces OpenAI requests against per-model RPM/TPM budgets.
+
+    Async callers wait in a priority queue (lower priority value first, FIFO
+    within a priority); a request only waits behind earlier requests for the
+    same model. Sync callers (worker threads) share the same budgets and poll.
+    Retries on 429/5xx and connection errors use full-jitter exponential
+    backoff, or the server's retry-after when it sends one.
+    """
+
+    def __init__(self) -> None:
+        self.max_retries = int(os.environ.get("OPENAI_SCHEDULER_MAX_RETRIES", "4"))
+        self.backoff_base = float(os.environ.get("OPENAI_BACKOFF_BASE", "0.5"))
+        self.backoff_max = float(os.environ.get("OPENAI_BACKOFF_MAX", "20"))
+        self._default_rpm = float(os.environ["OPENAI_RPM_LIMIT"]) if os.environ.get("OPENAI_RPM_LIMIT") else None
+        self._default_tpm = float(os.environ["OPENAI_TPM_LIMIT"]) if os.environ.get("OPENAI_TPM_LIMIT") else None
+        self._lock = threading.Lock()
+        self._budgets: Dict[str, _ModelBudget] = {}
+        self._queue: List[tuple] = []
+        self._seq = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self.requests = 0
+        self.queued = 0
+        self.peak_queue_depth = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.retries = 0
+        self.rate_limited = 0
+        self.server_errors = 0
+
+    def _budget(self, model: str) -> _ModelBudget:
+        budget = self._budgets.get(model)
+        if budget is None:
+            budget = self._budgets[model] = _ModelBudget(self._default_rpm, self._default_tpm)
+        return budget
+
+    def _record_wait(self, waited: float) -> None:
+        with self._lock:
+            self.requests += 1
+            self.total_wait_seconds += waited
+            self.max_wait_seconds = max(self.max_wait_seconds, waited)
+
+    async def acquire(self, model: str, tokens: int) -> None:
+        start = time.monotonic()
+        with self._lock:
+            budget = self._budget(model)
+            if not any(entry[2] == model for entry in self._queue) and budget.wait_time(tokens, start) == 0:
+                budget.take(tokens)
+                future = None
+            else:
+                future = asyncio.get_running_loop().create_future()
+                self._seq += 1
+                self._queue.append((_priority.get(), self._seq, model, tokens, future))
+                self.queued += 1
+                self.peak_queue_depth = max(self.peak_queue_depth, len(self._queue))
+        if future is not None:
+            self._dispatch()
+            try:
+                await future
+            except asyncio.CancelledError:
+                with self._lock:
+                    self._queue = [entry for entry in self._queue if entry[4] is not future]
+                raise
+        self._record_wait(time.monotonic() - start)
+
+    def _dispatch(self) -> None:
+        loop = asyncio.get_running_loop()
+        now = time.monotonic()
+        next_wait: Optional[float] = None
+        with self._lock:
+            self._queue.sort(key=lambda entry: (entry[0], entry[1]))
+            blocked: set = set()
+            for entry in list(self._queue):
+                _, _, model, tokens, future = entry
+                if model in blocked:
+                    continue
+                if future.done():
+                    self._queue.remove(entry)
+                    continue
+                wait = self._budget(model).wait_time(tokens, now)
+                if wait == 0:
+                    self._budget(model).take(tokens)
+                    self._queue.remove(entry)
+                    future.set_result(None)
+                else:
+                    blocked.add(model)
+                    next_wait = wait if next_wait is None else min(next_wait, wait)
+        if next_wait is None:
+            return
+        if self._timer is not None and self._timer.when() <= loop.time() + next_wait:
+            return
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = loop.call_at(loop.time() + next_wait, self._on_timer)
+
+    def _on_timer(self) -> None:
+        self._timer = None
+        self._dispatch()
+
+    def wake(self) -> None:
+        """Re-check queued requests, e.g. after response headers refreshed a budget."""
+        if self._queue:
+            self._dispatch()
+
+    def acquire_sync(self, model: str, tokens: int) -> None:
+        start = time.monotonic()
+        while True:
+            with self._lock:
+                wait = self._budget(model).wait_time(tokens, time.monotonic())
+                if wait == 0:
+                    self._budget(model).take(tokens)
+                    break
+            time.sleep(wait)
+        self._record_wait(time.monotonic() - start)
+
+    def observe(self, model: str, response: httpx.Response) -> bool:
+        """Update budgets from a response; True when it should be retried."""
+        with self._lock:
+            self._budget(model).observe(response.headers, time.monotonic())
+            if response.status_code == 429:
+                self.rate_limited += 1
+                return True
+            if response.status_code >= 500:
+                self.server_errors += 1
+                return True
+        return False
+
+    def backoff(self, attempt: int, response: Optional[httpx.Response]) -> float:
+        with self._lock:
+            self.retries += 1
+        hinted = retry_after_seconds(response) if response is not None else None
+        if hinted is not None:
+            return min(hinted, self.backoff_max)
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "queue_depth": len(self._queue),
+                "peak_queue_depth": self.peak_queue_depth,
+                "requests": self.requests,
+                "queued": self.queued,
+                "avg_wait_seconds": round(self.total_wait_seconds / self.requests, 4) if self.requests else 0.0,
+                "max_wait_seconds": round(self.max_wait_seconds, 4),
+                "retries": self.retries,
+                "rate_limited": self.rate_limited,
+                "server_errors": self.server_errors,
+                "models": {model: budget.snapshot() for model, budget in self._budgets.items()},
+            }
+
+
+def _request_cost(request: httpx.Request) -> tuple:
+    """(model, estimated tokens) for an OpenAI JSON request.
+
+    Prompt tokens are approximated as body bytes / 4, plus the completion
+    budget when the request sets one, which is how OpenAI counts TPM.
+    """
+    try:
+        body = json.loads(request.content or b"{}")
+    except ValueError:
+        return "unknown", 0
+    if not isinstance(body, dict):
+        return "unknown", 0
+    completion = body.get("max_completion_tokens") or body.get("max_tokens") or 0
+    return str(body.get("model", "unknown")), len(request.content) // 4 + int(completion)
+
+
+_RETRYABLE_ERRORS = (httpx.ConnectError, httpx.RemoteProtocolError)
+
+
+class ScheduledAsyncTransport(httpx.AsyncBaseTransport):
+    def __init__(self, inner: httpx.AsyncBaseTransport, scheduler: UpstreamScheduler) -> None:
+        self._inner = inner
+        self._scheduler = scheduler
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        model, tokens = _request_cost(request)
+        attempt = 0
+        while True:
+            await self._scheduler.acquire(model, tokens)
+            try:
+                response = await self._inner.handle_async_request(request)
+            except _RETRYABLE_ERRORS:
+                if attempt >= self._scheduler.max_retries:
+                    raise
+                await asyncio.sleep(self._scheduler.backoff(attempt, None))
+                attempt += 1
+                continue
+            retry = self._scheduler.observe(model, response)
+            self._scheduler.wake()
+            if not retry or attempt >= self._scheduler.max_retries:
+                return response
+            await response.aclose()
+            await asyncio.sleep(self._scheduler.backoff(attempt, response))
+            attempt += 1
+
+    async def aclose(self) -> None:
+        await self._inner.aclose()
+
+
+class ScheduledTransport(httpx.BaseTransport):
+    def __init__(self, inner: httpx.BaseTransport, scheduler: UpstreamScheduler) -> None:
+        self._inner = inner
+        self._scheduler = scheduler
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        model, tokens = _request_cost(request)
+        attempt = 0
+        while True:
+            self._scheduler.acquire_sync(model, tokens)
+            try:
+                response = self._inner.handle_request(request)
+            except _RETRYABLE_ERRORS:
+                if attempt >= self._scheduler.max_retries:
+                    raise
+                time.sleep(self._scheduler.backoff(attempt, None))
+                attempt += 1
+                continue
+            if not self._scheduler.observe(model, response) or attempt >= self._scheduler.max_retries:
+                return response
+            response.close()
+            time.sleep(self._scheduler.backoff(attempt, response))
+            attempt += 1
+
+    def close(self) -> None:
+        self._inner.close()
@@ -11,4 +11,6 @@ class ChatRequest(BaseModel):
     session_id: str = Field(...)
     messages: List[ChatMessage] = Field(...)
     top_k: int = Field(default=15, ge=1, le=50)
+    model: str = Field(default="gpt-4o-mini", description="OpenAI chat model name")
+    temperature: float = Field(default=0.1, ge=0.0, le=2.0)
 
@@ -18,3 +18,20 @@ class ExtractRequest(BaseModel):
     )
 
 
+class ExtractStreamRequest(ExtractRequest):
+    """Body for /extract/stream: each URL becomes its own Firecrawl job."""
+
+    max_concurrency: Optional[int] = Field(
+        default=None, ge=1, description="Concurrent per-URL jobs (capped by FIRECRAWL_URL_CONCURRENCY)"
+    )
+    timeout: Optional[float] = Field(
+        default=None, gt=0, description="Per-URL timeout in seconds (default FIRECRAWL_URL_TIMEOUT)"
+    )
+
+
+class ExtractJobRequest(ExtractStreamRequest):
+    """Body for /extract/jobs: like /extract/stream, run in the background."""
+
+    timeout: Optional[float] = Field(
+        default=None, gt=0, description="Per-URL timeout in seconds (default EXTRACT_JOBS_URL_TIMEOUT)"
+    )
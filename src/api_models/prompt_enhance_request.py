@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Literal, Optional
 
 from pydantic import BaseModel, Field
 
@@ -12,5 +12,9 @@ class EnhancePromptRequest(BaseModel):
         description="OpenAI chat model name (for enhancement)",
     )
     temperature: float = Field(default=0.2, ge=0.0, le=2.0)
+    schema_from: Literal["description", "enhanced"] = Field(
+        default="description",
+        description="Generate the database schema from the raw description in parallel with enhancement, or wait for the enhanced prompt",
+    )
 
 
@@ -1,7 +1,33 @@
+from typing import List, Optional
+
 from pydantic import BaseModel, Field
 
 
 class RenderPdfRequest(BaseModel):
     html: str = Field(..., description="AI-generated HTML to render into PDF")
+    purge_css: Optional[bool] = Field(
+        default=None, description="Inline the bundled stylesheet purged to used classes (default: PDF_PURGE_CSS)"
+    )
+    css_safelist: List[str] = Field(
+        default_factory=list, description="Classes kept by the purge, e.g. ones added by scripts"
+    )
+
+
+class BatchPdfDocument(BaseModel):
+    name: Optional[str] = Field(
+        default=None, description="File name for this PDF inside the ZIP (defaults to document-<n>.pdf)"
+    )
+    html: str = Field(..., description="AI-generated HTML to render into PDF")
 
 
+class RenderPdfBatchRequest(BaseModel):
+    documents: List[BatchPdfDocument] = Field(..., min_length=1, description="HTML documents to render")
+    max_workers: Optional[int] = Field(
+        default=None, ge=1, description="Concurrent renders (capped by PDF_BATCH_MAX_WORKERS)"
+    )
+    purge_css: Optional[bool] = Field(
+        default=None, description="Inline the bundled stylesheet purged to used classes (default: PDF_PURGE_CSS)"
+    )
+    css_safelist: List[str] = Field(
+        default_factory=list, description="Classes kept by the purge in every document"
+    )
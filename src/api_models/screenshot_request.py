@@ -1,4 +1,4 @@
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Literal, Optional
 
 from pydantic import BaseModel, Field
 
@@ -19,8 +19,7 @@ DEFAULT_SCREENSHOT_OPTIONS: Dict[str, Any] = {
 class ScreenshotRequest(BaseModel):
     url: str = Field(..., description="Target URL to screenshot")
     options: Dict[str, Any] = Field(default_factory=lambda: DEFAULT_SCREENSHOT_OPTIONS.copy())
-
-
-
-
-
+    delivery: Literal["inline", "url"] = Field(
+        "inline",
+        description='"inline" returns the Firecrawl payload as-is; "url" stores the image and returns screenshot_url instead',
+    )
@@ -0,0 +1,31 @@
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel, Field
+
+
+class StructuredGenBatchRequest(BaseModel):
+    """Request body for generating many structured outputs with one schema.
+
+    - system_prompt: optional system instruction shared by every item
+    - user_prompts: one user message per output; results keep these indices
+    - structure: either a JSON Schema (object with type/properties) or an example dict
+    - model: OpenAI chat model name
+    - temperature: sampling temperature
+    - max_concurrency: concurrent upstream calls for this batch
+    """
+
+    system_prompt: Optional[str] = Field(
+        default=None, description="Optional system instruction for the model"
+    )
+    user_prompts: List[str] = Field(..., min_length=1, description="User messages, one per output")
+    structure: Dict[str, Any] = Field(
+        ..., description="JSON Schema or example dictionary describing desired output"
+    )
+    model: str = Field(
+        default="gpt-5-mini",
+        description="OpenAI chat model name, e.g. gpt-5-mini, o4-mini",
+    )
+    temperature: float = Field(default=0.0, ge=0.0, le=2.0)
+    max_concurrency: Optional[int] = Field(
+        default=None, ge=1, description="Concurrent calls (capped by GENERATE_BATCH_MAX_CONCURRENCY)"
+    )
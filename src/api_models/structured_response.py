@@ -1,4 +1,4 @@
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 from pydantic import BaseModel, Field
 
@@ -7,3 +7,10 @@ class StructuredGenResponse(BaseModel):
     data: Dict[str, Any] = Field(..., description="Structured output from the model")
     model_name: str = Field(..., description="Model used for generation")
 
+
+
+class StructuredGenVisionResponse(StructuredGenResponse):
+    image_preprocessing: Optional[Dict[str, Any]] = Field(
+        default=None,
+        description="Image dedup/resize report: images, bytes and estimated vision tokens in, out and saved",
+    )
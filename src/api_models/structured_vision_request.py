@@ -14,6 +14,9 @@ class ImageInput(BaseModel):
     mime_type: Optional[str] = Field(
         default="image/jpeg", description="MIME type for base64 payloads"
     )
+    detail: Optional[Literal["auto", "low", "high"]] = Field(
+        default=None, description="Per-image detail override; defaults to the request's detail"
+    )
 
 
 class StructuredGenVisionRequest(BaseModel):
@@ -32,5 +35,9 @@ class StructuredGenVisionRequest(BaseModel):
         description="OpenAI chat model name supporting vision, e.g. gpt-4o, gpt-4o-mini",
     )
     temperature: float = Field(default=0.0, ge=0.0, le=2.0)
+    detail: Literal["auto", "low", "high"] = Field(
+        default="auto",
+        description="Vision detail hint; auto picks low for images that fit one 512px tile, high otherwise",
+    )
 
 
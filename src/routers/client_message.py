@@ -1,15 +1,16 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter
 from fastapi.responses import JSONResponse
 from ..api_models.client_message_request import ClientMessageRequest
-from ..service.structured_service import generate_client_message
+from ..service.structured_service import agenerate_client_message
+from ..utils.upstream_errors import upstream_http_exception
 
 router = APIRouter()
 
 
 @router.post("/generate-client-message")
-def post_generate_client_message(body: ClientMessageRequest) -> JSONResponse:
+async def post_generate_client_message(body: ClientMessageRequest) -> JSONResponse:
     try:
-        msg = generate_client_message(
+        msg = await agenerate_client_message(
             user_description=body.user_description,
             website=body.website,
             github=body.github,
@@ -18,7 +19,7 @@ def post_generate_client_message(body: ClientMessageRequest) -> JSONResponse:
             temperature=body.temperature,
         )
     except Exception as exc:
-        raise HTTPException(status_code=500, detail=str(exc))
+        raise upstream_http_exception(exc)
 
     return JSONResponse({"message": msg})
 
@@ -1,4 +1,6 @@
-from fastapi import APIRouter, HTTPException
+from typing import Optional
+
+from fastapi import APIRouter, Header, HTTPException, Response
 from fastapi.responses import JSONResponse
 
 from ..api_models.database_request import (
@@ -12,7 +14,8 @@ from ..api_models.schema_generation_request import (
     SchemaGenerationResponse
 )
 from ..service.database_service import setup_database, query_database, validate_connection_string
-from ..service.schema_generation_service import generate_database_schema
+from ..service.schema_generation_service import agenerate_database_schema, reuse_database_schema
+from ..utils.response_cache import lookup_response_cache
 
 router = APIRouter()
 
@@ -92,29 +95,53 @@ def post_query_database(body: DatabaseQueryRequest) -> DatabaseQueryResponse:
 
 
 @router.post("/generate-schema", response_model=SchemaGenerationResponse)
-def post_generate_schema(body: SchemaGenerationRequest) -> SchemaGenerationResponse:
+async def post_generate_schema(
+    body: SchemaGenerationRequest,
+    response: Response,
+    cache_control: Optional[str] = Header(default=None),
+) -> SchemaGenerationResponse:
     """
     Generate a database schema based on project description using AI.
     
     Analyzes the project requirements and creates appropriate PostgreSQL tables
     with UUID-postfixed names to avoid conflicts between different applications.
+    At temperature 0 a cached schema may be reused, re-suffixed with a new UUID.
     """
     try:
         print(f"[GENERATE_SCHEMA] Schema generation request received")
         print(f"[GENERATE_SCHEMA] Project: {body.project_description[:100]}...")
-        
-        # Generate database schema using AI
-        success, sql_schema, app_uuid, tables, explanation, error_message = generate_database_schema(
-            body.project_description,
-            body.additional_requirements,
-            body.model,
-            body.temperature
+
+        cached = lookup_response_cache(
+            "/generate-schema",
+            cache_control,
+            model=body.model,
+            temperature=body.temperature,
+            project_description=body.project_description,
+            additional_requirements=body.additional_requirements,
         )
+        hit = await cached.aget()
+        if hit is not None:
+            print(f"[GENERATE_SCHEMA] Reusing cached schema")
+            success, sql_schema, app_uuid, tables, explanation, error_message = reuse_database_schema(
+                hit["sql_schema"], hit["app_uuid"], body.project_description
+            )
+        else:
+            # Generate database schema using AI
+            success, sql_schema, app_uuid, tables, explanation, error_message = await agenerate_database_schema(
+                body.project_description,
+                body.additional_requirements,
+                body.model,
+                body.temperature
+            )
+            if success:
+                await cached.astore({"sql_schema": sql_schema, "app_uuid": app_uuid})
         
         if success:
             print(f"[GENERATE_SCHEMA] Schema generated successfully: {len(tables)} tables")
         else:
             print(f"[GENERATE_SCHEMA] Schema generation failed: {error_message}")
+        if cached.status:
+            response.headers["X-Cache"] = cached.status
             
         return SchemaGenerationResponse(
             success=success,
@@ -1,36 +1,233 @@
-from fastapi import APIRouter, HTTPException
+import json
+import os
+from typing import Optional
+
+from fastapi import APIRouter, Header, HTTPException, Query, Response
 from fastapi.encoders import jsonable_encoder
-from ..api_models.extract_request import ExtractRequest
+from fastapi.responses import JSONResponse, StreamingResponse
+from ..api_models.extract_request import ExtractJobRequest, ExtractRequest, ExtractStreamRequest
 from ..api_models.screenshot_request import ScreenshotRequest
-from ..service.structured_service import extract_with_firecrawl
+from ..service.extract_jobs import JobRunningElsewhere, get_extract_jobs
+from ..service.firecrawl_cache import acached_extract, acached_screenshot
+from ..service.screenshot_store import get_screenshot_store, sniff_media_type
+from ..service.structured_service import aextract_with_firecrawl, astream_extract_with_firecrawl
+from ..utils.http_cache import byte_range, etag_matches, iter_file_range
+from ..utils.schema_builder import build_pydantic_model
+from ..utils.sse import SSE_HEADERS, format_sse
 
 
 router = APIRouter()
 
 
+def _no_cache(cache_control: Optional[str]) -> bool:
+    return "no-cache" in (cache_control or "").lower()
+
+
 @router.post("/extract")
-def post_extract(body: ExtractRequest):
+async def post_extract(body: ExtractRequest, response: Response, cache_control: Optional[str] = Header(default=None)):
 
     try:
-        data = extract_with_firecrawl(
-            urls=body.urls,
-            prompt=body.prompt,
-            structure=body.structure,
-            api_key=body.api_key,
+        schema = build_pydantic_model(body.structure).model_json_schema()
+        data, status = await acached_extract(
+            body.urls,
+            body.prompt,
+            schema,
+            lambda: aextract_with_firecrawl(
+                urls=body.urls,
+                prompt=body.prompt,
+                structure=body.structure,
+                api_key=body.api_key,
+            ),
+            bypass=_no_cache(cache_control),
         )
     except Exception as exc:
         raise HTTPException(status_code=500, detail=str(exc))
 
+    if status:
+        response.headers["X-Cache"] = status
     return jsonable_encoder(data)
 
 
+@router.post("/extract/stream")
+async def post_extract_stream(
+    body: ExtractStreamRequest,
+    accept: Optional[str] = Header(default=None),
+    cache_control: Optional[str] = Header(default=None),
+) -> StreamingResponse:
+    """One Firecrawl job per URL, streamed as each finishes: NDJSON lines of
+    {index, url, data, error}, or `result` SSE events followed by `done`
+    when the client accepts text/event-stream."""
+    # Validate the structure before the stream starts so errors can still be a 400
+    try:
+        build_pydantic_model(body.structure)
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+
+    results = astream_extract_with_firecrawl(
+        urls=body.urls,
+        prompt=body.prompt,
+        structure=body.structure,
+        api_key=body.api_key,
+        max_concurrency=body.max_concurrency,
+        timeout=body.timeout,
+        bypass_cache=_no_cache(cache_control),
+    )
+
+    if accept and "text/event-stream" in accept:
+        async def _sse():
+            succeeded = failed = 0
+            async for item in results:
+                if item["error"] is None:
+                    succeeded += 1
+                else:
+                    failed += 1
+                yield format_sse("result", jsonable_encoder(item))
+            yield format_sse("done", {"succeeded": succeeded, "failed": failed})
+
+        return StreamingResponse(_sse(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+    async def _ndjson():
+        async for item in results:
+            yield json.dumps(jsonable_encoder(item)) + "\n"
+
+    return StreamingResponse(_ndjson(), media_type="application/x-ndjson")
+
+
+def _job_links(job_id: str) -> dict:
+    return {"self": f"/extract/jobs/{job_id}", "events": f"/extract/jobs/{job_id}/events"}
+
+
+@router.post("/extract/jobs", status_code=202)
+async def post_extract_job(body: ExtractJobRequest, cache_control: Optional[str] = Header(default=None)):
+    """Start a background extraction (one Firecrawl job per URL) and return
+    immediately; poll GET /extract/jobs/{id} or follow its /events stream."""
+    try:
+        build_pydantic_model(body.structure)
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+
+    job = await get_extract_jobs().asubmit(
+        urls=body.urls,
+        prompt=body.prompt,
+        structure=body.structure,
+        api_key=body.api_key,
+        max_concurrency=body.max_concurrency,
+        timeout=body.timeout,
+        bypass_cache=_no_cache(cache_control),
+    )
+    links = _job_links(job["id"])
+    return JSONResponse(
+        status_code=202, content={**job, "links": links}, headers={"Location": links["self"]}
+    )
+
+
+@router.get("/extract/jobs/{job_id}")
+async def get_extract_job(job_id: str, since: int = Query(default=0, ge=0)):
+    """Job state plus the per-URL results with seq > `since`; pass the returned
+    `next` as `since` to fetch only new results."""
+    jobs = get_extract_jobs()
+    job = await jobs.aget(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    results = await jobs.aresults(job_id, since)
+    return {
+        **job,
+        "results": results,
+        "next": results[-1]["seq"] if results else since,
+        "links": _job_links(job_id),
+    }
+
+
+@router.get("/extract/jobs/{job_id}/events")
+async def get_extract_job_events(
+    job_id: str,
+    since: int = Query(default=0, ge=0),
+    last_event_id: Optional[str] = Header(default=None),
+) -> StreamingResponse:
+    """SSE: `progress` events with the job state, one `result` event per URL
+    (id = seq, so reconnecting clients resume via Last-Event-ID) and a final
+    `done` event."""
+    jobs = get_extract_jobs()
+    if await jobs.aget(job_id) is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if last_event_id and last_event_id.isdigit():
+        since = max(since, int(last_event_id))
+
+    async def _sse():
+        async for event, data in jobs.afollow(job_id, since):
+            if event == "keepalive":
+                yield ": keepalive\n\n"
+            elif event == "result":
+                yield format_sse("result", data, event_id=str(data["seq"]))
+            else:
+                yield format_sse(event, data)
+
+    return StreamingResponse(_sse(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
+@router.delete("/extract/jobs/{job_id}")
+async def delete_extract_job(job_id: str):
+    """Cancel a queued or running job; finished jobs are returned unchanged."""
+    try:
+        job = await get_extract_jobs().acancel(job_id)
+    except JobRunningElsewhere as exc:
+        raise HTTPException(status_code=409, detail=str(exc))
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
 @router.post("/screenshot")
-def post_screenshot(body: ScreenshotRequest):
-    from ..service.structured_service import screenshot_with_firecrawl
+async def post_screenshot(body: ScreenshotRequest, response: Response, cache_control: Optional[str] = Header(default=None)):
+    from ..service.structured_service import ascreenshot_with_firecrawl
 
     try:
-        result = screenshot_with_firecrawl(url=body.url, options={"options": body.options})
+        result, status = await acached_screenshot(
+            body.url,
+            body.options,
+            lambda: ascreenshot_with_firecrawl(url=body.url, options=body.options),
+            bypass=_no_cache(cache_control),
+            delivery=body.delivery,
+        )
     except Exception as exc:
         raise HTTPException(status_code=500, detail=str(exc))
+    if status:
+        response.headers["X-Cache"] = status
     return jsonable_encoder(result)
 
+
+@router.get("/screenshot/{digest}")
+def get_screenshot(
+    digest: str,
+    if_none_match: Optional[str] = Header(default=None),
+    range_header: Optional[str] = Header(default=None, alias="Range"),
+    if_range: Optional[str] = Header(default=None),
+):
+    # Content-addressed, so the digest is a strong ETag and the URL never changes
+    headers = {"ETag": f'"{digest}"', "Cache-Control": "public, max-age=31536000, immutable", "Accept-Ranges": "bytes"}
+    # One handle for the whole response, so an eviction in between cannot turn it into a 500
+    handle = get_screenshot_store().open(digest)
+    if handle is None:
+        raise HTTPException(status_code=404, detail="Screenshot not found")
+    if etag_matches(if_none_match, headers["ETag"]):
+        handle.close()
+        return Response(status_code=304, headers=headers)
+
+    size = os.fstat(handle.fileno()).st_size
+    media_type = sniff_media_type(handle.read(16))
+    try:
+        span = byte_range(range_header, size) if not if_range or if_range == headers["ETag"] else None
+    except ValueError:
+        handle.close()
+        return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{size}"})
+    if span is None:
+        return StreamingResponse(
+            iter_file_range(handle, 0, size), media_type=media_type, headers={**headers, "Content-Length": str(size)}
+        )
+    start, end = span
+    return StreamingResponse(
+        iter_file_range(handle, start, end - start + 1),
+        status_code=206,
+        media_type=media_type,
+        headers={**headers, "Content-Length": str(end - start + 1), "Content-Range": f"bytes {start}-{end}/{size}"},
+    )
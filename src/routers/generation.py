@@ -1,19 +1,50 @@
-from fastapi import APIRouter, HTTPException
+import json
+from typing import Optional
+
+from fastapi import APIRouter, Header, HTTPException, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from ..api_models.structured_request import StructuredGenRequest
-from ..api_models.structured_response import StructuredGenResponse
+from ..api_models.structured_response import StructuredGenResponse, StructuredGenVisionResponse
 from ..api_models.structured_vision_request import StructuredGenVisionRequest
+from ..api_models.structured_batch_request import StructuredGenBatchRequest
 from ..service.structured_service import (
-    generate_structured_output,
-    generate_structured_output_with_images,
+    agenerate_structured_output,
+    agenerate_structured_output_with_images,
+    astream_structured_batch,
+    astream_structured_output,
 )
+from ..utils.image_preprocess import preprocess_images
+from ..utils.response_cache import hash_text, lookup_response_cache
+from ..utils.schema_builder import build_pydantic_model, structure_hash
+from ..utils.sse import SSE_HEADERS, format_sse
+from ..utils.upstream_errors import upstream_error_status, upstream_http_exception
 
 router = APIRouter()
 
 
 @router.post("/generate", response_model=StructuredGenResponse)
-def post_generate(request: StructuredGenRequest) -> StructuredGenResponse:
+async def post_generate(
+    request: StructuredGenRequest,
+    response: Response,
+    cache_control: Optional[str] = Header(default=None),
+) -> StructuredGenResponse:
+    cached = lookup_response_cache(
+        "/generate",
+        cache_control,
+        model=request.model,
+        temperature=request.temperature,
+        system_prompt=request.system_prompt,
+        user_prompt=request.user_prompt,
+        structure=structure_hash(request.structure),
+    )
+    hit = await cached.aget()
+    if hit is not None:
+        response.headers["X-Cache"] = "HIT"
+        return StructuredGenResponse(**hit)
+
     try:
-        result = generate_structured_output(
+        result = await agenerate_structured_output(
             system_prompt=request.system_prompt,
             user_prompt=request.user_prompt,
             structure=request.structure,
@@ -23,18 +54,77 @@ def post_generate(request: StructuredGenRequest) -> StructuredGenResponse:
     except ValueError as ve:
         raise HTTPException(status_code=400, detail=str(ve))
     except Exception as exc:
-        raise HTTPException(status_code=500, detail=str(exc))
+        raise upstream_http_exception(exc)
 
-    return StructuredGenResponse(data=result, model_name=request.model)
+    body = StructuredGenResponse(data=result, model_name=request.model)
+    if cached.status:
+        await cached.astore(body.model_dump())
+        response.headers["X-Cache"] = cached.status
+    return body
 
 
-@router.post("/generate-vision", response_model=StructuredGenResponse)
-def post_generate_vision(request: StructuredGenVisionRequest) -> StructuredGenResponse:
+@router.post("/generate/stream")
+async def post_generate_stream(request: StructuredGenRequest) -> StreamingResponse:
+    """Server-Sent Events: `partial` events carry the object parsed so far,
+    then one `final` event with the validated StructuredGenResponse body, or
+    an `error` event."""
     try:
-        result = generate_structured_output_with_images(
+        build_pydantic_model(request.structure)
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+
+    async def _events():
+        try:
+            async for kind, obj in astream_structured_output(
+                system_prompt=request.system_prompt,
+                user_prompt=request.user_prompt,
+                structure=request.structure,
+                model_name=request.model,
+                temperature=request.temperature,
+            ):
+                if kind == "final":
+                    yield format_sse("final", {"data": obj, "model_name": request.model})
+                else:
+                    yield format_sse("partial", obj)
+        except Exception as exc:
+            status, retry_after = upstream_error_status(exc)
+            yield format_sse("error", {"detail": str(exc), "status": status, "retry_after": retry_after})
+
+    return StreamingResponse(_events(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
+@router.post("/generate-vision", response_model=StructuredGenVisionResponse)
+async def post_generate_vision(
+    request: StructuredGenVisionRequest,
+    response: Response,
+    cache_control: Optional[str] = Header(default=None),
+) -> StructuredGenVisionResponse:
+    cached = lookup_response_cache(
+        "/generate-vision",
+        cache_control,
+        model=request.model,
+        temperature=request.temperature,
+        system_prompt=request.system_prompt,
+        user_prompt=request.user_prompt,
+        structure=structure_hash(request.structure),
+        images=[hash_text(img.model_dump_json()) for img in request.images],
+        detail=request.detail,
+    )
+    hit = await cached.aget()
+    if hit is not None:
+        response.headers["X-Cache"] = "HIT"
+        return StructuredGenVisionResponse(**hit)
+
+    try:
+        # Decoding and resampling is CPU work; keep it off the event loop
+        images, report = await run_in_threadpool(
+            preprocess_images, [img.model_dump() for img in request.images], request.detail
+        )
+        print(f"[VISION] {report}")
+        result = await agenerate_structured_output_with_images(
             system_prompt=request.system_prompt,
             user_prompt=request.user_prompt,
-            images=[img.model_dump() for img in request.images],
+            images=images,
             structure=request.structure,
             model_name=request.model,
             temperature=request.temperature,
@@ -42,7 +132,32 @@ def post_generate_vision(request: StructuredGenVisionRequest) -> StructuredGenRe
     except ValueError as ve:
         raise HTTPException(status_code=400, detail=str(ve))
     except Exception as exc:
-        raise HTTPException(status_code=500, detail=str(exc))
+        raise upstream_http_exception(exc)
 
-    return StructuredGenResponse(data=result, model_name=request.model)
+    body = StructuredGenVisionResponse(data=result, model_name=request.model, image_preprocessing=report)
+    if cached.status:
+        await cached.astore(body.model_dump())
+        response.headers["X-Cache"] = cached.status
+    return body
+
+
+@router.post("/generate/batch")
+async def post_generate_batch(request: StructuredGenBatchRequest) -> StreamingResponse:
+    # Validate the structure before the stream starts so errors can still be a 400
+    try:
+        build_pydantic_model(request.structure)
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+
+    async def _ndjson():
+        async for item in astream_structured_batch(
+            system_prompt=request.system_prompt,
+            user_prompts=request.user_prompts,
+            structure=request.structure,
+            model_name=request.model,
+            temperature=request.temperature,
+            max_concurrency=request.max_concurrency,
+        ):
+            yield json.dumps(item) + "\n"
 
+    return StreamingResponse(_ndjson(), media_type="application/x-ndjson")
@@ -0,0 +1,42 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from ..ai_models.openai_model import get_client_registry
+from ..ai_models.prompt_cache_stats import get_prompt_cache_stats
+from ..service.extract_jobs import get_extract_jobs
+from ..service.firecrawl_cache import get_firecrawl_cache
+from ..service.firecrawl_gateway import get_firecrawl_gateway
+from ..service.screenshot_store import get_screenshot_store
+from ..service.pdf_service import get_render_cache
+from ..utils.concurrency import get_limiter_stats
+from ..utils.guide_ranker import get_guide_selection_stats
+from ..utils.hedging import get_hedge_policy
+from ..utils.pdf_utils import get_purge_cache_info
+from ..utils.response_cache import get_response_cache
+from ..utils.schema_builder import get_model_cache_info
+from ..utils.single_flight import get_single_flight_stats
+
+router = APIRouter()
+
+
+@router.get("/metrics")
+def get_metrics() -> JSONResponse:
+    """In-process cache and upstream counters, for tuning and dashboards."""
+    response_cache = get_response_cache()
+    firecrawl_cache = get_firecrawl_cache()
+    return JSONResponse({
+        "schema_model_cache": get_model_cache_info(),
+        "llm_clients": get_client_registry().stats(),
+        "prompt_cache": get_prompt_cache_stats(),
+        "concurrency": get_limiter_stats(),
+        "firecrawl": get_firecrawl_gateway().stats(),
+        "single_flight": get_single_flight_stats(),
+        "hedging": get_hedge_policy().stats(),
+        "v0_guide_selection": get_guide_selection_stats(),
+        "pdf_css_purge_cache": get_purge_cache_info(),
+        "pdf_render_cache": get_render_cache().stats(),
+        "response_cache": response_cache.stats() if response_cache else None,
+        "firecrawl_cache": firecrawl_cache.stats() if firecrawl_cache else None,
+        "screenshot_store": get_screenshot_store().stats(),
+        "extract_jobs": get_extract_jobs().stats(),
+    })
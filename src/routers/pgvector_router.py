@@ -1,10 +1,13 @@
 from fastapi import APIRouter, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import JSONResponse
 
 from ..api_models.ingest_request import IngestRequest
 from ..api_models.chat_request import ChatRequest
 from ..service.pgvector_service import ingest_files, search
+from ..ai_models.llm_invoke import ainvoke_llm
 from ..ai_models.openai_model import get_openai_chat_model
+from ..utils.upstream_errors import upstream_http_exception
 
 router = APIRouter()
 
@@ -29,12 +32,12 @@ def post_ingest(body: IngestRequest) -> JSONResponse:
         print(f"[ROUTER] Ingestion completed successfully, total chunks: {count}")
     except Exception as exc:
         print(f"[ROUTER] Error during ingestion: {exc}")
-        raise HTTPException(status_code=500, detail=str(exc))
+        raise upstream_http_exception(exc)
     return JSONResponse({"session_id": body.session_id, "chunks": count})
 
 
 @router.post("/chat")
-def post_chat(body: ChatRequest) -> JSONResponse:
+async def post_chat(body: ChatRequest) -> JSONResponse:
     try:
         print(f"[CHAT] Starting chat for session: {body.session_id}")
         print(f"[CHAT] Received {len(body.messages)} messages")
@@ -52,7 +55,8 @@ def post_chat(body: ChatRequest) -> JSONResponse:
         print(f"[CHAT] Latest user message: {latest_user_message[:100]}...")
         
         # Get relevant chunks using similarity search
-        hits = search(body.session_id, latest_user_message, body.top_k)
+        # pgvector access is blocking; keep it off the event loop
+        hits = await run_in_threadpool(search, body.session_id, latest_user_message, body.top_k)
         print(f"[CHAT] Found {len(hits)} relevant chunks")
         
         # Build context from retrieved chunks
@@ -64,16 +68,17 @@ def post_chat(body: ChatRequest) -> JSONResponse:
         print(f"[CHAT] Built context with {len(context)} characters")
         
         # Build the system prompt with context
+        # Static instructions first and retrieved context last, so the prefix can be prompt-cached
         system_prompt = f"""You are a helpful AI assistant. Answer the user's question based on the provided context from their documents.
 
-Context from documents:
-{context}
-
 Instructions:
 - Answer based primarily on the provided context
 - If the context doesn't contain relevant information, say so clearly
 - Be concise but comprehensive
-- Reference specific documents when possible"""
+- Reference specific documents when possible
+
+Context from documents:
+{context}"""
 
         # Prepare messages for OpenAI (system + conversation history)
         openai_messages = [{"role": "system", "content": system_prompt}]
@@ -84,9 +89,12 @@ Instructions:
         
         print(f"[CHAT] Calling OpenAI with {len(openai_messages)} messages")
         
-        # Generate response using OpenAI
-        chat_model = get_openai_chat_model("gpt-4o-mini", temperature=0.1)
-        response = chat_model.invoke(openai_messages)
+        # Generate response using OpenAI; identical concurrent chats (same
+        # session, context and history) share one call
+        response = await ainvoke_llm(
+            lambda model: get_openai_chat_model(model, temperature=body.temperature),
+            openai_messages, body.model, body.temperature, "chat", "chat",
+        )
         
         assistant_response = response.content
         print(f"[CHAT] Generated response with {len(assistant_response)} characters")
@@ -104,6 +112,6 @@ Instructions:
         
     except Exception as exc:
         print(f"[CHAT] Error during chat: {exc}")
-        raise HTTPException(status_code=500, detail=str(exc))
+        raise upstream_http_exception(exc)
 
 
@@ -1,18 +1,50 @@
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import StreamingResponse
-from ..api_models.render_pdf_request import RenderPdfRequest
-from ..service.pdf_service import render_html_to_pdf_bytes
+import os
+from typing import Optional
+
+from fastapi import APIRouter, Header, HTTPException
+from fastapi.responses import Response, StreamingResponse
+from ..api_models.render_pdf_request import RenderPdfBatchRequest, RenderPdfRequest
+from ..service.pdf_service import (
+    iter_batch_pdf_zip,
+    iter_file_chunks,
+    open_cached_render,
+    prepare_render,
+)
+from ..utils.http_cache import etag_matches
 
 router = APIRouter()
 
 
 @router.post("/render-pdf")
-def post_render_pdf(body: RenderPdfRequest):
-    import io
+def post_render_pdf(body: RenderPdfRequest, if_none_match: Optional[str] = Header(default=None)):
     try:
-        pdf_bytes = render_html_to_pdf_bytes(body.html)
+        prepared = prepare_render(body.html, purge_css=body.purge_css, safelist=body.css_safelist)
     except Exception as exc:
         raise HTTPException(status_code=500, detail=str(exc))
 
-    return StreamingResponse(io.BytesIO(pdf_bytes), media_type="application/pdf")
+    etag = f'"{prepared.key}"'
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+
+    try:
+        # Opened under the cache lock, so a concurrent eviction cannot pull the file away
+        handle = open_cached_render(prepared)
+    except Exception as exc:
+        raise HTTPException(status_code=500, detail=str(exc))
+
+    size = os.fstat(handle.fileno()).st_size
+    return StreamingResponse(
+        iter_file_chunks(handle),
+        media_type="application/pdf",
+        headers={"ETag": etag, "Content-Length": str(size)},
+    )
+
 
+@router.post("/render-pdf/batch")
+def post_render_pdf_batch(body: RenderPdfBatchRequest):
+    documents = [(doc.name, doc.html) for doc in body.documents]
+    return StreamingResponse(
+        iter_batch_pdf_zip(documents, max_workers=body.max_workers, purge_css=body.purge_css, safelist=body.css_safelist),
+        media_type="application/zip",
+        headers={"Content-Disposition": 'attachment; filename="pdfs.zip"'},
+    )
@@ -0,0 +1,409 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import socket
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED = (COMPLETED, FAILED, CANCELLED)
+
+_JOB_COLUMNS = (
+    "id, status, request, total, succeeded, failed, error, owner, created_at, started_at, finished_at, updated_at"
+)
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True
+    return True
+
+
+class JobRunningElsewhere(RuntimeError):
+    """The job is owned by another worker process and cannot be cancelled here."""
+
+
+class ExtractJobManager:
+    """Background Firecrawl extractions with state persisted in SQLite.
+
+    A submitted job runs as an asyncio task in the worker that accepted it,
+    one Firecrawl job per URL (see astream_extract_with_firecrawl), so the
+    request returns immediately and no thread is held while long wildcard
+    crawls run. Job state and every per-URL result are written to SQLite as
+    they arrive, numbered by `seq` in completion order, so any worker can
+    answer polls and SSE subscriptions and clients can resume from the last
+    `seq` they saw. API keys are never persisted.
+
+    Jobs whose owning process is gone (restart, crash) are marked failed on
+    startup; jobs still running at shutdown are marked cancelled. Finished
+    jobs older than `ttl_seconds` are purged at start() and then every
+    `purge_interval` seconds. SQLite calls made from the event loop run in
+    worker threads.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        ttl_seconds: float,
+        url_timeout: float,
+        poll_interval: float,
+        keepalive_seconds: float,
+        purge_interval: float,
+    ) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.purge_interval = purge_interval
+        self.url_timeout = url_timeout
+        self.poll_interval = poll_interval
+        self.keepalive_seconds = keepalive_seconds
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS extract_jobs ("
+            "id TEXT PRIMARY KEY, status TEXT NOT NULL, request TEXT NOT NULL, total INTEGER NOT NULL, "
+            "succeeded INTEGER NOT NULL DEFAULT 0, failed INTEGER NOT NULL DEFAULT 0, error TEXT, owner TEXT NOT NULL, "
+            "created_at REAL NOT NULL, started_at REAL, finished_at REAL, updated_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS extract_job_results ("
+            "job_id TEXT NOT NULL, seq INTEGER NOT NULL, item TEXT NOT NULL, PRIMARY KEY (job_id, seq))"
+        )
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._events: Dict[str, asyncio.Event] = {}
+        self._purger: Optional[asyncio.Task] = None
+        self.purged = 0
+        self.recovered = self._fail_orphans()
+
+    # Persistence
+
+    def _fail_orphans(self) -> int:
+        """Mark jobs of dead processes on this host as failed."""
+        host = socket.gethostname()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, owner FROM extract_jobs WHERE status IN (?, ?)", (QUEUED, RUNNING)
+            ).fetchall()
+        orphans = []
+        for job_id, owner in rows:
+            owner_host, _, pid = owner.rpartition(":")
+            # Our own pid can only be a leftover from a previous process (e.g. pid 1 in a container)
+            if owner_host == host and pid.isdigit() and (int(pid) == os.getpid() or not _pid_alive(int(pid))):
+                orphans.append(job_id)
+        for job_id in orphans:
+            self._finish(job_id, FAILED, "Interrupted: the worker running this job exited")
+        if orphans:
+            print(f"[EXTRACT_JOBS] Marked {len(orphans)} interrupted job(s) as failed")
+        return len(orphans)
+
+    def _row_to_job(self, row: tuple) -> Dict[str, Any]:
+        (job_id, status, request, total, succeeded, failed, error, _owner, created_at, started_at, finished_at, updated_at) = row
+        return {
+            "id": job_id,
+            "status": status,
+            "total": total,
+            "completed": succeeded + failed,
+            "succeeded": succeeded,
+            "failed": failed,
+            "error": error,
+            "created_at": created_at,
+            "started_at": started_at,
+            "finished_at": finished_at,
+            "updated_at": updated_at,
+            "request": json.loads(request),
+        }
+
+    def _get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(f"SELECT {_JOB_COLUMNS} FROM extract_jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._row_to_job(row) if row else None
+
+    def _results(self, job_id: str, since: int, limit: int) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT seq, item FROM extract_job_results WHERE job_id = ? AND seq > ? ORDER BY seq LIMIT ?",
+                (job_id, since, limit),
+            ).fetchall()
+        return [{"seq": seq, **json.loads(item)} for seq, item in rows]
+
+    async def aget(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return await asyncio.to_thread(self._get, job_id)
+
+    async def aresults(self, job_id: str, since: int = 0, limit: int = 1000) -> List[Dict[str, Any]]:
+        """Per-URL results with seq > `since`, oldest first."""
+        return await asyncio.to_thread(self._results, job_id, since, limit)
+
+    def _update(self, job_id: str, sql: str, params: tuple) -> None:
+        with self._lock:
+            self._conn.execute(f"UPDATE extract_jobs SET {sql}, updated_at = ? WHERE id = ?", (*params, time.time(), job_id))
+
+    def _add_result(self, job_id: str, seq: int, item: Dict[str, Any]) -> None:
+        column = "succeeded" if item["error"] is None else "failed"
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.execute(
+                    "INSERT INTO extract_job_results (job_id, seq, item) VALUES (?, ?, ?)", (job_id, seq, json.dumps(item))
+                )
+                self._conn.execute(
+                    f"UPDATE extract_jobs SET {column} = {column} + 1, updated_at = ? WHERE id = ?", (now, job_id)
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def _finish(self, job_id: str, status: str, error: Optional[str] = None) -> None:
+        self._update(job_id, "status = ?, error = ?, finished_at = ?", (status, error, time.time()))
+
+    async def _afinish(self, job_id: str, status: str, error: Optional[str] = None) -> None:
+        await asyncio.to_thread(self._finish, job_id, status, error)
+        self._notify(job_id)
+
+    def _purge_expired(self) -> int:
+        cutoff = time.time() - self.ttl_seconds
+        with self._lock:
+            expired = [
+                row[0]
+                for row in self._conn.execute(
+                    "SELECT id FROM extract_jobs WHERE finished_at IS NOT NULL AND finished_at <= ?", (cutoff,)
+                ).fetchall()
+            ]
+            for job_id in expired:
+                self._conn.execute("DELETE FROM extract_job_results WHERE job_id = ?", (job_id,))
+                self._conn.execute("DELETE FROM extract_jobs WHERE id = ?", (job_id,))
+            self.purged += len(expired)
+        return len(expired)
+
+    async def _purge_loop(self) -> None:
+        while True:
+            try:
+                purged = await asyncio.to_thread(self._purge_expired)
+                if purged:
+                    print(f"[EXTRACT_JOBS] Purged {purged} expired job(s)")
+            except Exception as exc:
+                print(f"[EXTRACT_JOBS] Purging expired jobs failed: {exc}")
+            await asyncio.sleep(self.purge_interval)
+
+    def start(self) -> None:
+        """Purge expired jobs now and every `purge_interval` seconds after
+        (idempotent; needs a running event loop)."""
+        if self._purger is None:
+            self._purger = asyncio.ensure_future(self._purge_loop())
+
+    # Running jobs
+
+    def _insert(self, job_id: str, request: Dict[str, Any], total: int) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO extract_jobs (id, status, request, total, owner, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (job_id, QUEUED, json.dumps(request), total, self.owner, now, now),
+            )
+
+    async def asubmit(
+        self,
+        urls: List[str],
+        prompt: str,
+        structure: Dict[str, Any],
+        api_key: Optional[str] = None,
+        max_concurrency: Optional[int] = None,
+        timeout: Optional[float] = None,
+        bypass_cache: bool = False,
+    ) -> Dict[str, Any]:
+        """Persist a queued job and start it in the background; returns the job."""
+        job_id = uuid.uuid4().hex
+        request = {
+            "urls": urls,
+            "prompt": prompt,
+            "structure": structure,
+            "max_concurrency": max_concurrency,
+            "timeout": timeout or self.url_timeout,
+        }
+        self.start()
+        await asyncio.to_thread(self._insert, job_id, request, len(urls))
+
+        task = asyncio.ensure_future(self._run(job_id, request, api_key, bypass_cache))
+        self._tasks[job_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(job_id, None))
+        # The task starts while this read is in flight, so cancelling it from
+        # here on always runs its CancelledError handler
+        return await self.aget(job_id)  # type: ignore[return-value]
+
+    async def _run(self, job_id: str, request: Dict[str, Any], api_key: Optional[str], bypass_cache: bool) -> None:
+        from .structured_service import astream_extract_with_firecrawl
+
+        try:
+            await asyncio.to_thread(self._update, job_id, "status = ?, started_at = ?", (RUNNING, time.time()))
+            self._notify(job_id)
+            results = astream_extract_with_firecrawl(
+                urls=request["urls"],
+                prompt=request["prompt"],
+                structure=request["structure"],
+                api_key=api_key,
+                max_concurrency=request["max_concurrency"],
+                timeout=request["timeout"],
+                bypass_cache=bypass_cache,
+            )
+            seq = 0
+            async for item in results:
+                seq += 1
+                await asyncio.to_thread(self._add_result, job_id, seq, item)
+                self._notify(job_id)
+        except asyncio.CancelledError:
+            # The only place a cancellation (DELETE or shutdown) is recorded
+            await self._afinish(job_id, CANCELLED, "Cancelled")
+            raise
+        except Exception as exc:
+            print(f"[EXTRACT_JOBS] Job {job_id} failed: {exc}")
+            await self._afinish(job_id, FAILED, str(exc))
+        else:
+            await self._afinish(job_id, COMPLETED)
+        finally:
+            event = self._events.pop(job_id, None)
+            if event is not None:
+                event.set()
+
+    async def acancel(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Cancel a running job owned by this process and return it once its
+        task has recorded the cancellation; finished jobs are returned
+        unchanged. Raises JobRunningElsewhere for other workers' jobs."""
+        job = await self.aget(job_id)
+        if job is None or job["status"] in FINISHED:
+            return job
+        task = self._tasks.get(job_id)
+        if task is None:
+            raise JobRunningElsewhere(f"Job {job_id} is running in another worker")
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        return await self.aget(job_id)
+
+    async def aclose(self) -> None:
+        if self._purger is not None:
+            self._purger.cancel()
+            await asyncio.gather(self._purger, return_exceptions=True)
+            self._purger = None
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    # Following a job
+
+    def _notify(self, job_id: str) -> None:
+        event = self._events.get(job_id)
+        if event is not None:
+            event.set()
+            self._events[job_id] = asyncio.Event()
+
+    async def _wait(self, job_id: str, timeout: float) -> None:
+        """Wait for a local update of `job_id`, or `timeout` seconds (jobs run
+        by other workers are only seen by re-reading SQLite)."""
+        if job_id not in self._tasks:
+            await asyncio.sleep(timeout)
+            return
+        event = self._events.setdefault(job_id, asyncio.Event())
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    async def afollow(self, job_id: str, since: int = 0) -> AsyncIterator[Tuple[str, Any]]:
+        """Yield ("result", item) for each result after `since`, ("progress",
+        job) when counts or status change, ("keepalive", None) when idle and
+        finally ("done", job)."""
+        last_state = None
+        idle = 0.0
+        while True:
+            job = await self.aget(job_id)
+            if job is None:
+                return
+            items = await self.aresults(job_id, since)
+            for item in items:
+                since = item["seq"]
+                yield "result", item
+            state = (job["status"], job["completed"])
+            if state != last_state:
+                last_state = state
+                idle = 0.0
+                yield "progress", job
+            if job["status"] in FINISHED and not items:
+                yield "done", job
+                return
+            if items:
+                continue
+            if idle >= self.keepalive_seconds:
+                idle = 0.0
+                yield "keepalive", None
+            started = time.monotonic()
+            await self._wait(job_id, self.poll_interval)
+            idle += time.monotonic() - started
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = dict(self._conn.execute("SELECT status, COUNT(*) FROM extract_jobs GROUP BY status").fetchall())
+        return {
+            "running_here": len(self._tasks),
+            "subscribers_waiting": len(self._events),
+            "recovered_on_startup": self.recovered,
+            "purged": self.purged,
+            "ttl_seconds": self.ttl_seconds,
+            "jobs": counts,
+        }
+
+
+_manager: Optional[ExtractJobManager] = None
+_manager_lock = threading.Lock()
+
+
+def get_extract_jobs() -> ExtractJobManager:
+    """Return the extract job manager.
+
+    EXTRACT_JOBS_PATH (SQLite file, default: system temp dir),
+    EXTRACT_JOBS_TTL (seconds finished jobs are kept, default 1 day),
+    EXTRACT_JOBS_URL_TIMEOUT (default per-URL timeout, 1800s, since wildcard
+    crawls can take minutes), EXTRACT_JOBS_POLL_INTERVAL (how often
+    subscribers re-read jobs run by other workers, default 1s),
+    EXTRACT_JOBS_KEEPALIVE (idle seconds between SSE keepalives, default 15)
+    and EXTRACT_JOBS_PURGE_INTERVAL (seconds between purges of expired jobs,
+    default 3600) configure it.
+    """
+    global _manager
+    if _manager is None:
+        with _manager_lock:
+            if _manager is None:
+                _manager = ExtractJobManager(
+                    db_path=os.environ.get("EXTRACT_JOBS_PATH")
+                    or os.path.join(tempfile.gettempdir(), "handy-extract-jobs.sqlite3"),
+                    ttl_seconds=float(os.environ.get("EXTRACT_JOBS_TTL", "86400")),
+                    url_timeout=float(os.environ.get("EXTRACT_JOBS_URL_TIMEOUT", "1800")),
+                    poll_interval=float(os.environ.get("EXTRACT_JOBS_POLL_INTERVAL", "1")),
+                    keepalive_seconds=float(os.environ.get("EXTRACT_JOBS_KEEPALIVE", "15")),
+                    purge_interval=float(os.environ.get("EXTRACT_JOBS_PURGE_INTERVAL", "3600")),
+                )
+    return _manager
+
+
+async def shutdown_extract_jobs() -> None:
+    global _manager
+    with _manager_lock:
+        manager, _manager = _manager, None
+    if manager is not None:
+        await manager.aclose()
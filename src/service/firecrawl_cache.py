@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from ..utils.swr_cache import MISS, SWRCache
+from .screenshot_store import ScreenshotStore, get_screenshot_store
+
+_DEFAULT_PORTS = {"http": "80", "https": "443"}
+
+
+def normalize_url(url: str) -> str:
+    """Canonical form of a URL for cache keys.
+
+    Lowercases scheme and host, drops default ports, fragments and a
+    trailing slash, and sorts query parameters; wildcard patterns such as
+    https://site.com/* are kept as-is apart from that.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and str(parts.port) != _DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    path = parts.path.rstrip("/") if parts.path not in ("", "/") else ""
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, host, path, query, ""))
+
+
+def _digest(payload: Any) -> str:
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, separators=(",", ":")).encode("utf-8")).hexdigest()
+
+
+def extract_cache_key(urls: List[str], prompt: str, schema: Dict[str, Any]) -> str:
+    # One extract job merges all its URLs, so their order does not matter
+    return _digest({"urls": sorted({normalize_url(url) for url in urls}), "prompt": prompt, "schema": _digest(schema)})
+
+
+def screenshot_cache_key(url: str, options: Dict[str, Any]) -> str:
+    return _digest({"url": normalize_url(url), "options": _digest(options)})
+
+
+class FirecrawlCache:
+    """TTL cache with stale-while-revalidate for Firecrawl extracts and screenshots.
+
+    Extracts are keyed by (normalized URLs, prompt, schema hash), screenshots
+    by (normalized URL, options hash); both live in SQLite-backed SWRCaches.
+    Screenshot images live in the ScreenshotStore and the cached JSON only
+    references them; an entry whose image was evicted counts as a miss.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        store: ScreenshotStore,
+        extract_ttl: float,
+        screenshot_ttl: float,
+        stale_seconds: float,
+        memory_entries: int,
+    ) -> None:
+        self.extracts = SWRCache(db_path, "firecrawl_extracts", extract_ttl, stale_seconds, memory_entries)
+        self.screenshots = SWRCache(db_path, "firecrawl_screenshots", screenshot_ttl, stale_seconds, memory_entries)
+        self.store = store
+
+    async def aextract(
+        self, urls: List[str], prompt: str, schema: Dict[str, Any], fetch: Callable[[], Awaitable[Dict[str, Any]]], bypass: bool = False
+    ) -> Tuple[Dict[str, Any], str]:
+        return await self.extracts.aget_or_fetch(extract_cache_key(urls, prompt, schema), fetch, bypass)
+
+    async def ascreenshot(
+        self,
+        url: str,
+        options: Dict[str, Any],
+        fetch: Callable[[], Awaitable[Dict[str, Any]]],
+        bypass: bool = False,
+        delivery: str = "inline",
+    ) -> Tuple[Dict[str, Any], str]:
+        """Cached screenshot and its status; `delivery` is "inline" (as
+        Firecrawl returned it) or "url" (see ScreenshotStore.areferenced)."""
+        key = screenshot_cache_key(url, options)
+
+        async def _render(entry: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+            if delivery == "inline":
+                return await self.store.ainline(entry)
+            return await self.store.areferenced(entry)
+
+        async def _fetch_and_store() -> Dict[str, Any]:
+            return await self.store.astore(await fetch())
+
+        entry, status = await self.screenshots.aget_or_fetch(key, _fetch_and_store, bypass)
+        result = await _render(entry)
+        if result is None:
+            # Image evicted from disk: refetch instead of returning a dangling reference
+            await self.screenshots.adelete(key)
+            entry, status = (await self.screenshots.aget_or_fetch(key, _fetch_and_store))[0], MISS
+            result = await _render(entry) or entry
+        return result, status
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "extracts": self.extracts.stats(),
+            "screenshots": self.screenshots.stats(),
+        }
+
+
+_cache: Optional[FirecrawlCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_firecrawl_cache() -> Optional[FirecrawlCache]:
+    """Return the Firecrawl cache, or None unless FIRECRAWL_CACHE_ENABLED=1.
+
+    FIRECRAWL_CACHE_TTL (extracts, default 600s), FIRECRAWL_SCREENSHOT_CACHE_TTL
+    (default 3600s), FIRECRAWL_CACHE_STALE_TTL (extra seconds an expired entry
+    may be served while it refreshes, default 3600), FIRECRAWL_CACHE_PATH
+    (SQLite file) and FIRECRAWL_CACHE_MEMORY_SIZE (default 512 entries)
+    configure it; images go to the shared ScreenshotStore.
+    """
+    global _cache
+    if os.environ.get("FIRECRAWL_CACHE_ENABLED", "0") not in ("1", "true", "True"):
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = FirecrawlCache(
+                    db_path=os.environ.get("FIRECRAWL_CACHE_PATH")
+                    or os.path.join(tempfile.gettempdir(), "handy-firecrawl-cache.sqlite3"),
+                    store=get_screenshot_store(),
+                    extract_ttl=float(os.environ.get("FIRECRAWL_CACHE_TTL", "600")),
+                    screenshot_ttl=float(os.environ.get("FIRECRAWL_SCREENSHOT_CACHE_TTL", "3600")),
+                    stale_seconds=float(os.environ.get("FIRECRAWL_CACHE_STALE_TTL", "3600")),
+                    memory_entries=int(os.environ.get("FIRECRAWL_CACHE_MEMORY_SIZE", "512")),
+                )
+    return _cache
+
+
+async def acached_extract(
+    urls: List[str], prompt: str, schema: Dict[str, Any], fetch: Callable[[], Awaitable[Dict[str, Any]]], bypass: bool = False
+) -> Tuple[Dict[str, Any], Optional[str]]:
+    """`fetch()` through the extract cache; status is None when caching is off."""
+    cache = get_firecrawl_cache()
+    if cache is None:
+        return await fetch(), None
+    return await cache.aextract(urls, prompt, schema, fetch, bypass)
+
+
+async def acached_screenshot(
+    url: str,
+    options: Dict[str, Any],
+    fetch: Callable[[], Awaitable[Dict[str, Any]]],
+    bypass: bool = False,
+    delivery: str = "inline",
+) -> Tuple[Dict[str, Any], Optional[str]]:
+    """`fetch()` through the screenshot cache; status is None when caching is off.
+
+    With delivery="url" the image is moved to the ScreenshotStore either way
+    and the response carries `screenshot_url` instead of the image.
+    """
+    cache = get_firecrawl_cache()
+    if cache is None:
+        result = await fetch()
+        if delivery == "url":
+            store = get_screenshot_store()
+            entry = await store.astore(result)
+            result = await store.areferenced(entry) or entry
+        return result, None
+    return await cache.ascreenshot(url, options, fetch, bypass, delivery)
@@ -0,0 +1,289 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import os
+import threading
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import httpx
+from dotenv import load_dotenv
+
+from ..utils.concurrency import get_limiter
+from ..utils.memory_lru import MemoryLRUCache
+from .firecrawl_cache import acached_extract
+
+load_dotenv()
+
+
+class FirecrawlError(RuntimeError):
+    """Firecrawl rejected a request or a job failed."""
+
+
+@dataclass(frozen=True)
+class FirecrawlConfig:
+    """Connection, polling and fan-out settings for the Firecrawl gateway."""
+
+    api_url: str = "https://api.firecrawl.dev"
+    max_connections: int = 64
+    max_keepalive_connections: int = 16
+    keepalive_expiry: float = 60.0
+    connect_timeout: float = 10.0
+    request_timeout: float = 60.0
+    poll_interval: float = 1.0
+    url_timeout: float = 180.0
+    url_concurrency: int = 8
+    client_cache_size: int = 32
+
+    @classmethod
+    def from_env(cls) -> "FirecrawlConfig":
+        return cls(
+            api_url=os.environ.get("FIRECRAWL_API_URL", cls.api_url).rstrip("/"),
+            max_connections=int(os.environ.get("FIRECRAWL_MAX_CONNECTIONS", cls.max_connections)),
+            max_keepalive_connections=int(os.environ.get("FIRECRAWL_MAX_KEEPALIVE", cls.max_keepalive_connections)),
+            keepalive_expiry=float(os.environ.get("FIRECRAWL_KEEPALIVE_EXPIRY", cls.keepalive_expiry)),
+            connect_timeout=float(os.environ.get("FIRECRAWL_CONNECT_TIMEOUT", cls.connect_timeout)),
+            request_timeout=float(os.environ.get("FIRECRAWL_TIMEOUT", cls.request_timeout)),
+            poll_interval=float(os.environ.get("FIRECRAWL_POLL_INTERVAL", cls.poll_interval)),
+            url_timeout=float(os.environ.get("FIRECRAWL_URL_TIMEOUT", cls.url_timeout)),
+            url_concurrency=int(os.environ.get("FIRECRAWL_URL_CONCURRENCY", cls.url_concurrency)),
+            client_cache_size=int(os.environ.get("FIRECRAWL_CLIENT_CACHE_SIZE", cls.client_cache_size)),
+        )
+
+
+def _response_json(response: httpx.Response, what: str) -> Dict[str, Any]:
+    try:
+        body = response.json()
+    except ValueError:
+        body = None
+    if response.status_code != 200 or not isinstance(body, dict):
+        detail = body.get("error") if isinstance(body, dict) else response.text[:200]
+        raise FirecrawlError(f"Firecrawl {what} failed ({response.status_code}): {detail}")
+    if body.get("success") is False:
+        raise FirecrawlError(f"Firecrawl {what} failed: {body.get('error')}")
+    return body
+
+
+def _extract_payload(urls: List[str], prompt: str, schema: Dict[str, Any]) -> Dict[str, Any]:
+    return {"urls": urls, "prompt": prompt, "schema": schema}
+
+
+def _job_result(job_id: str, status: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """The finished job as returned to callers, or None while it is still running."""
+    state = status.get("status")
+    if state == "completed":
+        return status
+    if state in ("failed", "cancelled"):
+        raise FirecrawlError(f"Extract job {job_id} {state}: {status.get('error')}")
+    return None
+
+
+class FirecrawlClient:
+    """Firecrawl REST client for one API key.
+
+    Holds a pooled keep-alive httpx.AsyncClient that every request made with
+    this key reuses, instead of a fresh SDK instance and connection per
+    call. Extract jobs are started and then polled every `poll_interval`
+    seconds until they finish. A client the gateway has retired closes its
+    pool as soon as no call is using it any more.
+    """
+
+    def __init__(self, api_key: Optional[str], config: FirecrawlConfig) -> None:
+        self.config = config
+        headers = {"Content-Type": "application/json"}
+        if api_key:
+            headers["Authorization"] = f"Bearer {api_key}"
+        limits = httpx.Limits(
+            max_connections=config.max_connections,
+            max_keepalive_connections=config.max_keepalive_connections,
+            keepalive_expiry=config.keepalive_expiry,
+        )
+        timeout = httpx.Timeout(config.request_timeout, connect=config.connect_timeout)
+        self.async_http_client = httpx.AsyncClient(base_url=config.api_url, headers=headers, limits=limits, timeout=timeout)
+        self._active = 0
+        self._retired = False
+        self._close_task: Optional[asyncio.Task] = None
+
+    @asynccontextmanager
+    async def in_use(self) -> AsyncIterator["FirecrawlClient"]:
+        """Keep the pool open for the duration of the block."""
+        self._active += 1
+        try:
+            yield self
+        finally:
+            self._active -= 1
+            if self._retired and not self._active:
+                await self.aclose()
+
+    def retire(self) -> None:
+        """Close the pool now, or when the last in_use() block exits."""
+        self._retired = True
+        if self._active:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            asyncio.run(self.aclose())
+            return
+        self._close_task = loop.create_task(self.aclose())
+
+    async def astart_extract(self, urls: List[str], prompt: str, schema: Dict[str, Any]) -> str:
+        response = await self.async_http_client.post("/v1/extract", json=_extract_payload(urls, prompt, schema))
+        body = _response_json(response, "extract")
+        if not body.get("id"):
+            raise FirecrawlError("Firecrawl extract did not return a job id")
+        return body["id"]
+
+    async def aextract_status(self, job_id: str) -> Dict[str, Any]:
+        return _response_json(await self.async_http_client.get(f"/v1/extract/{job_id}"), "extract status")
+
+    async def aextract(self, urls: List[str], prompt: str, schema: Dict[str, Any]) -> Dict[str, Any]:
+        async with self.in_use():
+            job_id = await self.astart_extract(urls, prompt, schema)
+            while True:
+                result = _job_result(job_id, await self.aextract_status(job_id))
+                if result is not None:
+                    return result
+                await asyncio.sleep(self.config.poll_interval)
+
+    async def ascrape(self, url: str, options: Dict[str, Any]) -> Dict[str, Any]:
+        async with self.in_use():
+            response = await self.async_http_client.post("/v2/scrape", json={**options, "url": url})
+            return _response_json(response, "scrape")
+
+    async def aclose(self) -> None:
+        await self.async_http_client.aclose()
+
+
+class FirecrawlGateway:
+    """Process-wide entry point for Firecrawl calls.
+
+    Keeps one FirecrawlClient per API key (LRU-bounded by
+    FIRECRAWL_CLIENT_CACHE_SIZE, evicted clients are retired so their pools
+    close; no key falls back to FIRECRAWL_API_KEY) and
+    fans multi-URL extractions out into one job per URL, each under a
+    timeout, with at most `url_concurrency` running per request and every
+    upstream call holding a slot of the global "firecrawl" limiter.
+    """
+
+    def __init__(self, config: Optional[FirecrawlConfig] = None) -> None:
+        self.config = config or FirecrawlConfig.from_env()
+        self._clients: MemoryLRUCache[FirecrawlClient] = MemoryLRUCache(
+            self.config.client_cache_size, on_evict=lambda _key, client: client.retire()
+        )
+        self._lock = threading.Lock()
+        self.url_jobs = 0
+        self.url_failures = 0
+        self.url_timeouts = 0
+
+    def client(self, api_key: Optional[str] = None) -> FirecrawlClient:
+        api_key = api_key or os.environ.get("FIRECRAWL_API_KEY")
+        # Keys are only held by the client itself, never used as cache keys
+        key = hashlib.sha256((api_key or "").encode("utf-8")).hexdigest()
+        cached = self._clients.get(key)
+        if cached is not None:
+            return cached
+        with self._lock:
+            cached = self._clients.get(key)
+            if cached is not None:
+                return cached
+            return self._clients.put(key, FirecrawlClient(api_key, self.config))
+
+    async def aextract_url(
+        self, client: FirecrawlClient, url: str, prompt: str, schema: Dict[str, Any], timeout: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """One URL (or URL pattern) as its own extract job; raises on failure or timeout."""
+        timeout = timeout or self.config.url_timeout
+        with self._lock:
+            self.url_jobs += 1
+        try:
+            async with get_limiter("firecrawl"):
+                return await asyncio.wait_for(client.aextract([url], prompt, schema), timeout)
+        except asyncio.TimeoutError:
+            with self._lock:
+                self.url_timeouts += 1
+            raise FirecrawlError(f"Timed out after {timeout:g}s")
+        except Exception:
+            with self._lock:
+                self.url_failures += 1
+            raise
+
+    async def astream_extract(
+        self,
+        urls: List[str],
+        prompt: str,
+        schema: Dict[str, Any],
+        api_key: Optional[str] = None,
+        max_concurrency: Optional[int] = None,
+        timeout: Optional[float] = None,
+        bypass_cache: bool = False,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Extract each URL as its own job and yield {index, url, data, error,
+        cache} in completion order; a failed or timed-out URL does not stop
+        the rest. Each URL goes through the Firecrawl cache when it is
+        enabled (`cache` is its status, else None). Jobs still running when
+        the consumer stops are cancelled."""
+        client = self.client(api_key)
+        limit = max(1, min(max_concurrency or self.config.url_concurrency, self.config.url_concurrency))
+        semaphore = asyncio.Semaphore(limit)
+
+        async def _one(index: int, url: str) -> Dict[str, Any]:
+            async with semaphore:
+                try:
+                    result, status = await acached_extract(
+                        [url], prompt, schema, lambda: self.aextract_url(client, url, prompt, schema, timeout), bypass_cache
+                    )
+                except Exception as exc:
+                    print(f"[FIRECRAWL] {url} failed: {exc}")
+                    return {"index": index, "url": url, "data": None, "error": str(exc), "cache": None}
+                return {"index": index, "url": url, "data": result.get("data"), "error": None, "cache": status}
+
+        async with client.in_use():
+            tasks = [asyncio.ensure_future(_one(index, url)) for index, url in enumerate(urls)]
+            try:
+                for next_done in asyncio.as_completed(tasks):
+                    yield await next_done
+            finally:
+                for task in tasks:
+                    if not task.done():
+                        task.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "api_url": self.config.api_url,
+                "clients": self._clients.stats(),
+                "url_concurrency": self.config.url_concurrency,
+                "url_timeout_seconds": self.config.url_timeout,
+                "url_jobs": self.url_jobs,
+                "url_failures": self.url_failures,
+                "url_timeouts": self.url_timeouts,
+            }
+
+    async def aclose(self) -> None:
+        for client in self._clients.values():
+            await client.aclose()
+        self._clients.clear()
+
+
+_gateway: Optional[FirecrawlGateway] = None
+_gateway_lock = threading.Lock()
+
+
+def get_firecrawl_gateway() -> FirecrawlGateway:
+    global _gateway
+    if _gateway is None:
+        with _gateway_lock:
+            if _gateway is None:
+                _gateway = FirecrawlGateway()
+    return _gateway
+
+
+async def shutdown_firecrawl_gateway() -> None:
+    global _gateway
+    with _gateway_lock:
+        gateway, _gateway = _gateway, None
+    if gateway is not None:
+        await gateway.aclose()
@@ -1,31 +1,68 @@
 from __future__ import annotations
 
+import hashlib
 import io
+import json
 import os
-from typing import Optional
+import shutil
+import tempfile
+import zipfile
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple
 
 import pdfkit
 
-from ..utils.pdf_utils import (
-    rewrite_tailwind_play_to_static,
-    rewrite_local_css_hrefs_to_file_urls,
-)
+from ..utils.disk_lru import DiskLRUCache
+from ..utils.pdf_utils import rewrite_html_for_pdf
 
 
-def render_html_to_pdf_bytes(html: str, javascript_delay_ms: int = 2000) -> bytes:
-    """Render HTML to PDF bytes using wkhtmltopdf via pdfkit.
+@dataclass
+class PreparedRender:
+    html: str
+    options: Dict[str, Any]
+    key: str
+
+
+_render_cache: Optional[DiskLRUCache] = None
+
+
+def get_render_cache() -> DiskLRUCache:
+    """Process-wide on-disk cache of rendered PDFs keyed by render hash.
+
+    Configured with PDF_CACHE_DIR and PDF_CACHE_MAX_BYTES (default 512 MB).
+    """
+    global _render_cache
+    if _render_cache is None:
+        directory = os.environ.get("PDF_CACHE_DIR") or os.path.join(tempfile.gettempdir(), "handy-pdf-cache")
+        max_bytes = int(os.environ.get("PDF_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+        _render_cache = DiskLRUCache(directory, max_bytes, suffix=".pdf")
+    return _render_cache
+
+
+def _purge_css_default() -> bool:
+    return os.environ.get("PDF_PURGE_CSS", "1") not in ("0", "false", "False")
+
+
+def prepare_render(
+    html: str, javascript_delay_ms: int = 2000, purge_css: Optional[bool] = None, safelist: Iterable[str] = ()
+) -> PreparedRender:
+    """Apply all HTML rewrites and compute the content hash of the render.
 
     - Rewrites Tailwind Play CDN to a static CSS link for deterministic rendering
-    - Rewrites local CSS hrefs to absolute file:/// URLs within /app
+    - Inlines local stylesheets purged down to the classes the document uses
+      and `safelist` (purge_css None follows PDF_PURGE_CSS, default on)
+    - Rewrites remaining local CSS hrefs to absolute file:/// URLs within /app
     - Enables JS and adds a small delay for any runtime scripts
-    """
 
-    html_input = rewrite_tailwind_play_to_static(html)
-    html_input = rewrite_local_css_hrefs_to_file_urls(html_input)
+    All HTML rewrites run in one pass (see rewrite_html_for_pdf). The key
+    is sha256 over the rewritten HTML and the wkhtmltopdf options.
+    """
+    if purge_css is None:
+        purge_css = _purge_css_default()
 
-    # Configure wkhtmltopdf binary if set
-    wkhtml = os.environ.get("WKHTMLTOPDF_CMD")
-    config = pdfkit.configuration(wkhtmltopdf=wkhtml) if wkhtml else None
+    html_input = rewrite_html_for_pdf(html, purge_css=purge_css, safelist=safelist)
 
     options = {
         "enable-javascript": None,
@@ -36,6 +73,167 @@ def render_html_to_pdf_bytes(html: str, javascript_delay_ms: int = 2000) -> byte
         "enable-local-file-access": None,
     }
 
-    return pdfkit.from_string(html_input, False, configuration=config, options=options)
+    digest = hashlib.sha256()
+    digest.update(html_input.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(json.dumps(options, sort_keys=True).encode("utf-8"))
+    return PreparedRender(html=html_input, options=options, key=digest.hexdigest())
+
+
+def _get_pdfkit_configuration():
+    # Configure wkhtmltopdf binary if set
+    wkhtml = os.environ.get("WKHTMLTOPDF_CMD")
+    return pdfkit.configuration(wkhtmltopdf=wkhtml) if wkhtml else None
+
+
+def render_prepared_to_pdf_bytes(prepared: PreparedRender) -> bytes:
+    config = _get_pdfkit_configuration()
+    return pdfkit.from_string(prepared.html, False, configuration=config, options=prepared.options)
+
+
+def render_prepared_to_file(prepared: PreparedRender, output_path: Path) -> Path:
+    """Render straight to a file so the PDF is never held in process memory."""
+    config = _get_pdfkit_configuration()
+    pdfkit.from_string(prepared.html, str(output_path), configuration=config, options=prepared.options)
+    return output_path
+
+
+def render_html_to_pdf_bytes(html: str, javascript_delay_ms: int = 2000, purge_css: Optional[bool] = None) -> bytes:
+    """Render HTML to PDF bytes using wkhtmltopdf via pdfkit (see prepare_render)."""
+    return render_prepared_to_pdf_bytes(prepare_render(html, javascript_delay_ms, purge_css))
+
+
+def open_cached_render(prepared: PreparedRender) -> BinaryIO:
+    """Open the cached PDF for this render, rendering and storing it on a miss.
+
+    wkhtmltopdf writes into a temp file inside the cache directory which is
+    then renamed into place, so peak memory does not grow with PDF size.
+    The PDF is returned as a handle opened under the cache lock, so a
+    concurrent eviction cannot remove it before it is streamed.
+    """
+    cache = get_render_cache()
+    handle = cache.open(prepared.key)
+    if handle is not None:
+        return handle
+
+    fd, tmp_name = tempfile.mkstemp(dir=cache.directory, prefix=".tmp-", suffix=".part")
+    os.close(fd)
+    tmp_path = Path(tmp_name)
+    try:
+        render_prepared_to_file(prepared, tmp_path)
+        return cache.put_file_open(prepared.key, tmp_path)
+    except Exception:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+def iter_file_chunks(handle: BinaryIO, chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+    """Yield an open binary file in chunks and close it when exhausted."""
+    try:
+        while True:
+            chunk = handle.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        handle.close()
+
+
+class _ZipStreamBuffer(io.RawIOBase):
+    """Write-only sink for zipfile that hands written bytes back via drain().
+
+    zipfile detects that the stream is not seekable and writes data
+    descriptors, so entries can be emitted as soon as they are complete.
+    """
+
+    def __init__(self) -> None:
+        self._chunks: List[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:  # type: ignore[override]
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _batch_entry_names(names: List[Optional[str]]) -> List[str]:
+    entries: List[str] = []
+    seen = set()
+    for index, name in enumerate(names, start=1):
+        base = os.path.basename((name or "").replace("\\", "/")).strip() or f"document-{index}"
+        if not base.lower().endswith(".pdf"):
+            base = f"{base}.pdf"
+        if base in seen:
+            base = f"{index}-{base}"
+        seen.add(base)
+        entries.append(base)
+    return entries
+
+
+def iter_batch_pdf_zip(
+    documents: List[Tuple[Optional[str], str]],
+    max_workers: Optional[int] = None,
+    purge_css: Optional[bool] = None,
+    safelist: Iterable[str] = (),
+) -> Iterator[bytes]:
+    """Render many HTML documents concurrently and yield a ZIP archive as a byte stream.
+
+    Each PDF is appended to the archive as soon as its render finishes. A
+    failed render adds `<name>.error.txt` instead of aborting the batch, and
+    a final `manifest.json` lists the outcome of every document.
+    `purge_css` and `safelist` apply to every document (see prepare_render).
+    Concurrency is bounded by PDF_BATCH_MAX_WORKERS (default 4).
+    """
+    limit = int(os.environ.get("PDF_BATCH_MAX_WORKERS", "4"))
+    workers = max(1, min(max_workers or limit, limit, len(documents)))
+    entry_names = _batch_entry_names([name for name, _ in documents])
+
+    def _render(index: int) -> BinaryIO:
+        # Open in the worker so the PDF cannot be evicted before it is copied
+        return open_cached_render(prepare_render(documents[index][1], purge_css=purge_css, safelist=safelist))
+
+    consumed = set()
+    abandoned = False
 
+    def _close_if_abandoned(future: Future) -> None:
+        # Renders still running when the client goes away finish later; close their handles then
+        if abandoned and future not in consumed and not future.cancelled() and future.exception() is None:
+            future.result().close()
 
+    sink = _ZipStreamBuffer()
+    manifest: List[Dict[str, Any]] = [{}] * len(documents)
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pdf-batch")
+    futures: Dict[Future, int] = {}
+    try:
+        futures = {executor.submit(_render, i): i for i in range(len(documents))}
+        for future in futures:
+            future.add_done_callback(_close_if_abandoned)
+        with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_STORED) as archive:
+            for future in as_completed(futures):
+                consumed.add(future)
+                index = futures[future]
+                name = entry_names[index]
+                try:
+                    with future.result() as src, archive.open(name, "w", force_zip64=True) as dst:
+                        shutil.copyfileobj(src, dst, 64 * 1024)
+                    manifest[index] = {"index": index, "name": name, "success": True, "error": None}
+                except Exception as exc:
+                    print(f"[PDF_BATCH] Document {index} ({name}) failed: {exc}")
+                    archive.writestr(f"{name}.error.txt", str(exc))
+                    manifest[index] = {"index": index, "name": name, "success": False, "error": str(exc)}
+                yield sink.drain()
+            archive.writestr("manifest.json", json.dumps({"documents": manifest}, indent=2))
+        yield sink.drain()
+    finally:
+        abandoned = True
+        executor.shutdown(wait=False, cancel_futures=True)
+        # Renders that already finished but were never streamed; later ones close via the callback
+        for future in futures:
+            if future.done():
+                _close_if_abandoned(future)
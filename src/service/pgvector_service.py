@@ -13,7 +13,8 @@ from pgvector.sqlalchemy import Vector
 
 from ..service.text_extraction_service import extract_text
 from ..utils.schema_builder import build_pydantic_model
-from langchain_openai import OpenAIEmbeddings
+from ..ai_models.openai_model import get_openai_embeddings
+from ..utils.single_flight import flight_key, get_single_flight
 
 
 @dataclass
@@ -71,9 +72,11 @@ def chunk_text(text: str, chunk_size: int = 800, overlap: int = 120) -> List[str
 
 def embed_texts(texts: List[str]) -> List[List[float]]:
     print(f"[EMBED] Creating embeddings for {len(texts)} text chunks")
-    embedder = OpenAIEmbeddings(model="text-embedding-3-small", api_key=os.environ.get("OPENAI_API_KEY"))
+    embedder = get_openai_embeddings("text-embedding-3-small")
     print(f"[EMBED] Calling OpenAI API...")
-    embeddings = embedder.embed_documents(texts)
+    # Concurrent identical requests (e.g. the same /chat query) share one call
+    key = flight_key("text-embedding-3-small", texts)
+    embeddings = get_single_flight("embeddings").do(key, lambda: embedder.embed_documents(texts))
     print(f"[EMBED] Received {len(embeddings)} embeddings, each with {len(embeddings[0]) if embeddings else 0} dimensions")
     return embeddings
 
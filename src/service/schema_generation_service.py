@@ -5,28 +5,37 @@ import uuid
 from typing import Tuple, List
 
 from ..ai_models.openai_model import get_openai_chat_model
+from ..ai_models.prompt_cache_stats import usage_config
+from ..utils.concurrency import get_limiter
 
 
-def generate_database_schema(project_description: str, additional_requirements: str = None, model: str = "gpt-4o-mini", temperature: float = 0.1) -> Tuple[bool, str, str, List[str], str, str]:
-    """
-    Generate a database schema based on project description.
-    
-    Returns:
-        Tuple of (success: bool, sql_schema: str, app_uuid: str, tables: List[str], explanation: str, error_message: str)
-    """
-    print(f"[SCHEMA_GEN] Starting schema generation")
-    print(f"[SCHEMA_GEN] Project: {project_description[:100]}...")
-    
-    try:
-        # Generate unique UUID for this app
-        app_uuid = str(uuid.uuid4()).replace('-', '')[:8]  # Use first 8 chars for readability
-        print(f"[SCHEMA_GEN] Generated app UUID: {app_uuid}")
-        
-        # Build the system prompt for schema generation
-        system_prompt = f"""You are a database architect that creates SIMPLE and RELIABLE PostgreSQL schemas for web applications.
+# Placeholder the model writes as the table-name suffix. Keeping the real
+# app UUID out of the system prompt makes it byte-identical across requests,
+# so OpenAI can serve it from its prompt cache; the UUID is substituted into
+# the returned SQL instead.
+_UUID_PLACEHOLDER = "APPUUID"
+
+# Names created by the schema; each must end with "_<app_uuid>". A name is
+# only taken where one must stand, so keywords of unnamed indexes
+# ("CREATE INDEX ON t(...)") are never mistaken for one
+_CREATED_NAME = re.compile(
+    r'\bCREATE\s+(?:UNIQUE\s+)?(?:'
+    r'TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?(?!(?:IF|ON)\b)(\w+)\s*(?:\(|\bAS\b)'
+    r'|INDEX\s+(?:CONCURRENTLY\s+)?(?:IF\s+NOT\s+EXISTS\s+)?(?!(?:IF|ON|CONCURRENTLY)\b)(\w+)\s+ON\b'
+    r')',
+    re.IGNORECASE,
+)
+# Positions where a table or index name is referenced (renames only apply there)
+_NAME_POSITION = (
+    r'\b(?:(?:TABLE|INDEX)(?:\s+CONCURRENTLY)?(?:\s+IF(?:\s+NOT)?\s+EXISTS)?'
+    r'|REFERENCES|ON|FROM|JOIN|INTO|UPDATE)\s+'
+)
+_SQL_STRING = r"'(?:[^']|'')*'"
+
+_SCHEMA_SYSTEM_PROMPT = """You are a database architect that creates SIMPLE and RELIABLE PostgreSQL schemas for web applications.
 
 CRITICAL REQUIREMENTS:
-1. All table names MUST be postfixed with "_{app_uuid}" (e.g., "users_{app_uuid}", "products_{app_uuid}")
+1. All table and index names MUST end with the literal suffix "_APPUUID" (e.g., "users_APPUUID", "products_APPUUID"); it is replaced with the app UUID afterwards
 2. Always include an 'id' column as SERIAL PRIMARY KEY for each table
 3. Use ONLY basic PostgreSQL data types: VARCHAR, TEXT, INTEGER, DECIMAL, BOOLEAN, TIMESTAMP
 4. Include created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP for each table
@@ -50,14 +59,14 @@ FORBIDDEN - DO NOT USE:
 Keep it SIMPLE and RELIABLE. Focus on basic table structure that works.
 
 Example output format:
-CREATE TABLE users_{app_uuid} (
+CREATE TABLE users_APPUUID (
     id SERIAL PRIMARY KEY,
     username VARCHAR(100) UNIQUE NOT NULL,
     email VARCHAR(255) UNIQUE NOT NULL,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
-CREATE TABLE articles_{app_uuid} (
+CREATE TABLE articles_APPUUID (
     id SERIAL PRIMARY KEY,
     title VARCHAR(500) NOT NULL,
     content TEXT,
@@ -65,51 +74,126 @@ CREATE TABLE articles_{app_uuid} (
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
-CREATE INDEX idx_users_{app_uuid}_email ON users_{app_uuid}(email);
-CREATE INDEX idx_articles_{app_uuid}_title ON articles_{app_uuid}(title);
+CREATE INDEX idx_users_email_APPUUID ON users_APPUUID(email);
+CREATE INDEX idx_articles_title_APPUUID ON articles_APPUUID(title);
 
 Return ONLY the SQL schema - no explanations, no markdown, no complex features."""
-        
-        # Build user prompt
-        user_prompt = f"Project Description: {project_description}"
-        if additional_requirements:
-            user_prompt += f"\n\nAdditional Requirements: {additional_requirements}"
-        
+
+
+def _schema_messages(project_description: str, additional_requirements: str | None) -> list:
+    # Build user prompt
+    user_prompt = f"Project Description: {project_description}"
+    if additional_requirements:
+        user_prompt += f"\n\nAdditional Requirements: {additional_requirements}"
+
+    print(f"[SCHEMA_GEN] User prompt: {user_prompt}")
+    return [
+        {"role": "system", "content": _SCHEMA_SYSTEM_PROMPT},
+        {"role": "user", "content": user_prompt}
+    ]
+
+
+def _apply_app_uuid(sql_schema: str, app_uuid: str) -> str:
+    sql_schema = re.sub(r'_' + _UUID_PLACEHOLDER + r'(?![A-Za-z0-9])', f"_{app_uuid}", sql_schema, flags=re.IGNORECASE)
+    return _enforce_uuid_suffix(sql_schema, app_uuid)
+
+
+def _enforce_uuid_suffix(sql_schema: str, app_uuid: str) -> str:
+    """Make every CREATE TABLE/INDEX name end with the app UUID suffix.
+
+    The model does not always follow the placeholder instructions (suffix
+    dropped, misspelled, or followed by more text like "_APPUUID_2"), and
+    such tables would land unisolated in the shared database. Offending
+    names are renamed, with any misplaced suffix moved to the end, and so
+    are their references where SQL expects a table or index name (after
+    TABLE/INDEX, REFERENCES, ON, FROM, JOIN, INTO, UPDATE); columns that
+    share a table's name and string literals are left alone.
+    """
+    suffix = f"_{app_uuid}"
+    misplaced = re.compile(re.escape(suffix) + r'(?![A-Za-z0-9])', re.IGNORECASE)
+    renames = {}
+    for table, index in _CREATED_NAME.findall(sql_schema):
+        name = table or index
+        if not name.lower().endswith(suffix.lower()):
+            renames[name.lower()] = misplaced.sub("", name) + suffix
+    if not renames:
+        return sql_schema
+
+    print(f"[SCHEMA_GEN] Adding missing UUID suffix to: {sorted(renames)}")
+    names = '|'.join(re.escape(name) for name in renames)
+    pattern = re.compile(_SQL_STRING + r'|(' + _NAME_POSITION + r')(' + names + r')\b', re.IGNORECASE)
+    return pattern.sub(lambda m: m.group(1) + renames[m.group(2).lower()] if m.group(2) else m.group(0), sql_schema)
+
+
+def _new_app_uuid() -> str:
+    # Use first 8 chars for readability
+    app_uuid = str(uuid.uuid4()).replace('-', '')[:8]
+    print(f"[SCHEMA_GEN] Generated app UUID: {app_uuid}")
+    return app_uuid
+
+
+def _schema_result(sql_schema: str, project_description: str, app_uuid: str) -> Tuple[bool, str, str, List[str], str, str]:
+    print(f"[SCHEMA_GEN] Generated schema length: {len(sql_schema)} characters")
+
+    # Extract table names from the generated schema
+    tables = _extract_table_names(sql_schema, app_uuid)
+    print(f"[SCHEMA_GEN] Extracted {len(tables)} tables: {tables}")
+    if not tables:
+        return _schema_error(ValueError("no CREATE TABLE statements found in the generated schema"))
+
+    # Generate explanation
+    explanation = _generate_explanation(project_description, tables, app_uuid)
+
+    print(f"[SCHEMA_GEN] Schema generation completed successfully")
+    return True, sql_schema, app_uuid, tables, explanation, ""
+
+
+def _schema_error(e: Exception) -> Tuple[bool, str, str, List[str], str, str]:
+    error_msg = f"Error generating database schema: {str(e)}"
+    print(f"[SCHEMA_GEN] Error: {error_msg}")
+    return False, "", "", [], "", error_msg
+
+
+async def agenerate_database_schema(project_description: str, additional_requirements: str = None, model: str = "gpt-4o-mini", temperature: float = 0.1) -> Tuple[bool, str, str, List[str], str, str]:
+    """
+    Generate a database schema based on project description.
+
+    Returns:
+        Tuple of (success: bool, sql_schema: str, app_uuid: str, tables: List[str], explanation: str, error_message: str)
+    """
+    print(f"[SCHEMA_GEN] Starting schema generation")
+    print(f"[SCHEMA_GEN] Project: {project_description[:100]}...")
+
+    try:
+        app_uuid = _new_app_uuid()
+        messages = _schema_messages(project_description, additional_requirements)
+
         print(f"[SCHEMA_GEN] Calling OpenAI with model: {model}")
-        print(f"[SCHEMA_GEN] User prompt: {user_prompt}")
-        
-        # Generate schema using OpenAI
         chat_model = get_openai_chat_model(model, temperature)
-        messages = [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt}
-        ]
-        
-        response = chat_model.invoke(messages)
-        sql_schema = response.content.strip()
-        
-        print(f"[SCHEMA_GEN] Generated schema length: {len(sql_schema)} characters")
-        
-        # Extract table names from the generated schema
-        tables = _extract_table_names(sql_schema, app_uuid)
-        print(f"[SCHEMA_GEN] Extracted {len(tables)} tables: {tables}")
-        
-        # Generate explanation
-        explanation = _generate_explanation(project_description, tables, app_uuid)
-        
-        print(f"[SCHEMA_GEN] Schema generation completed successfully")
-        return True, sql_schema, app_uuid, tables, explanation, ""
-        
+        async with get_limiter("llm"):
+            response = await chat_model.ainvoke(messages, config=usage_config("generate_schema"))
+        return _schema_result(_apply_app_uuid(response.content.strip(), app_uuid), project_description, app_uuid)
+
     except Exception as e:
-        error_msg = f"Error generating database schema: {str(e)}"
-        print(f"[SCHEMA_GEN] Error: {error_msg}")
-        return False, "", "", [], "", error_msg
+        return _schema_error(e)
+
+
+def reuse_database_schema(sql_schema: str, old_uuid: str, project_description: str) -> Tuple[bool, str, str, List[str], str, str]:
+    """Re-issue a previously generated schema under a fresh app UUID.
+
+    Lets a cached schema be served again without two apps sharing tables;
+    same return tuple as agenerate_database_schema.
+    """
+    app_uuid = _new_app_uuid()
+    sql_schema = re.sub(r'_' + re.escape(old_uuid) + r'(?![A-Za-z0-9])', f"_{app_uuid}", sql_schema)
+    sql_schema = _enforce_uuid_suffix(sql_schema, app_uuid)
+    return _schema_result(sql_schema, project_description, app_uuid)
 
 
 def _extract_table_names(sql_schema: str, app_uuid: str) -> List[str]:
     """Extract table names from the generated SQL schema."""
     # Pattern to match CREATE TABLE statements
-    pattern = r'CREATE TABLE\s+(\w+_' + re.escape(app_uuid) + r')\s*\('
+    pattern = r'CREATE TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?(\w+_' + re.escape(app_uuid) + r')\s*\('
     matches = re.findall(pattern, sql_schema, re.IGNORECASE)
     return matches
 
@@ -0,0 +1,203 @@
+from __future__ import annotations
+
+import asyncio
+import base64
+import binascii
+import copy
+import hashlib
+import os
+import re
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Optional, Tuple
+
+import httpx
+
+from ..utils.disk_lru import DiskLRUCache
+
+_DIGEST_RE = re.compile(r"^[0-9a-f]{64}$")
+
+_MAGIC_TYPES = (
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"GIF8", "image/gif"),
+)
+
+
+def _decode_inline_image(value: str) -> Optional[Tuple[bytes, str]]:
+    """(bytes, prefix) for an inline screenshot, where prefix is the
+    "data:image/...;base64," header of a data URL or "" for bare base64;
+    None for hosted (URL) screenshots."""
+    if value.startswith(("http://", "https://")):
+        return None
+    prefix = ""
+    if value.startswith("data:"):
+        head, _, value = value.partition(",")
+        prefix = f"{head},"
+    try:
+        return base64.b64decode(value, validate=False), prefix
+    except (binascii.Error, ValueError):
+        return None
+
+
+def sniff_media_type(head: bytes) -> str:
+    """Image media type from the first bytes of a file (PNG when unknown)."""
+    for magic, media_type in _MAGIC_TYPES:
+        if head.startswith(magic):
+            return media_type
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    return "image/png"
+
+
+def screenshot_url(digest: str) -> str:
+    return f"/screenshot/{digest}"
+
+
+class ScreenshotStore:
+    """Content-addressed on-disk store for screenshot images.
+
+    A Firecrawl screenshot (inline base64 or a hosted URL) is decoded or
+    downloaded once and written under its sha256; the JSON that refers to it
+    carries `screenshot_sha256` and `screenshot_bytes` instead of the image.
+    Identical images are stored once. LRU-bounded by `max_bytes`. Hosted
+    images are downloaded over one pooled client, and disk I/O runs in worker
+    threads so it never blocks the event loop.
+    """
+
+    def __init__(self, directory: str | Path, max_bytes: int) -> None:
+        self.blobs = DiskLRUCache(directory, max_bytes, suffix=".img")
+        self._lock = threading.Lock()
+        self._http_client: Optional[httpx.AsyncClient] = None
+        self.downloads = 0
+        self.decoded = 0
+
+    async def astore(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Copy of `result` with the screenshot moved to the store.
+
+        Inline screenshots keep only their data-URL header (with
+        `screenshot_inline`) so `inline()` can rebuild them; hosted ones keep
+        their URL. Results without a screenshot are returned unchanged.
+        """
+        data = result.get("data") if isinstance(result.get("data"), dict) else None
+        screenshot = data.get("screenshot") if data else None
+        if not isinstance(screenshot, str) or not screenshot:
+            return result
+        inline = _decode_inline_image(screenshot)
+        if inline is not None:
+            image, prefix = inline
+            with self._lock:
+                self.decoded += 1
+        else:
+            response = await self._client().get(screenshot)
+            response.raise_for_status()
+            image, prefix = response.content, None
+            with self._lock:
+                self.downloads += 1
+        digest = hashlib.sha256(image).hexdigest()
+        await asyncio.to_thread(self._put_blob, digest, image)
+
+        stored = copy.deepcopy(result)
+        stored["data"]["screenshot_sha256"] = digest
+        stored["data"]["screenshot_bytes"] = len(image)
+        if prefix is not None:
+            stored["data"]["screenshot"] = prefix
+            stored["data"]["screenshot_inline"] = True
+        return stored
+
+    def _client(self) -> httpx.AsyncClient:
+        with self._lock:
+            if self._http_client is None:
+                self._http_client = httpx.AsyncClient(timeout=60.0, follow_redirects=True)
+            return self._http_client
+
+    def _has_blob(self, digest: str) -> bool:
+        return self.blobs.get(digest) is not None
+
+    def _put_blob(self, digest: str, image: bytes) -> None:
+        if self.blobs.get(digest) is None:
+            self.blobs.put(digest, image)
+
+    def _read_blob(self, digest: str) -> Optional[bytes]:
+        handle = self.blobs.open(digest)
+        if handle is None:
+            return None
+        with handle:
+            return handle.read()
+
+    async def ainline(self, entry: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """`entry` as Firecrawl returned it (inline images re-inlined from
+        disk), or None if its image is no longer stored."""
+        data = entry.get("data") if isinstance(entry.get("data"), dict) else None
+        digest = data.get("screenshot_sha256") if data else None
+        if not digest:
+            return entry
+        if not data.get("screenshot_inline"):
+            return entry if await asyncio.to_thread(self._has_blob, digest) else None
+        image = await asyncio.to_thread(self._read_blob, digest)
+        if image is None:
+            return None
+        result = copy.deepcopy(entry)
+        result["data"]["screenshot"] = (data.get("screenshot") or "") + base64.b64encode(image).decode("ascii")
+        return result
+
+    async def areferenced(self, entry: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """`entry` with the image replaced by `screenshot_url` (served by
+        GET /screenshot/{sha256}), or None if its image is no longer stored."""
+        data = entry.get("data") if isinstance(entry.get("data"), dict) else None
+        digest = data.get("screenshot_sha256") if data else None
+        if not digest:
+            return entry
+        if not await asyncio.to_thread(self._has_blob, digest):
+            return None
+        result = copy.deepcopy(entry)
+        result["data"].pop("screenshot", None)
+        result["data"].pop("screenshot_inline", None)
+        result["data"]["screenshot_url"] = screenshot_url(digest)
+        return result
+
+    def open(self, digest: str) -> Optional[BinaryIO]:
+        """A stored image opened for reading, or None for unknown or malformed
+        digests. Opened under the store lock, so eviction cannot race it."""
+        if not _DIGEST_RE.match(digest):
+            return None
+        return self.blobs.open(digest)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"blobs": self.blobs.stats(), "downloads": self.downloads, "decoded": self.decoded}
+
+    async def aclose(self) -> None:
+        with self._lock:
+            client, self._http_client = self._http_client, None
+        if client is not None:
+            await client.aclose()
+
+
+_store: Optional[ScreenshotStore] = None
+_store_lock = threading.Lock()
+
+
+def get_screenshot_store() -> ScreenshotStore:
+    """Return the screenshot store, configured by FIRECRAWL_SCREENSHOT_DIR
+    (default: system temp dir) and FIRECRAWL_SCREENSHOT_CACHE_MAX_BYTES
+    (default 1 GB)."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = ScreenshotStore(
+                    os.environ.get("FIRECRAWL_SCREENSHOT_DIR")
+                    or os.path.join(tempfile.gettempdir(), "handy-firecrawl-screenshots"),
+                    int(os.environ.get("FIRECRAWL_SCREENSHOT_CACHE_MAX_BYTES", str(1024 * 1024 * 1024))),
+                )
+    return _store
+
+
+async def shutdown_screenshot_store() -> None:
+    global _store
+    with _store_lock:
+        store, _store = _store, None
+    if store is not None:
+        await store.aclose()
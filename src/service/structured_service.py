@@ -1,22 +1,66 @@
 from __future__ import annotations
 
-from typing import Any, Dict
+import hashlib
+from typing import Any, AsyncIterator, Callable, Dict, Tuple
 
 from langchain_core.messages import HumanMessage, SystemMessage
+from langchain_core.runnables import RunnableLambda
 from typing import List
 from langchain_openai import ChatOpenAI
 
-from ..ai_models.openai_model import get_openai_chat_model
-from ..utils.schema_builder import build_pydantic_model
+from ..ai_models.llm_invoke import ainvoke_llm
+from ..ai_models.openai_model import (
+    get_openai_chat_model,
+    get_streaming_structured_chat_model,
+    get_structured_chat_model,
+)
+from ..ai_models.prompt_cache_stats import usage_config
+from ..ai_models.upstream_scheduler import PRIORITY_BATCH, upstream_priority
+from ..utils.concurrency import get_limiter
+from ..utils.schema_builder import build_pydantic_model, structure_hash
+from ..utils.single_flight import flight_key, get_single_flight
 from ..utils.context_loader import load_v0_context
-from ..utils.v0_prompt_utils import load_v0_prompt_files
-from pydantic import BaseModel, Field
-from firecrawl import FirecrawlApp
+from ..utils.guide_ranker import ALWAYS_INCLUDED, LocalSelection, preselect_guides
+from ..utils.v0_prompt_utils import get_guide_catalog
+from .firecrawl_gateway import get_firecrawl_gateway
+from pydantic import BaseModel, Field, ValidationError
 from typing import Any
 import os
 
 
-def generate_structured_output(
+def _build_messages(system_prompt: str | None, user_content: Any) -> list:
+    messages = []
+    if system_prompt:
+        messages.append(SystemMessage(content=system_prompt))
+    messages.append(HumanMessage(content=user_content))
+    return messages
+
+
+def _build_vision_content(user_prompt: str, images: List[dict]) -> List[dict]:
+    # Build multimodal content for the user message (OpenAI-compatible)
+    content: List[dict] = [{"type": "text", "text": user_prompt}]
+    for img in images:
+        if img.get("source_type") == "base64":
+            # Accept multiple possible keys from frontend: data | b64 | base64
+            b64_data = img.get("data") or img.get("b64") or img.get("base64")
+            if b64_data:
+                # Accept both mime_type and mimeType
+                mime = img.get("mime_type") or img.get("mimeType") or "image/jpeg"
+                data_url = f"data:{mime};base64,{b64_data}"
+                content.append({"type": "image_url", "image_url": _image_url(data_url, img.get("detail"))})
+        elif img.get("source_type") == "url" and img.get("url"):
+            content.append({"type": "image_url", "image_url": _image_url(img["url"], img.get("detail"))})
+    return content
+
+
+def _image_url(url: str, detail: str | None) -> dict:
+    # "auto" (or no detail) leaves the choice to OpenAI
+    if detail in ("low", "high"):
+        return {"url": url, "detail": detail}
+    return {"url": url}
+
+
+async def agenerate_structured_output(
     system_prompt: str | None,
     user_prompt: str,
     structure: Dict[str, Any],
@@ -30,29 +74,53 @@ def generate_structured_output(
     Reference: LangChain structured outputs docs
     https://python.langchain.com/docs/concepts/structured_outputs/
     """
-
-    # 1) Build Pydantic model dynamically
     output_model = build_pydantic_model(structure)
-
-    # 2) Create chat model
-    chat_model: ChatOpenAI = get_openai_chat_model(model_name, temperature)
-
-    # 3) Bind schema using with_structured_output per docs
-    structured_model = chat_model.with_structured_output(output_model)
-
-    # 4) Compose messages with optional system prompt
-    messages = []
-    if system_prompt:
-        messages.append(SystemMessage(content=system_prompt))
-    messages.append(HumanMessage(content=user_prompt))
-
-    result_obj = structured_model.invoke(messages)
-
-    # 5) Convert returned Pydantic object to dict
+    key = structure_hash(structure)
+    messages = _build_messages(system_prompt, user_prompt)
+    result_obj = await ainvoke_llm(
+        lambda model: get_structured_chat_model(model, temperature, output_model, key),
+        messages, model_name, temperature, key, "generate",
+    )
     return result_obj.model_dump()
 
 
-def generate_structured_output_with_images(
+async def astream_structured_output(
+    system_prompt: str | None,
+    user_prompt: str,
+    structure: Dict[str, Any],
+    model_name: str,
+    temperature: float,
+) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+    """Stream a structured output as it is generated.
+
+    Yields ("partial", obj) each time the incrementally parsed JSON object
+    grows, then ("final", obj) once the complete object has been validated
+    against the output model. A validation failure raises ValueError.
+    """
+    output_model = build_pydantic_model(structure)
+    streaming_model = get_streaming_structured_chat_model(
+        model_name, temperature, output_model, structure_hash(structure)
+    )
+    messages = _build_messages(system_prompt, user_prompt)
+
+    latest: Any = None
+    async with get_limiter("llm"):
+        async for partial in streaming_model.astream(messages, config=usage_config("generate_stream")):
+            if partial == latest:
+                continue
+            latest = partial
+            yield "partial", partial
+
+    if not isinstance(latest, dict):
+        raise ValueError("Model did not return a JSON object")
+    try:
+        final = output_model.model_validate(latest)
+    except ValidationError as exc:
+        raise ValueError(f"Model output did not match the structure: {exc}") from exc
+    yield "final", final.model_dump()
+
+
+async def agenerate_structured_output_with_images(
     system_prompt: str | None,
     user_prompt: str,
     images: List[dict],
@@ -60,213 +128,270 @@ def generate_structured_output_with_images(
     model_name: str,
     temperature: float,
 ) -> Dict[str, Any]:
-    """Same as generate_structured_output, but also accepts images.
+    """Same as agenerate_structured_output, but also accepts images.
 
     Each image dict should contain:
       - source_type: "base64" or "url"
       - data: base64 string when source_type="base64"
       - url: public URL when source_type="url"
       - mime_type: optional, defaults to image/jpeg
+      - detail: optional, "low" | "high" | "auto"
+    Run them through utils.image_preprocess.preprocess_images first to dedupe,
+    downscale and pick a detail level.
     """
+    output_model = build_pydantic_model(structure)
+    key = structure_hash(structure)
+    messages = _build_messages(system_prompt, _build_vision_content(user_prompt, images))
+    result_obj = await ainvoke_llm(
+        lambda model: get_structured_chat_model(model, temperature, output_model, key),
+        messages, model_name, temperature, key, "generate_vision",
+    )
+    return result_obj.model_dump()
+
 
+async def astream_structured_batch(
+    system_prompt: str | None,
+    user_prompts: List[str],
+    structure: Dict[str, Any],
+    model_name: str,
+    temperature: float,
+    max_concurrency: int | None = None,
+) -> AsyncIterator[Dict[str, Any]]:
+    """Generate one structured output per user prompt with a shared schema.
+
+    The output model and structured runnable are built once, then the batch
+    fans out through LangChain's abatch_as_completed. Results are yielded in
+    completion order as {index, data, error}; a failed item does not stop
+    the batch. Concurrency is the smaller of max_concurrency and
+    GENERATE_BATCH_MAX_CONCURRENCY (default 16), and every call still holds
+    a slot of the global "llm" limiter.
+    """
     output_model = build_pydantic_model(structure)
-    chat_model: ChatOpenAI = get_openai_chat_model(model_name, temperature)
-    structured_model = chat_model.with_structured_output(output_model)
+    structured_model = get_structured_chat_model(model_name, temperature, output_model, structure_hash(structure))
 
-    # Build multimodal content for the user message (OpenAI-compatible)
-    content: List[dict] = [{"type": "text", "text": user_prompt}]
-    for img in images:
-        if img.get("source_type") == "base64":
-            # Accept multiple possible keys from frontend: data | b64 | base64
-            b64_data = img.get("data") or img.get("b64") or img.get("base64")
-            if b64_data:
-                # Accept both mime_type and mimeType
-                mime = img.get("mime_type") or img.get("mimeType") or "image/jpeg"
-                data_url = f"data:{mime};base64,{b64_data}"
-                content.append({"type": "image_url", "image_url": {"url": data_url}})
-        elif img.get("source_type") == "url" and img.get("url"):
-            content.append({"type": "image_url", "image_url": {"url": img["url"]}})
+    async def _limited(messages: list) -> Any:
+        # Batch items queue behind interactive requests when rate limited
+        with upstream_priority(PRIORITY_BATCH):
+            async with get_limiter("llm"):
+                return await structured_model.ainvoke(messages, config=usage_config("generate_batch"))
 
-    messages = []
-    if system_prompt:
-        messages.append(SystemMessage(content=system_prompt))
-    messages.append(HumanMessage(content=content))
+    limit = int(os.environ.get("GENERATE_BATCH_MAX_CONCURRENCY", "16"))
+    concurrency = max(1, min(max_concurrency or limit, limit))
+    inputs = [_build_messages(system_prompt, prompt) for prompt in user_prompts]
 
-    result_obj = structured_model.invoke(messages)
-    return result_obj.model_dump()
+    async for index, result in RunnableLambda(_limited).abatch_as_completed(
+        inputs, config={"max_concurrency": concurrency}, return_exceptions=True
+    ):
+        if isinstance(result, Exception):
+            print(f"[GENERATE_BATCH] Item {index} failed: {result}")
+            yield {"index": index, "data": None, "error": str(result)}
+        else:
+            yield {"index": index, "data": result.model_dump(), "error": None}
 
 
 class GuideSelection(BaseModel):
     files: List[str] = Field(..., description="Filenames from v0_prompt/ to include")
 
 
-def select_v0_guides(user_description: str, model_name: str, temperature: float) -> list[str]:
-    """First LLM pass using LangChain structured outputs to select minimal guides."""
-    chat_model: ChatOpenAI = get_openai_chat_model(model_name, temperature)
-    files = load_v0_prompt_files()
-    catalog = "\n\n".join([f"FILE: {name}\n---\n{content}" for name, content in files.items()])
+_GUIDE_SELECTION_KEY = structure_hash(GuideSelection.model_json_schema())
 
-    print("catalog", catalog[:100])
-    system = SystemMessage(
-        content=(
-            "You are an expert API capability selector. Based on the user's app idea, "
-            "choose the minimal set of endpoint guide files needed to implement it. "
-            "ALWAYS include 'README.md' as it contains critical Next.js integration patterns. "
-            "Return ONLY the list of filenames via the provided structured output schema."
-        )
-    )
-    human = HumanMessage(
-        content=(
-            f"User app idea:\n{user_description}\n\n"
-            "Available endpoint guides (filename + full content):\n"
-            f"{catalog}\n\n"
-            "IMPORTANT: Always include 'README.md' in your selection as it contains essential Next.js API route patterns."
-        )
-    )
 
-    selector = chat_model.with_structured_output(GuideSelection)
-    result: GuideSelection = selector.invoke([system, human])
-    print("result", result)
-    
+_GUIDE_SELECTION_INSTRUCTIONS = (
+    "You are an expert API capability selector. Based on the user's app idea, "
+    "choose the minimal set of endpoint guide files needed to implement it. "
+    "ALWAYS include 'README.md' as it contains critical Next.js integration patterns. "
+    "Return ONLY the list of filenames via the provided structured output schema."
+)
+
+
+def _guide_selection_messages(user_description: str, shortlist: list[str] | None = None) -> list:
+    # Everything before the user's idea is identical across requests (for a
+    # given catalog), so OpenAI can serve it from its prompt cache
+    catalog = get_guide_catalog()
+    if shortlist is None:
+        listing = f"Available endpoint guides (filename + full content):\n{catalog.full_catalog}"
+    else:
+        listing = "Endpoint guides (filename: summary):\n" + "\n".join(catalog.summaries.values())
+    system = SystemMessage(content=f"{_GUIDE_SELECTION_INSTRUCTIONS}\n\n{listing}")
+
+    request = ""
+    if shortlist is not None:
+        # Local ranking already narrowed the field
+        request = f"Choose only from: {', '.join([ALWAYS_INCLUDED, *shortlist])}\n\n"
+    human = HumanMessage(content=f"{request}User app idea:\n{user_description}")
+    return [system, human]
+
+
+def _ensure_readme_selected(result: GuideSelection) -> list[str]:
     # Ensure README.md is always included
     selected_files = result.files
     if "README.md" not in selected_files:
         selected_files.insert(0, "README.md")  # Add at the beginning for priority
         print("Added README.md to selection (was missing)")
-    
+
     return selected_files
 
 
-def enhance_v0_prompt(user_description: str, model_name: str, temperature: float) -> str:
-    """Use the LLM to enhance the user's description into a clear V0 prompt.
+def _local_guide_selection(user_description: str) -> LocalSelection | None:
+    """Rank guides locally unless V0_LOCAL_SELECTION=0; see utils.guide_ranker."""
+    if os.environ.get("V0_LOCAL_SELECTION", "1") in ("0", "false", "False"):
+        return None
+    selection = preselect_guides(get_guide_catalog().index, user_description)
+    print(f"[GUIDE_SELECT] confident={selection.confident} files={selection.files} shortlist={selection.shortlist}")
+    return selection
 
-    The V0 context is provided to the model as system context (not appended to
-    the result) so the LLM can incorporate the constraints and endpoints while
-    generating a concise, explicit app-builder prompt.
-    """
-    chat_model: ChatOpenAI = get_openai_chat_model(model_name, temperature)
 
-    # First pass: select which guide files to include
-    selected_files = select_v0_guides(user_description, model_name, temperature)
-    all_files = load_v0_prompt_files()
-    selected_context_parts = []
-    for name in selected_files:
-        if name in all_files:
-            selected_context_parts.append(f"FILE: {name}\n---\n{all_files[name]}")
-    selection_context = "\n\n".join(selected_context_parts)
-    guardrails = (
-        "You are an expert app-builder prompt engineer. Rewrite the user's description "
-        "into a concise, explicit prompt for an app builder (like V0). "
-        "Specify: inputs, UI elements, actions/triggers, backend integration via Next.js API routes, and "
-        "expected outputs. Do NOT reference or require any SDKs for LLMs, scraping, or PDF generation other than the "
-        "endpoints and capabilities described in the context. Keep it brief but unambiguous."
-        ""
-        "CRITICAL BACKEND INTEGRATION PATTERN:"
-        "- Create Next.js API routes in the /api folder that proxy to the backend"
-        "- Frontend components should call local API routes (e.g., /api/extract, /api/chat)"
-        "- API routes should forward requests to: https://langchain-helper-api-production.up.railway.app"
-        "- Do NOT make direct calls from frontend to external APIs"
-        ""
-        "Example API route pattern:"
-        "```typescript"
-        "// /api/extract/route.ts"
-        "export async function POST(request: Request) {"
-        "  const body = await request.json();"
-        "  const response = await fetch('https://langchain-helper-api-production.up.railway.app/extract', {"
-        "    method: 'POST',"
-        "    headers: { 'Content-Type': 'application/json' },"
-        "    body: JSON.stringify(body)"
-        "  });"
-        "  return Response.json(await response.json());"
-        "}"
-        "```"
-        ""
-        "Frontend should call: fetch('/api/extract', { method: 'POST', body: ... })"
-        ""
-        "Provide the example request and response for the endpoints if they should be used."
-        "Explicitly say to not generate mock data, use real requests via the API routes as described."
-        ""
+async def aselect_v0_guides(user_description: str, model_name: str, temperature: float) -> list[str]:
+    """First pass: select the minimal set of guides for the app idea.
+
+    A confident local keyword ranking is used as-is; otherwise the LLM picks
+    via structured outputs from summaries of every guide, restricted to the
+    local shortlist.
+    """
+    local = _local_guide_selection(user_description)
+    if local is not None and local.confident:
+        return list(local.files)
+    result: GuideSelection = await ainvoke_llm(
+        lambda model: get_structured_chat_model(model, temperature, GuideSelection, _GUIDE_SELECTION_KEY),
+        _guide_selection_messages(user_description, local.shortlist if local else None),
+        model_name, temperature, "GuideSelection", "v0_guide_selection",
     )
+    return _ensure_readme_selected(result)
+
+
+_V0_GUARDRAILS = (
+    "You are an expert app-builder prompt engineer. Rewrite the user's description "
+    "into a concise, explicit prompt for an app builder (like V0). "
+    "Specify: inputs, UI elements, actions/triggers, backend integration via Next.js API routes, and "
+    "expected outputs. Do NOT reference or require any SDKs for LLMs, scraping, or PDF generation other than the "
+    "endpoints and capabilities described in the context. Keep it brief but unambiguous."
+    ""
+    "CRITICAL BACKEND INTEGRATION PATTERN:"
+    "- Create Next.js API routes in the /api folder that proxy to the backend"
+    "- Frontend components should call local API routes (e.g., /api/extract, /api/chat)"
+    "- API routes should forward requests to: https://langchain-helper-api-production.up.railway.app"
+    "- Do NOT make direct calls from frontend to external APIs"
+    ""
+    "Example API route pattern:"
+    "```typescript"
+    "// /api/extract/route.ts"
+    "export async function POST(request: Request) {"
+    "  const body = await request.json();"
+    "  const response = await fetch('https://langchain-helper-api-production.up.railway.app/extract', {"
+    "    method: 'POST',"
+    "    headers: { 'Content-Type': 'application/json' },"
+    "    body: JSON.stringify(body)"
+    "  });"
+    "  return Response.json(await response.json());"
+    "}"
+    "```"
+    ""
+    "Frontend should call: fetch('/api/extract', { method: 'POST', body: ... })"
+    ""
+    "Provide the example request and response for the endpoints if they should be used."
+    "Explicitly say to not generate mock data, use real requests via the API routes as described."
+    ""
+)
+
+
+def _enhance_messages(user_description: str, selected_files: list[str]) -> list:
+    # Guardrails, then README.md, then the other selected guides in catalog
+    # order: requests that select the same guides share a byte-identical
+    # prefix, and all of them share the guardrails and README.md
+    catalog = get_guide_catalog()
+    selected = set(selected_files)
+    ordered = [ALWAYS_INCLUDED] + [name for name in catalog.files if name != ALWAYS_INCLUDED and name in selected]
     system = SystemMessage(
         content=(
-            f"{guardrails}\n\n"
+            f"{_V0_GUARDRAILS}\n\n"
             "Use ONLY the following selected endpoint guides as context. Do not reference any other guides.\n\n"
-            f"Selected guides (filename + content):\n{selection_context}"
+            f"Selected guides (filename + content):\n{catalog.concat(ordered)}"
         )
     )
+    human = HumanMessage(content=user_description)
+    return [system, human]
 
-    print("system", system.content)
 
-    human = HumanMessage(content=user_description)
-    enhanced = chat_model.invoke([system, human])
+async def aenhance_v0_prompt(user_description: str, model_name: str, temperature: float) -> str:
+    """Use the LLM to enhance the user's description into a clear V0 prompt.
+
+    The V0 context is provided to the model as system context (not appended to
+    the result) so the LLM can incorporate the constraints and endpoints while
+    generating a concise, explicit app-builder prompt.
+    """
+    selected_files = await aselect_v0_guides(user_description, model_name, temperature)
+    enhanced = await ainvoke_llm(
+        lambda model: get_openai_chat_model(model, temperature),
+        _enhance_messages(user_description, selected_files), model_name, temperature, "chat", "v0_enhance",
+    )
     return enhanced.content.strip()
 
 
-def extract_with_firecrawl(urls: list[str], prompt: str, structure: dict, api_key: str | None) -> dict:
+async def astream_enhanced_v0_prompt(
+    user_description: str, selected_files: list[str], model_name: str, temperature: float
+) -> AsyncIterator[str]:
+    """Stream the enhancement pass for already-selected guides, token by token."""
+    chat_model: ChatOpenAI = get_openai_chat_model(model_name, temperature)
+    async with get_limiter("llm"):
+        messages = _enhance_messages(user_description, selected_files)
+        async for chunk in chat_model.astream(messages, config=usage_config("v0_enhance")):
+            if chunk.content:
+                yield chunk.content
+
+
+def _api_key_digest(api_key: str | None) -> str:
+    # Calls made with different Firecrawl keys never share a job
+    return hashlib.sha256((api_key or "").encode("utf-8")).hexdigest()
+
+
+async def aextract_with_firecrawl(urls: list[str], prompt: str, structure: dict, api_key: str | None) -> dict:
     """Use Firecrawl to extract structured data from web pages according to a
-    provided schema (example dict or JSON Schema)."""
-    app = FirecrawlApp(api_key=api_key)
-    # Build Pydantic model to ensure we provide a JSON schema Firecrawl accepts
-    dynamic_model = build_pydantic_model(structure)
-    schema = dynamic_model.model_json_schema()
-    result = app.extract(urls, prompt=prompt, schema=schema)
-    # Normalize to a plain dict for JSON serialization
-    if isinstance(result, dict):
-        return result
-    # Try common serialization hooks
-    for attr in ("model_dump", "dict", "to_dict"):
-        fn = getattr(result, attr, None)
-        if callable(fn):
-            try:
-                return fn()  # type: ignore[misc]
-            except Exception:
-                pass
-    # Fallback: try JSON string conversion
-    json_str = getattr(result, "json", None)
-    if callable(json_str):
-        import json as _json
-        try:
-            return _json.loads(json_str())
-        except Exception:
-            pass
-    # Last resort: use __dict__ if present
-    data: Any = getattr(result, "__dict__", None)
-    if isinstance(data, dict):
-        return data
-    # If all else fails, wrap as string
-    return {"result": str(result)}
-
-
-def screenshot_with_firecrawl(url: str, options: dict | None = None) -> dict:
-    """Use Firecrawl to take a screenshot and return the response. Uses FIRECRAWL_SCREENSHOT_API."""
+    provided schema (example dict or JSON Schema); all URLs run as one
+    Firecrawl job."""
+    schema = build_pydantic_model(structure).model_json_schema()
+
+    async def _call() -> dict:
+        async with get_limiter("firecrawl"):
+            return await get_firecrawl_gateway().client(api_key).aextract(urls, prompt, schema)
+
+    # Identical extracts (same key, URLs, prompt, schema) share one Firecrawl job
+    key = flight_key("extract", _api_key_digest(api_key), urls, prompt, schema)
+    return await get_single_flight("firecrawl").ado(key, _call)
+
+
+def astream_extract_with_firecrawl(
+    urls: list[str],
+    prompt: str,
+    structure: dict,
+    api_key: str | None,
+    max_concurrency: int | None = None,
+    timeout: float | None = None,
+    bypass_cache: bool = False,
+) -> AsyncIterator[Dict[str, Any]]:
+    """Extract each URL as its own Firecrawl job, yielding {index, url, data,
+    error, cache} as each finishes; see FirecrawlGateway.astream_extract."""
+    schema = build_pydantic_model(structure).model_json_schema()
+    return get_firecrawl_gateway().astream_extract(urls, prompt, schema, api_key, max_concurrency, timeout, bypass_cache)
+
+
+def _screenshot_api_key() -> str:
     api_key = os.environ.get("FIRECRAWL_SCREENSHOT_API")
     if not api_key:
         raise RuntimeError("FIRECRAWL_SCREENSHOT_API is not set")
+    return api_key
 
-    app = FirecrawlApp(api_key=api_key)
-    # Firecrawl SDK expects a list for extract; for single URL wrap in list
-    payload_opts = options or {}
-    # Many SDKs accept options directly; if not, adjust as needed
-    result = app.extract([url], **payload_opts)
-    if isinstance(result, dict):
-        return result
-    # Fallback normalization to dict
-    data: Any = getattr(result, "__dict__", None)
-    if isinstance(data, dict):
-        return data
-    return {"result": str(result)}
-
-
-def generate_client_message(
-    user_description: str,
-    website: str,
-    github: str,
-    linkedin: str,
-    model_name: str,
-    temperature: float,
-) -> str:
-    """Have the LLM tailor a brief client outreach message to the app idea."""
-    chat_model: ChatOpenAI = get_openai_chat_model(model_name, temperature)
+
+async def ascreenshot_with_firecrawl(url: str, options: dict | None = None) -> dict:
+    """Use Firecrawl to take a screenshot and return the response. Uses FIRECRAWL_SCREENSHOT_API.
+
+    `options` is the Firecrawl scrape body (formats, maxAge, ...) without the URL.
+    """
+    api_key = _screenshot_api_key()
+    async with get_limiter("firecrawl"):
+        return await get_firecrawl_gateway().client(api_key).ascrape(url, options or {})
+
+
+def _client_message_messages(user_description: str, website: str, github: str, linkedin: str) -> list:
     system = SystemMessage(
         content=(
             "You are a concise, warm outreach writer. Given an app idea, write a short "
@@ -277,6 +402,21 @@ def generate_client_message(
         )
     )
     human = HumanMessage(content=f"App idea: {user_description}\nWebsite: {website}\nGitHub: {github}\nLinkedIn: {linkedin}")
-    resp = chat_model.invoke([system, human])
-    return resp.content
+    return [system, human]
 
+
+async def agenerate_client_message(
+    user_description: str,
+    website: str,
+    github: str,
+    linkedin: str,
+    model_name: str,
+    temperature: float,
+) -> str:
+    """Have the LLM tailor a brief client outreach message to the app idea."""
+    resp = await ainvoke_llm(
+        lambda model: get_openai_chat_model(model, temperature),
+        _client_message_messages(user_description, website, github, linkedin), model_name, temperature, "chat",
+        "client_message",
+    )
+    return resp.content
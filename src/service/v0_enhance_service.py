@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any, AsyncIterator, Dict, Tuple
+
+from .schema_generation_service import agenerate_database_schema
+from .structured_service import aenhance_v0_prompt, aselect_v0_guides, astream_enhanced_v0_prompt
+
+
+async def agenerate_database_payload(project_description: str, model_name: str, temperature: float) -> Dict[str, Any]:
+    """Schema generation shaped as the `database` object of /prompt/v0/enhance."""
+    success, sql_schema, app_uuid, tables, explanation, error = await agenerate_database_schema(
+        project_description=project_description,
+        additional_requirements=None,
+        model=model_name,
+        temperature=temperature,
+    )
+    return {
+        "success": success,
+        "sql_schema": sql_schema if success else "",
+        "app_uuid": app_uuid if success else "",
+        "tables_created": tables if success else [],
+        "explanation": explanation if success else "",
+        "error": error if not success else None,
+    }
+
+
+async def arun_v0_enhance(
+    user_description: str, model_name: str, temperature: float, schema_from: str = "description"
+) -> Dict[str, Any]:
+    """Enhanced prompt plus database schema.
+
+    With schema_from="description" the schema is generated from the raw
+    description concurrently with enhancement; with "enhanced" it waits for
+    the enhanced prompt, as the endpoint originally did.
+    """
+    if schema_from == "enhanced":
+        prompt = await aenhance_v0_prompt(user_description, model_name, temperature)
+        database = await agenerate_database_payload(prompt, model_name, temperature)
+    else:
+        prompt, database = await asyncio.gather(
+            aenhance_v0_prompt(user_description, model_name, temperature),
+            agenerate_database_payload(user_description, model_name, temperature),
+        )
+    return {"prompt": prompt, "database": database}
+
+
+async def astream_v0_enhance(
+    user_description: str, model_name: str, temperature: float, schema_from: str = "description"
+) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+    """Pipeline behind /prompt/v0/enhance/stream, as (event, data) pairs.
+
+    Emits `guides` once selection is done, `token` for each enhanced-prompt
+    delta, `prompt` with the full text, and `database` as soon as the schema
+    is ready, which with schema_from="description" is usually before the
+    prompt finishes. Guide selection and every wait for the next token are
+    raced against the schema task, so `database` is never held back behind
+    them. Pending work is cancelled if the client goes away.
+    """
+    schema_task: asyncio.Task | None = None
+    if schema_from != "enhanced":
+        schema_task = asyncio.ensure_future(agenerate_database_payload(user_description, model_name, temperature))
+    schema_sent = False
+
+    async def _until(step: asyncio.Future) -> None:
+        # Wait for `step`, or for the schema if it finishes first
+        waiting = {step}
+        if schema_task is not None and not schema_sent:
+            waiting.add(schema_task)
+        await asyncio.wait(waiting, return_when=asyncio.FIRST_COMPLETED)
+
+    def _schema_ready() -> bool:
+        return schema_task is not None and schema_task.done() and not schema_sent
+
+    selection = asyncio.ensure_future(aselect_v0_guides(user_description, model_name, temperature))
+    stream = None
+    next_text: asyncio.Future | None = None
+    try:
+        while not selection.done():
+            await _until(selection)
+            if _schema_ready():
+                schema_sent = True
+                yield "database", schema_task.result()
+        selected_files = selection.result()
+        yield "guides", {"files": selected_files}
+        if _schema_ready():
+            schema_sent = True
+            yield "database", schema_task.result()
+
+        parts = []
+        stream = astream_enhanced_v0_prompt(user_description, selected_files, model_name, temperature)
+        while True:
+            next_text = asyncio.ensure_future(stream.__anext__())
+            while not next_text.done():
+                await _until(next_text)
+                if _schema_ready():
+                    schema_sent = True
+                    yield "database", schema_task.result()
+            try:
+                text = next_text.result()
+            except StopAsyncIteration:
+                break
+            parts.append(text)
+            yield "token", {"text": text}
+        prompt = "".join(parts).strip()
+        yield "prompt", {"prompt": prompt}
+
+        if schema_task is None:
+            schema_task = asyncio.ensure_future(agenerate_database_payload(prompt, model_name, temperature))
+        if not schema_sent:
+            yield "database", await schema_task
+    finally:
+        pending = [task for task in (selection, next_text, schema_task) if task is not None and not task.done()]
+        for task in pending:
+            task.cancel()
+        # The stream cannot be closed while a cancelled __anext__ is still unwinding
+        await asyncio.gather(*pending, return_exceptions=True)
+        if stream is not None:
+            await stream.aclose()
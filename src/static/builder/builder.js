@@ -0,0 +1,258 @@
+const genBtn = document.getElementById('gen');
+const clearBtn = document.getElementById('clear');
+const desc = document.getElementById('desc');
+const out = document.getElementById('out');
+const loader = document.getElementById('loader');
+const resultSection = document.getElementById('resultSection');
+const copyBtn = document.getElementById('copy');
+const copyMsg = document.getElementById('copyMsg');
+
+// Database section elements
+const databaseSection = document.getElementById('databaseSection');
+const appUuid = document.getElementById('appUuid');
+const tablesList = document.getElementById('tablesList');
+const dbExplanation = document.getElementById('dbExplanation');
+const sqlSchema = document.getElementById('sqlSchema');
+const copySchemaBtn = document.getElementById('copySchema');
+const setupDbBtn = document.getElementById('setupDb');
+const copySchemaMsg = document.getElementById('copySchemaMsg');
+const setupMsg = document.getElementById('setupMsg');
+const dbError = document.getElementById('dbError');
+
+const clientMsg = document.getElementById('clientMsg');
+const copyClientBtn = document.getElementById('copyClient');
+const genClientBtn = document.getElementById('genClient');
+const copyClientMsg = document.getElementById('copyClientMsg');
+
+let latestPrompt = '';
+let latestSchema = '';
+
+function setLoading(isLoading) {
+  if (isLoading) {
+    loader.classList.remove('hidden');
+    genBtn.disabled = true; 
+    clearBtn.disabled = true; 
+    if (copyBtn) copyBtn.disabled = true; 
+    if (copyClientBtn) copyClientBtn.disabled = true; 
+    if (genClientBtn) genClientBtn.disabled = true;
+    if (copySchemaBtn) copySchemaBtn.disabled = true;
+    if (setupDbBtn) setupDbBtn.disabled = true;
+  } else {
+    loader.classList.add('hidden');
+    genBtn.disabled = false; 
+    clearBtn.disabled = false; 
+    if (copyBtn) copyBtn.disabled = false; 
+    if (copyClientBtn) copyClientBtn.disabled = false; 
+    if (genClientBtn) genClientBtn.disabled = false;
+    if (copySchemaBtn) copySchemaBtn.disabled = false;
+    if (setupDbBtn) setupDbBtn.disabled = false;
+  }
+}
+
+function displayDatabaseInfo(dbData) {
+  if (dbData.success) {
+    appUuid.textContent = dbData.app_uuid;
+    tablesList.innerHTML = dbData.tables_created.map(table => 
+      `<span class="inline-block bg-slate-800 px-2 py-1 rounded mr-1 mb-1">${table}</span>`
+    ).join('');
+    dbExplanation.textContent = dbData.explanation;
+    sqlSchema.textContent = dbData.sql_schema;
+    latestSchema = dbData.sql_schema;
+    databaseSection.classList.remove('hidden');
+    dbError.classList.add('hidden');
+  } else {
+    dbError.textContent = dbData.error || 'Failed to generate database schema';
+    dbError.classList.remove('hidden');
+    databaseSection.classList.add('hidden');
+  }
+}
+
+genBtn.addEventListener('click', async () => {
+  const text = desc.value.trim();
+  if (!text) return;
+  setLoading(true);
+  resultSection.classList.add('hidden');
+  databaseSection.classList.add('hidden');
+  out.innerHTML = '';
+  copyMsg.classList.add('hidden');
+  dbError.classList.add('hidden');
+  setupMsg.classList.add('hidden');
+  copySchemaMsg.classList.add('hidden');
+
+  try {
+    const clientReq = fetch('/generate-client-message', {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({ user_description: text })
+    }).then(res => res.json()).then(clientData => {
+      if (clientData && typeof clientData.message === 'string') {
+        clientMsg.value = clientData.message;
+      }
+    }).catch(() => {});
+
+    // Enhanced prompt streams in token by token; the schema arrives as its own event
+    latestPrompt = '';
+    let renderQueued = false;
+    const renderPrompt = () => {
+      renderQueued = false;
+      out.innerHTML = window.marked.parse(latestPrompt);
+    };
+    await streamSse('/prompt/v0/enhance/stream', { user_description: text }, (event, data) => {
+      if (event === 'token') {
+        latestPrompt += data.text;
+        resultSection.classList.remove('hidden');
+        if (!renderQueued) {
+          renderQueued = true;
+          requestAnimationFrame(renderPrompt);
+        }
+      } else if (event === 'prompt') {
+        latestPrompt = data.prompt;
+        renderPrompt();
+        resultSection.classList.remove('hidden');
+      } else if (event === 'database') {
+        displayDatabaseInfo(data);
+      } else if (event === 'error') {
+        throw new Error(data.detail);
+      }
+    });
+    await clientReq;
+  } catch (e) {
+    resultSection.classList.remove('hidden');
+    out.innerHTML = '<div class="text-red-400">Failed to generate prompt and schema.</div>';
+  } finally {
+    setLoading(false);
+  }
+});
+
+// POST + Server-Sent Events (EventSource only supports GET)
+async function streamSse(url, payload, onEvent) {
+  const res = await fetch(url, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify(payload)
+  });
+  if (!res.ok || !res.body) throw new Error(`HTTP ${res.status}`);
+  const reader = res.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+  while (true) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+    let sep;
+    while ((sep = buffer.indexOf('\n\n')) !== -1) {
+      const frame = buffer.slice(0, sep);
+      buffer = buffer.slice(sep + 2);
+      let event = 'message';
+      let data = '';
+      for (const line of frame.split('\n')) {
+        if (line.startsWith('event: ')) event = line.slice(7);
+        else if (line.startsWith('data: ')) data += line.slice(6);
+      }
+      onEvent(event, data ? JSON.parse(data) : null);
+    }
+  }
+}
+
+clearBtn.addEventListener('click', () => {
+  desc.value = '';
+  resultSection.classList.add('hidden');
+  databaseSection.classList.add('hidden');
+  out.innerHTML = '';
+  copyMsg.classList.add('hidden');
+  copySchemaMsg.classList.add('hidden');
+  setupMsg.classList.add('hidden');
+  dbError.classList.add('hidden');
+  latestPrompt = '';
+  latestSchema = '';
+});
+
+if (copyBtn) {
+  copyBtn.addEventListener('click', async () => {
+    try {
+      await navigator.clipboard.writeText(latestPrompt || '');
+      copyMsg.classList.remove('hidden');
+      setTimeout(() => copyMsg.classList.add('hidden'), 1500);
+    } catch (e) {
+      // no-op
+    }
+  });
+}
+
+if (copySchemaBtn) {
+  copySchemaBtn.addEventListener('click', async () => {
+    try {
+      await navigator.clipboard.writeText(latestSchema || '');
+      copySchemaMsg.classList.remove('hidden');
+      setTimeout(() => copySchemaMsg.classList.add('hidden'), 1500);
+    } catch (e) {
+      // no-op
+    }
+  });
+}
+
+if (setupDbBtn) {
+  setupDbBtn.addEventListener('click', async () => {
+    if (!latestSchema) return;
+
+    setLoading(true);
+    setupMsg.classList.add('hidden');
+    dbError.classList.add('hidden');
+
+    try {
+      const response = await fetch('/setup-db', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ sql_content: latestSchema })
+      });
+
+      const result = await response.json();
+
+      if (result.success) {
+        setupMsg.textContent = `✅ Database setup successful! ${result.executed_statements} statements executed.`;
+        setupMsg.classList.remove('hidden');
+      } else {
+        dbError.textContent = `❌ Database setup failed: ${result.message}`;
+        dbError.classList.remove('hidden');
+      }
+    } catch (e) {
+      dbError.textContent = `❌ Database setup failed: ${e.message}`;
+      dbError.classList.remove('hidden');
+    } finally {
+      setLoading(false);
+    }
+  });
+}
+
+if (copyClientBtn) {
+  copyClientBtn.addEventListener('click', async () => {
+    try {
+      await navigator.clipboard.writeText(clientMsg.value || '');
+      copyClientMsg.classList.remove('hidden');
+      setTimeout(() => copyClientMsg.classList.add('hidden'), 1500);
+    } catch (e) {
+      // no-op
+    }
+  });
+}
+
+if (genClientBtn) {
+  genClientBtn.addEventListener('click', async () => {
+    const text = desc.value.trim();
+    if (!text) return;
+    setLoading(true);
+    try {
+      const res = await fetch('/generate-client-message', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ user_description: text })
+      });
+      const data = await res.json();
+      clientMsg.value = data.message || '';
+    } catch (e) {
+      clientMsg.value = 'Failed to generate message.';
+    } finally {
+      setLoading(false);
+    }
+  });
+}
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+from typing import Any, Dict
+
+
+# Default in-flight limits per upstream; override with <NAME>_MAX_CONCURRENCY
+_DEFAULT_LIMITS: Dict[str, int] = {
+    "llm": 256,
+    "firecrawl": 32,
+}
+
+
+class ConcurrencyLimiter:
+    """Async semaphore that also reports in-flight, waiting and peak counts.
+
+    Used by async request paths instead of the threadpool so the number of
+    concurrent upstream calls is an explicit, configurable limit.
+    """
+
+    def __init__(self, name: str, limit: int) -> None:
+        self.name = name
+        self.limit = limit
+        self._semaphore = asyncio.Semaphore(limit)
+        self.in_flight = 0
+        self.waiting = 0
+        self.peak_in_flight = 0
+        self.total = 0
+
+    async def __aenter__(self) -> "ConcurrencyLimiter":
+        self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        self.in_flight += 1
+        self.total += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        self.in_flight -= 1
+        self._semaphore.release()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "limit": self.limit,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "peak_in_flight": self.peak_in_flight,
+            "total": self.total,
+        }
+
+
+_limiters: Dict[str, ConcurrencyLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(name: str) -> ConcurrencyLimiter:
+    limiter = _limiters.get(name)
+    if limiter is None:
+        with _limiters_lock:
+            limiter = _limiters.get(name)
+            if limiter is None:
+                default = _DEFAULT_LIMITS.get(name, 64)
+                limit = int(os.environ.get(f"{name.upper()}_MAX_CONCURRENCY", default))
+                limiter = _limiters[name] = ConcurrencyLimiter(name, limit)
+    return limiter
+
+
+def get_limiter_stats() -> Dict[str, Dict[str, int]]:
+    return {name: limiter.stats() for name, limiter in _limiters.items()}
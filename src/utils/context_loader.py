@@ -1,13 +1,8 @@
 from __future__ import annotations
 
-from pathlib import Path
+from .v0_prompt_utils import get_guide_catalog
 
 
 def load_v0_context() -> str:
-    root = Path(__file__).resolve().parents[2]
-    v0_path = root / "v0_prompt.md"
-    if not v0_path.exists():
-        return ""
-    return v0_path.read_text(encoding="utf-8")
-
-
+    """Contents of v0_prompt.md, served from the preloaded guide catalog."""
+    return get_guide_catalog().context
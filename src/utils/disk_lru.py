@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import BinaryIO, Dict, Optional
+
+
+class DiskLRUCache:
+    """Size-bounded LRU cache of binary blobs stored as files in one directory.
+
+    Keys must be filesystem-safe (e.g. hex digests). Recency is tracked in
+    memory and seeded from file mtimes on startup, so the cache survives
+    restarts. Writes are atomic (temp file + rename).
+    """
+
+    def __init__(self, directory: str | Path, max_bytes: int, suffix: str = "") -> None:
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.suffix = suffix
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._load_index()
+
+    def _load_index(self) -> None:
+        files = []
+        for path in self.directory.glob(f"*{self.suffix}"):
+            if path.name.startswith("."):
+                # leftover temp file from an interrupted write
+                continue
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            files.append((stat.st_mtime, path, stat.st_size))
+        for _, path, size in sorted(files):
+            key = path.name[: len(path.name) - len(self.suffix)] if self.suffix else path.name
+            self._entries[key] = size
+            self._total_bytes += size
+
+    def path_for(self, key: str) -> Path:
+        return self.directory / f"{key}{self.suffix}"
+
+    def _touch(self, path: Path) -> None:
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def _lookup_locked(self, key: str) -> Optional[Path]:
+        if key not in self._entries:
+            self.misses += 1
+            return None
+        path = self.path_for(key)
+        if not path.exists():
+            self._total_bytes -= self._entries.pop(key)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return path
+
+    def get(self, key: str) -> Optional[Path]:
+        """Return the path of a cached blob and mark it recently used, or None.
+
+        The file may be evicted by a concurrent put once this returns; use
+        open() when the blob is going to be read.
+        """
+        with self._lock:
+            path = self._lookup_locked(key)
+        if path is not None:
+            self._touch(path)
+        return path
+
+    def open(self, key: str) -> Optional[BinaryIO]:
+        """Open a cached blob for reading and mark it recently used, or None.
+
+        The file is opened under the cache lock, so eviction cannot remove
+        it first, and an open handle stays readable after eviction unlinks it.
+        """
+        with self._lock:
+            path = self._lookup_locked(key)
+            if path is None:
+                return None
+            try:
+                handle = open(path, "rb")
+            except FileNotFoundError:
+                self._total_bytes -= self._entries.pop(key)
+                self.hits -= 1
+                self.misses += 1
+                return None
+        self._touch(path)
+        return handle
+
+    def put(self, key: str, data: bytes) -> Path:
+        """Store `data` under `key`, evicting least recently used blobs if needed."""
+        fd, tmp_name = tempfile.mkstemp(dir=self.directory, prefix=".tmp-")
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(data)
+        return self.put_file(key, Path(tmp_name))
+
+    def put_file(self, key: str, source: Path) -> Path:
+        """Move an already-written file (on the same filesystem) into the cache."""
+        path = self.path_for(key)
+        size = source.stat().st_size
+        os.replace(source, path)
+        with self._lock:
+            self._insert_locked(key, size)
+        return path
+
+    def put_file_open(self, key: str, source: Path) -> BinaryIO:
+        """put_file(), returning the stored blob opened for reading.
+
+        Opening happens under the cache lock, before any other put can
+        evict the new entry.
+        """
+        path = self.path_for(key)
+        size = source.stat().st_size
+        os.replace(source, path)
+        with self._lock:
+            handle = open(path, "rb")
+            self._insert_locked(key, size)
+        return handle
+
+    def _insert_locked(self, key: str, size: int) -> None:
+        if key in self._entries:
+            self._total_bytes -= self._entries.pop(key)
+        self._entries[key] = size
+        self._total_bytes += size
+        self._evict_locked(keep=key)
+
+    def _evict_locked(self, keep: str) -> None:
+        while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+            oldest = next(iter(self._entries))
+            if oldest == keep:
+                break
+            self._total_bytes -= self._entries.pop(oldest)
+            self.evictions += 1
+            try:
+                self.path_for(oldest).unlink()
+            except OSError:
+                pass
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+import math
+import os
+import re
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, List, Mapping, Tuple
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+_STOPWORDS = frozenset(
+    "the and for with that this from your you are can will use using into have has not but all any "
+    "app application user users want need build make should would could like each when then them "
+    "its our their what which who how json http https post get request response sample content type "
+    "true false null api endpoint".split()
+)
+
+# App ideas rarely use the guides' own vocabulary; map common phrasings onto it
+_SYNONYMS: Dict[str, Tuple[str, ...]] = {
+    "scrape": ("extract", "firecrawl"),
+    "crawl": ("extract", "firecrawl"),
+    "website": ("extract", "url"),
+    "webpage": ("extract", "url"),
+    "photo": ("image", "vision"),
+    "picture": ("image", "vision"),
+    "screenshot": ("image", "vision"),
+    "upload": ("ingest", "document"),
+    "question": ("chat", "document"),
+    "ask": ("chat",),
+    "chatbot": ("chat",),
+    "assistant": ("chat",),
+    "invoice": ("ocr", "document"),
+    "receipt": ("ocr", "document"),
+    "scan": ("ocr",),
+    "store": ("database", "table"),
+    "save": ("database", "table"),
+    "persist": ("database", "table"),
+    "record": ("database", "table"),
+    "report": ("pdf", "render"),
+    "export": ("pdf", "render"),
+    "print": ("pdf", "render"),
+    "summarize": ("generate", "structured"),
+    "classify": ("generate", "structured"),
+    "docx": ("extract", "text"),
+    "word": ("extract", "text"),
+    "excel": ("extract", "text"),
+    "spreadsheet": ("extract", "text"),
+}
+
+# Guide that is always included and never ranked
+ALWAYS_INCLUDED = "README.md"
+
+
+def _stem(word: str) -> str:
+    for suffix in ("ing", "ed", "es", "s"):
+        if word.endswith(suffix) and len(word) > len(suffix) + 2:
+            return word[: -len(suffix)]
+    return word
+
+
+def tokenize(text: str) -> List[str]:
+    return [_stem(w) for w in _WORD_RE.findall(text.lower()) if len(w) > 2 and w not in _STOPWORDS]
+
+
+def _query_terms(text: str) -> List[str]:
+    terms: List[str] = []
+    for word in _WORD_RE.findall(text.lower()):
+        if len(word) <= 2 or word in _STOPWORDS:
+            continue
+        terms.append(_stem(word))
+        terms.extend(_SYNONYMS.get(word, ()) or _SYNONYMS.get(_stem(word), ()))
+    return terms
+
+
+class _BM25:
+    k1 = 1.2
+    b = 0.75
+
+    def __init__(self, docs: Mapping[str, List[str]]) -> None:
+        self.tf = {name: Counter(tokens) for name, tokens in docs.items()}
+        self.lengths = {name: len(tokens) for name, tokens in docs.items()}
+        self.avg_length = (sum(self.lengths.values()) / len(self.lengths)) if self.lengths else 1.0
+        df: Counter = Counter()
+        for tf in self.tf.values():
+            df.update(tf.keys())
+        n = len(self.tf)
+        self.idf = {term: math.log(1 + (n - count + 0.5) / (count + 0.5)) for term, count in df.items()}
+
+    def score(self, name: str, terms: Counter) -> float:
+        tf = self.tf[name]
+        norm = self.k1 * (1 - self.b + self.b * self.lengths[name] / max(self.avg_length, 1.0))
+        total = 0.0
+        for term, query_count in terms.items():
+            freq = tf.get(term)
+            if freq:
+                total += query_count * self.idf[term] * freq * (self.k1 + 1) / (freq + norm)
+        return total
+
+
+class GuideIndex:
+    """Keyword index over the v0 guides.
+
+    Scores are BM25 over each guide's headline (filename, title and "Use
+    this ..." line) plus a down-weighted BM25 over its full text, so a
+    guide's own topic outweighs words that merely appear in its examples.
+    """
+
+    body_weight = 0.25
+
+    def __init__(self, files: Mapping[str, str], summaries: Mapping[str, str]) -> None:
+        names = [name for name in files if name != ALWAYS_INCLUDED]
+        self._names = names
+        self._headlines = _BM25({
+            name: tokenize(f"{name.rsplit('.', 1)[0].replace('-', ' ')} {summaries.get(name, '')}") for name in names
+        })
+        self._bodies = _BM25({name: tokenize(files[name]) for name in names})
+        # Guides that link another guide's endpoint (e.g. /generate-schema -> /query-db) pull it in
+        self._references = {
+            name: [other for other in names if other != name and re.search(
+                rf"/{re.escape(other.rsplit('.', 1)[0])}(?![\w-])", files[name]
+            )]
+            for name in names
+        }
+
+    def with_references(self, names: List[str]) -> List[str]:
+        expanded = list(names)
+        for name in names:
+            expanded.extend(ref for ref in self._references.get(name, ()) if ref not in expanded)
+        return expanded
+
+    def rank(self, text: str) -> List[Tuple[str, float]]:
+        terms = Counter(_query_terms(text))
+        scores = [
+            (name, self._headlines.score(name, terms) + self.body_weight * self._bodies.score(name, terms))
+            for name in self._names
+        ]
+        scores.sort(key=lambda item: item[1], reverse=True)
+        return scores
+
+
+@dataclass(frozen=True)
+class LocalSelection:
+    """Outcome of ranking guides locally.
+
+    `confident` means `files` can be used without asking the LLM; otherwise
+    the LLM should choose from `shortlist`.
+    """
+
+    files: List[str]
+    shortlist: List[str]
+    confident: bool
+    scores: Dict[str, float]
+
+
+_stats_lock = threading.Lock()
+_stats = {"local": 0, "llm_shortlist": 0}
+
+
+def preselect_guides(index: GuideIndex, user_description: str) -> LocalSelection:
+    """Rank guides and decide whether the ranking alone is trustworthy.
+
+    With `top` the best score, the ranking is confident when top reaches
+    V0_SELECT_MIN_SCORE and every guide is clearly in (>= V0_SELECT_HIGH * top)
+    or clearly out (<= V0_SELECT_LOW * top); guides referenced by a chosen
+    guide are added. The shortlist is every guide above the low cut, at most
+    V0_SELECT_SHORTLIST of them.
+    """
+    high = float(os.environ.get("V0_SELECT_HIGH", "0.5"))
+    low = float(os.environ.get("V0_SELECT_LOW", "0.15"))
+    min_score = float(os.environ.get("V0_SELECT_MIN_SCORE", "3.0"))
+    shortlist_size = int(os.environ.get("V0_SELECT_SHORTLIST", "6"))
+
+    ranked = index.rank(user_description)
+    top = ranked[0][1] if ranked else 0.0
+    chosen = [name for name, score in ranked if top > 0 and score >= high * top]
+    ambiguous = [name for name, score in ranked if low * top < score < high * top]
+    confident = top >= min_score and not ambiguous
+    shortlist = [name for name, score in ranked if top > 0 and score > low * top][:shortlist_size]
+    if not shortlist:
+        shortlist = [name for name, _ in ranked]
+
+    with _stats_lock:
+        _stats["local" if confident else "llm_shortlist"] += 1
+    return LocalSelection(
+        files=[ALWAYS_INCLUDED] + index.with_references(chosen),
+        shortlist=shortlist,
+        confident=confident,
+        scores={name: round(score, 3) for name, score in ranked},
+    )
+
+
+def get_guide_selection_stats() -> Dict[str, int]:
+    with _stats_lock:
+        return dict(_stats)
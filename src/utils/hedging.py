@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class HedgePolicy:
+    """Opt-in hedging for slow upstream calls.
+
+    Latencies are recorded per model in a rolling window. When enabled, a
+    call still running after the window's `percentile` latency (clamped to
+    [min_delay, max_delay]; `default_delay` until `min_samples` are seen)
+    gets a second attempt, on `fallback_model` when set. The first success
+    wins and the other attempt is cancelled.
+    """
+
+    def __init__(self) -> None:
+        self.enabled = os.environ.get("LLM_HEDGE_ENABLED", "0") in ("1", "true", "True")
+        self.percentile = float(os.environ.get("LLM_HEDGE_PERCENTILE", "95"))
+        self.min_delay = float(os.environ.get("LLM_HEDGE_MIN_DELAY", "1"))
+        self.max_delay = float(os.environ.get("LLM_HEDGE_MAX_DELAY", "30"))
+        self.default_delay = float(os.environ.get("LLM_HEDGE_DEFAULT_DELAY", "10"))
+        self.min_samples = int(os.environ.get("LLM_HEDGE_MIN_SAMPLES", "20"))
+        self.fallback_model = os.environ.get("LLM_HEDGE_FALLBACK_MODEL") or None
+        self._window = int(os.environ.get("LLM_HEDGE_WINDOW", "200"))
+        self._lock = threading.Lock()
+        self._latencies: Dict[str, Deque[float]] = {}
+        self.calls = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.primary_wins = 0
+
+    def _record(self, model: str, seconds: float) -> None:
+        with self._lock:
+            window = self._latencies.get(model)
+            if window is None:
+                window = self._latencies[model] = deque(maxlen=self._window)
+            window.append(seconds)
+
+    def delay_for(self, model: str) -> float:
+        with self._lock:
+            samples = sorted(self._latencies.get(model, ()))
+        if len(samples) < self.min_samples:
+            delay = self.default_delay
+        else:
+            index = min(len(samples) - 1, int(len(samples) * self.percentile / 100))
+            delay = samples[index]
+        return min(max(delay, self.min_delay), self.max_delay)
+
+    async def run(self, model: str, call: Callable[[str], Awaitable[T]]) -> T:
+        """Run `call(model)`, hedging with `call(fallback or model)` if it is slow."""
+        with self._lock:
+            self.calls += 1
+        start = time.monotonic()
+        if not self.enabled:
+            result = await call(model)
+            self._record(model, time.monotonic() - start)
+            return result
+
+        delay = self.delay_for(model)
+        primary = asyncio.ensure_future(call(model))
+        tasks = [primary]
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=delay)
+            if done:
+                result = primary.result()
+                self._record(model, time.monotonic() - start)
+                return result
+
+            with self._lock:
+                self.hedged += 1
+            backup_model = self.fallback_model or model
+            print(f"[HEDGE] {model} slower than {delay:.2f}s, hedging with {backup_model}")
+            tasks.append(asyncio.ensure_future(call(backup_model)))
+            pending = set(tasks)
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is not None:
+                        error = task.exception()
+                        continue
+                    with self._lock:
+                        if task is primary:
+                            self.primary_wins += 1
+                        else:
+                            self.hedge_wins += 1
+                    # Censored when the hedge wins: the primary took at least this long
+                    self._record(model, time.monotonic() - start)
+                    return task.result()
+            raise error  # type: ignore[misc]
+        finally:
+            # Cancel the losing (or abandoned) attempt so its connection is released
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            models = list(self._latencies)
+            calls, hedged = self.calls, self.hedged
+            stats: Dict[str, Any] = {
+                "enabled": self.enabled,
+                "fallback_model": self.fallback_model,
+                "calls": calls,
+                "hedged": hedged,
+                "hedge_rate": round(hedged / calls, 4) if calls else 0.0,
+                "hedge_wins": self.hedge_wins,
+                "primary_wins": self.primary_wins,
+            }
+        stats["delay_seconds"] = {model: round(self.delay_for(model), 3) for model in models}
+        return stats
+
+
+_policy: Optional[HedgePolicy] = None
+_policy_lock = threading.Lock()
+
+
+def get_hedge_policy() -> HedgePolicy:
+    global _policy
+    if _policy is None:
+        with _policy_lock:
+            if _policy is None:
+                _policy = HedgePolicy()
+    return _policy
@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+import re
+from typing import BinaryIO, Iterator, Optional, Tuple
+
+_BYTE_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header matches `etag` (weak comparison, so
+    a W/ prefix on either side is ignored, and "*" matches anything)."""
+    if not if_none_match:
+        return False
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in candidates or etag.removeprefix("W/") in candidates
+
+
+def byte_range(range_header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """(start, end) inclusive for a single "bytes=" Range header, or None when
+    the header is absent or not a single byte range (serve the whole body).
+    Raises ValueError when the range cannot be satisfied (416)."""
+    match = _BYTE_RANGE_RE.match((range_header or "").strip())
+    if not match or match.groups() == ("", ""):
+        return None
+    first, last = match.groups()
+    if not first:
+        start, end = max(size - int(last), 0), size - 1
+    else:
+        start, end = int(first), min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise ValueError(f"Range not satisfiable for {size} bytes")
+    return start, end
+
+
+def iter_file_range(handle: BinaryIO, start: int, length: int, chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+    """Yield `length` bytes of an open binary file from `start`, then close it."""
+    try:
+        handle.seek(start)
+        while length > 0:
+            chunk = handle.read(min(chunk_size, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+    finally:
+        handle.close()
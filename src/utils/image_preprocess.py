@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+import base64
+import binascii
+import hashlib
+import importlib.util
+import io
+import math
+import os
+import struct
+from typing import Any, Dict, List, Optional, Tuple
+
+# Pillow is optional: without it images are still deduplicated and get a
+# detail level from their header dimensions, but are not resized or re-encoded
+_HAS_PIL = importlib.util.find_spec("PIL") is not None
+
+# OpenAI's high-detail pipeline fits images into 2048x2048, then scales the
+# short side down to 768; anything larger is downscaled server-side anyway
+MAX_LONG_SIDE = int(os.environ.get("VISION_MAX_LONG_SIDE", "2048"))
+MAX_SHORT_SIDE = int(os.environ.get("VISION_MAX_SHORT_SIDE", "768"))
+LOW_DETAIL_SIDE = int(os.environ.get("VISION_LOW_DETAIL_SIDE", "512"))
+JPEG_QUALITY = int(os.environ.get("VISION_JPEG_QUALITY", "85"))
+
+LOW_DETAIL_TOKENS = 85
+TILE_TOKENS = 170
+
+
+def _image_size(data: bytes) -> Optional[Tuple[int, int]]:
+    """(width, height) read from a PNG, GIF or JPEG header, without decoding."""
+    if data[:8] == b"\x89PNG\r\n\x1a\n" and len(data) >= 24:
+        return struct.unpack(">II", data[16:24])
+    if data[:6] in (b"GIF87a", b"GIF89a") and len(data) >= 10:
+        return struct.unpack("<HH", data[6:10])
+    if data[:2] == b"\xff\xd8":
+        i = 2
+        while i + 9 < len(data):
+            if data[i] != 0xFF:
+                i += 1
+                continue
+            marker = data[i + 1]
+            if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7:
+                i += 2
+                continue
+            length = struct.unpack(">H", data[i + 2:i + 4])[0]
+            # SOF0-SOF15 carry the frame size, except DHT (C4), JPG (C8), DAC (CC)
+            if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+                height, width = struct.unpack(">HH", data[i + 5:i + 9])
+                return width, height
+            i += 2 + length
+    return None
+
+
+def _fit_size(width: int, height: int, detail: str) -> Tuple[int, int]:
+    """Largest size the model actually looks at for this detail level."""
+    if detail == "low":
+        scale = min(1.0, LOW_DETAIL_SIDE / max(width, height))
+    else:
+        scale = min(1.0, MAX_LONG_SIDE / max(width, height))
+        short_side = min(width, height) * scale
+        if short_side > MAX_SHORT_SIDE:
+            scale *= MAX_SHORT_SIDE / short_side
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def estimate_image_tokens(width: int, height: int, detail: str) -> int:
+    """OpenAI vision token estimate: 85 base + 170 per 512px tile at high detail."""
+    if detail == "low":
+        return LOW_DETAIL_TOKENS
+    fit_w, fit_h = _fit_size(width, height, "high")
+    return LOW_DETAIL_TOKENS + TILE_TOKENS * math.ceil(fit_w / 512) * math.ceil(fit_h / 512)
+
+
+def choose_detail(size: Optional[Tuple[int, int]], hint: Optional[str]) -> Optional[str]:
+    """Explicit low/high hints win; "auto" picks low for images that already
+    fit a single low-detail tile, where high detail adds tokens but no pixels."""
+    if hint in ("low", "high"):
+        return hint
+    if size is None:
+        return None
+    return "low" if max(size) <= LOW_DETAIL_SIDE else "high"
+
+
+def _reencode(data: bytes, mime: str, detail: str) -> Tuple[bytes, str, Tuple[int, int], Tuple[int, int]]:
+    """Returns (bytes, mime, original size, new size); keeps the original
+    bytes when re-encoding at the same size would not make them smaller."""
+    from PIL import Image
+
+    with Image.open(io.BytesIO(data)) as image:
+        image.load()
+        original = image.size
+        target = _fit_size(image.width, image.height, detail)
+        if target != image.size:
+            image = image.resize(target, Image.LANCZOS)
+        has_alpha = image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info)
+        out = io.BytesIO()
+        if has_alpha:
+            image.save(out, format="PNG", optimize=True)
+            new_mime = "image/png"
+        else:
+            image.convert("RGB").save(out, format="JPEG", quality=JPEG_QUALITY, optimize=True)
+            new_mime = "image/jpeg"
+        size = image.size
+    encoded = out.getvalue()
+    if len(encoded) >= len(data) and size == original:
+        return data, mime, original, original
+    return encoded, new_mime, original, size
+
+
+def preprocess_images(images: List[dict], detail_hint: Optional[str] = None) -> Tuple[List[dict], Dict[str, Any]]:
+    """Decode, dedupe, downscale and re-encode vision inputs once per request.
+
+    Returns the images in the same dict shape `_build_vision_content` accepts
+    (plus a `detail` key) and a report with bytes and estimated tokens saved.
+    Token savings compare against sending every input as-is at OpenAI's
+    default detail; URL images are only deduplicated.
+    """
+    seen: set = set()
+    prepared: List[dict] = []
+    report: Dict[str, Any] = {
+        "images_in": len(images),
+        "images_out": 0,
+        "duplicates_removed": 0,
+        "bytes_in": 0,
+        "bytes_out": 0,
+        "bytes_saved": 0,
+        "estimated_tokens_in": 0,
+        "estimated_tokens_out": 0,
+        "estimated_tokens_saved": 0,
+        "resized": 0,
+        "resampling": _HAS_PIL,
+    }
+
+    for img in images:
+        hint = img.get("detail") or detail_hint
+        if img.get("source_type") == "url" and img.get("url"):
+            if ("url", img["url"]) in seen:
+                report["duplicates_removed"] += 1
+                continue
+            seen.add(("url", img["url"]))
+            prepared.append({**img, "detail": hint if hint in ("low", "high") else None})
+            continue
+
+        b64_data = img.get("data") or img.get("b64") or img.get("base64")
+        if img.get("source_type") != "base64" or not b64_data:
+            continue
+        try:
+            raw = base64.b64decode(b64_data, validate=False)
+        except (binascii.Error, ValueError):
+            raise ValueError("Invalid base64 image data")
+        report["bytes_in"] += len(raw)
+        digest = hashlib.sha256(raw).digest()
+        if digest in seen:
+            report["duplicates_removed"] += 1
+            # A dropped duplicate still counts what sending it would have cost
+            size = _image_size(raw)
+            report["estimated_tokens_in"] += estimate_image_tokens(*size, "high") if size else 0
+            continue
+        seen.add(digest)
+
+        mime = img.get("mime_type") or img.get("mimeType") or "image/jpeg"
+        size = original_size = _image_size(raw)
+        encoded = raw
+        detail = choose_detail(size, hint)
+        if _HAS_PIL:
+            try:
+                encoded, mime, original_size, size = _reencode(raw, mime, detail or "high")
+                detail = choose_detail(original_size, hint)
+            except Exception as exc:
+                print(f"[VISION] Could not re-encode image, sending as-is: {exc}")
+            if size != original_size:
+                report["resized"] += 1
+
+        report["estimated_tokens_in"] += estimate_image_tokens(*original_size, "high") if original_size else 0
+        report["bytes_out"] += len(encoded)
+        report["estimated_tokens_out"] += estimate_image_tokens(*size, detail or "high") if size else 0
+        prepared.append({
+            "source_type": "base64",
+            "data": b64_data if encoded is raw else base64.b64encode(encoded).decode("ascii"),
+            "mime_type": mime,
+            "detail": detail,
+        })
+
+    report["images_out"] = len(prepared)
+    report["bytes_saved"] = report["bytes_in"] - report["bytes_out"]
+    report["estimated_tokens_saved"] = report["estimated_tokens_in"] - report["estimated_tokens_out"]
+    return prepared, report
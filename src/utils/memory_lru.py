@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Generic, Hashable, List, Optional, TypeVar
+
+V = TypeVar("V")
+
+
+class MemoryLRUCache(Generic[V]):
+    """Thread-safe, entry-bounded in-process LRU cache with hit/miss counters.
+
+    `on_evict(key, value)` is called, outside the lock, for every entry put()
+    drops to make room, so values that hold resources can release them.
+    """
+
+    def __init__(self, max_entries: int, on_evict: Optional[Callable[[Hashable, V], None]] = None) -> None:
+        self.max_entries = max_entries
+        self.on_evict = on_evict
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, V]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[V]:
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key]
+
+    def put(self, key: Hashable, value: V) -> V:
+        evicted = []
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > max(self.max_entries, 0):
+                evicted.append(self._entries.popitem(last=False))
+                self.evictions += 1
+        if self.on_evict is not None:
+            for evicted_key, evicted_value in evicted:
+                self.on_evict(evicted_key, evicted_value)
+        return value
+
+    def pop(self, key: Hashable) -> Optional[V]:
+        with self._lock:
+            return self._entries.pop(key, None)
+
+    def values(self) -> List[V]:
+        with self._lock:
+            return list(self._entries.values())
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
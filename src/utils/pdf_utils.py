@@ -1,4 +1,27 @@
+import hashlib
+import os
 import re
+from functools import lru_cache
+from pathlib import Path
+from typing import FrozenSet, Iterable, List, Optional, Tuple
+
+from .memory_lru import MemoryLRUCache
+
+
+_TAILWIND_STATIC_LINK = '<link rel="stylesheet" href="https://cdn.jsdelivr.net/npm/tailwindcss@2.2.19/dist/tailwind.min.css">'
+
+_TAILWIND_PLAY_SCRIPT_RE = re.compile(
+    r"<script[^>]*src=\"https://cdn\.tailwindcss\.com\"[^>]*></script>",
+    re.IGNORECASE,
+)
+_STYLESHEET_LINK_RE = re.compile(
+    r"<link[^>]*rel=\"stylesheet\"[^>]*href=([\"\'])([^\"\']+)([\"\'])[^>]*>",
+    re.IGNORECASE,
+)
+# Cheap tokenizer for the only tags any rewrite cares about. Candidates are
+# then checked with the precise patterns above, which keeps the scan on the
+# regex engine's fast path for documents that are mostly other markup.
+_ASSET_TAG_RE = re.compile(r"<(?:script\b[^>]*></script>|link\b[^>]*>)", re.IGNORECASE)
 
 
 def rewrite_tailwind_play_to_static(html_input: str) -> str:
@@ -10,12 +33,25 @@ def rewrite_tailwind_play_to_static(html_input: str) -> str:
     if "cdn.tailwindcss.com" not in html_input:
         return html_input
 
-    return re.sub(
-        r"<script[^>]*src=\"https://cdn\.tailwindcss\.com\"[^>]*></script>",
-        '<link rel="stylesheet" href="https://cdn.jsdelivr.net/npm/tailwindcss@2.2.19/dist/tailwind.min.css">',
-        html_input,
-        flags=re.IGNORECASE,
-    )
+    return _TAILWIND_PLAY_SCRIPT_RE.sub(_TAILWIND_STATIC_LINK, html_input)
+
+
+def _file_url_for_href(href: str) -> Optional[str]:
+    if href.startswith("file://"):
+        return None
+    if href.startswith("/assets/"):
+        return "file:///app" + href
+    if href.startswith("assets/"):
+        return "file:///app/" + href
+    if href == "tailwind.min.css":
+        return "file:///app/assets/tailwind.min.css"
+    return None
+
+
+def _replace_group(match: re.Match, group: int, value: str) -> str:
+    tag = match.group(0)
+    offset = match.start(0)
+    return tag[: match.start(group) - offset] + value + tag[match.end(group) - offset:]
 
 
 def rewrite_local_css_hrefs_to_file_urls(html_input: str) -> str:
@@ -29,25 +65,253 @@ def rewrite_local_css_hrefs_to_file_urls(html_input: str) -> str:
     """
 
     def _rewrite(match: re.Match) -> str:
-        quote = match.group(1)
-        href = match.group(2)
-        if href.startswith("file://"):
+        new_href = _file_url_for_href(match.group(2))
+        if new_href is None:
             return match.group(0)
-        if href.startswith("/assets/"):
-            new_href = "file:///app" + href
-        elif href.startswith("assets/"):
-            new_href = "file:///app/" + href
-        elif href == "tailwind.min.css":
-            new_href = "file:///app/assets/tailwind.min.css"
-        else:
-            return match.group(0)
-        return match.group(0).replace(f"href={quote}{href}{quote}", f"href={quote}{new_href}{quote}")
+        return _replace_group(match, 2, new_href)
+
+    return _STYLESHEET_LINK_RE.sub(_rewrite, html_input)
+
+
+def rewrite_html_for_pdf(html_input: str, purge_css: bool = True, safelist: Iterable[str] = ()) -> str:
+    """Apply every asset rewrite needed by wkhtmltopdf in a single pass.
+
+    Equivalent to rewrite_tailwind_play_to_static, then
+    inline_purged_local_stylesheets (when purge_css), then
+    rewrite_local_css_hrefs_to_file_urls, but scans and copies the document
+    only once.
+    """
+    used: Optional[FrozenSet[str]] = None
+
+    def _rewrite(match: re.Match) -> str:
+        nonlocal used
+        tag = match.group(0)
+        if tag[1] in "sS":
+            return _TAILWIND_STATIC_LINK if _TAILWIND_PLAY_SCRIPT_RE.fullmatch(tag) else tag
+        link = _STYLESHEET_LINK_RE.fullmatch(tag)
+        if link is None:
+            return tag
+        href = link.group(2)
+        if purge_css:
+            path = _local_asset_path(href)
+            if path is not None:
+                if used is None:
+                    used = _purge_keep_classes(html_input, safelist)
+                return f"<style>{purge_stylesheet(path, used)}</style>"
+        new_href = _file_url_for_href(href)
+        if new_href is None:
+            return tag
+        return _replace_group(link, 2, new_href)
+
+    return _ASSET_TAG_RE.sub(_rewrite, html_input)
+
+
+# ---------------------------------------------------------------------------
+# Per-document CSS purging
+# ---------------------------------------------------------------------------
+
+_CLASS_ATTR_RE = re.compile(r"\bclass\s*=\s*(?:\"([^\"]*)\"|'([^']*)'|([^\s\"'=<>`]+))", re.IGNORECASE)
+_SELECTOR_CLASS_RE = re.compile(r"\.((?:\\[0-9a-fA-F]{1,6}\s?|\\.|[\w-])+)")
+_CSS_ESCAPE_RE = re.compile(r"\\([0-9a-fA-F]{1,6}\s?|.)")
+
+_purge_cache: MemoryLRUCache[str] = MemoryLRUCache(int(os.environ.get("PDF_PURGE_CACHE_SIZE", "256")))
+
+# Classes kept by every purge, for markup the scan cannot see (classes added
+# by scripts or built in template strings); comma or space separated
+_PURGE_SAFELIST: FrozenSet[str] = frozenset(os.environ.get("PDF_PURGE_SAFELIST", "").replace(",", " ").split())
+
+
+def get_assets_dir() -> Path:
+    # repo_root/src/utils/... -> repo_root
+    return Path(__file__).resolve().parents[2] / "assets"
+
+
+def _local_asset_path(href: str) -> Optional[Path]:
+    """Map a stylesheet href to a file under assets/, or None if it is not local."""
+    if href.startswith("file:///app/assets/"):
+        name = href[len("file:///app/assets/"):]
+    elif href.startswith("/assets/"):
+        name = href[len("/assets/"):]
+    elif href.startswith("assets/"):
+        name = href[len("assets/"):]
+    elif href == "tailwind.min.css":
+        name = href
+    else:
+        return None
+    path = get_assets_dir() / name
+    return path if path.is_file() else None
+
+
+def _unescape_css_ident(ident: str) -> str:
+    def _sub(match: re.Match) -> str:
+        token = match.group(1)
+        if len(token) > 1 or token in "0123456789abcdefABCDEF":
+            try:
+                return chr(int(token.strip(), 16))
+            except ValueError:
+                return token
+        return token
+
+    return _CSS_ESCAPE_RE.sub(_sub, ident)
+
 
-    return re.sub(
-        r"<link[^>]*rel=\"stylesheet\"[^>]*href=([\"\'])([^\"\']+)([\"\'])[^>]*>",
-        _rewrite,
-        html_input,
-        flags=re.IGNORECASE,
-    )
+def collect_html_class_names(html_input: str) -> FrozenSet[str]:
+    """Return every class name referenced by a class attribute (quoted or not).
 
+    Classes that only appear in scripts are not seen; see PDF_PURGE_SAFELIST.
+    """
+    # Large documents repeat the same few class attributes; dedupe before splitting
+    values = {double or single or bare for double, single, bare in _CLASS_ATTR_RE.findall(html_input)}
+    return frozenset(" ".join(values).split())
+
+
+def _purge_keep_classes(html_input: str, safelist: Iterable[str]) -> FrozenSet[str]:
+    return collect_html_class_names(html_input) | _PURGE_SAFELIST | frozenset(safelist)
+
+
+def _split_top_level(text: str, sep: str) -> List[str]:
+    parts: List[str] = []
+    depth = 0
+    start = 0
+    for i, ch in enumerate(text):
+        if ch in "([":
+            depth += 1
+        elif ch in ")]":
+            depth -= 1
+        elif ch == sep and depth == 0:
+            parts.append(text[start:i])
+            start = i + 1
+    parts.append(text[start:])
+    return parts
+
+
+def _parse_css_blocks(css: str) -> List[Tuple[str, Optional[str]]]:
+    """Split a stylesheet into top-level (prelude, body) pairs.
+
+    Statements without a block (e.g. @import/@charset) have body None.
+    Comments are dropped.
+    """
+    blocks: List[Tuple[str, Optional[str]]] = []
+    i = 0
+    n = len(css)
+    while i < n:
+        if css[i].isspace():
+            i += 1
+            continue
+        if css.startswith("/*", i):
+            end = css.find("*/", i + 2)
+            i = n if end == -1 else end + 2
+            continue
+        brace = css.find("{", i)
+        semi = css.find(";", i)
+        if brace == -1:
+            rest = css[i:].strip()
+            if rest:
+                blocks.append((rest, None))
+            break
+        if semi != -1 and semi < brace and css[i:semi].lstrip().startswith("@"):
+            blocks.append((css[i:semi + 1].strip(), None))
+            i = semi + 1
+            continue
+        depth = 0
+        j = brace
+        quote = ""
+        while j < n:
+            ch = css[j]
+            if quote:
+                if ch == "\\":
+                    j += 1
+                elif ch == quote:
+                    quote = ""
+            elif ch in "\"'":
+                quote = ch
+            elif ch == "{":
+                depth += 1
+            elif ch == "}":
+                depth -= 1
+                if depth == 0:
+                    break
+            j += 1
+        prelude = css[i:brace].strip()
+        if prelude:
+            blocks.append((prelude, css[brace + 1:j]))
+        i = j + 1
+    return blocks
+
+
+def _selector_matches(selector: str, used: FrozenSet[str]) -> bool:
+    for part in _split_top_level(selector, ","):
+        classes = [_unescape_css_ident(m) for m in _SELECTOR_CLASS_RE.findall(part)]
+        if all(c in used for c in classes):
+            return True
+    return False
+
+
+def _purge_blocks(blocks: List[Tuple[str, Optional[str]]], used: FrozenSet[str]) -> str:
+    out: List[str] = []
+    for prelude, body in blocks:
+        if body is None:
+            out.append(prelude)
+        elif prelude.startswith("@"):
+            keyword = prelude.split(None, 1)[0].lower()
+            if keyword in ("@media", "@supports", "@layer", "@container"):
+                inner = _purge_blocks(_parse_css_blocks(body), used)
+                if inner:
+                    out.append(f"{prelude}{{{inner}}}")
+            else:
+                # @font-face, @keyframes, @page ... are small; keep verbatim
+                out.append(f"{prelude}{{{body}}}")
+        elif _selector_matches(prelude, used):
+            out.append(f"{prelude}{{{body}}}")
+    return "".join(out)
+
+
+@lru_cache(maxsize=8)
+def _load_stylesheet_blocks(path: str, mtime_ns: int) -> List[Tuple[str, Optional[str]]]:
+    # mtime_ns is part of the cache key so edits to the asset are picked up
+    return _parse_css_blocks(Path(path).read_text(encoding="utf-8"))
+
+
+def purge_stylesheet(path: Path, used: FrozenSet[str]) -> str:
+    """Return the rules of `path` that can match the given class names.
+
+    Results are cached per (stylesheet, class-set) hash in a bounded LRU.
+    """
+    mtime_ns = path.stat().st_mtime_ns
+    digest = hashlib.sha256(
+        f"{path}\0{mtime_ns}\0{' '.join(sorted(used))}".encode("utf-8")
+    ).hexdigest()
+
+    cached = _purge_cache.get(digest)
+    if cached is not None:
+        return cached
+    return _purge_cache.put(digest, _purge_blocks(_load_stylesheet_blocks(str(path), mtime_ns), used))
+
+
+def get_purge_cache_info() -> dict:
+    return _purge_cache.stats()
+
+
+def inline_purged_local_stylesheets(html_input: str, safelist: Iterable[str] = ()) -> str:
+    """Replace links to local stylesheets under assets/ with an inline <style>
+    containing only the rules matching classes used in the document (plus
+    `safelist` and PDF_PURGE_SAFELIST).
+
+    wkhtmltopdf otherwise parses and matches the whole stylesheet for every
+    render. Non-local stylesheets are left untouched.
+    """
+    if "stylesheet" not in html_input:
+        return html_input
+
+    used: Optional[FrozenSet[str]] = None
+
+    def _inline(match: re.Match) -> str:
+        nonlocal used
+        path = _local_asset_path(match.group(2))
+        if path is None:
+            return match.group(0)
+        if used is None:
+            used = _purge_keep_classes(html_input, safelist)
+        return f"<style>{purge_stylesheet(path, used)}</style>"
 
+    return _STYLESHEET_LINK_RE.sub(_inline, html_input)
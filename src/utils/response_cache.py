@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+from .memory_lru import MemoryLRUCache
+
+
+class SQLiteLRUStore:
+    """JSON-serialisable values in an in-process LRU in front of a SQLite table.
+
+    The table lives in a WAL-mode SQLite file shared by workers and kept
+    across restarts; rows read from it are promoted to memory. Each entry
+    is stamped with the time it was stored and is gone once older than
+    `max_age_seconds`; expired rows are purged every 500 writes. Subclasses
+    decide what an entry's age means for a lookup.
+    """
+
+    def __init__(self, db_path: str, table: str, max_age_seconds: float, memory_entries: int) -> None:
+        self.max_age_seconds = max_age_seconds
+        self._table = table
+        self._memory: MemoryLRUCache[Tuple[float, Any]] = MemoryLRUCache(memory_entries)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} (key TEXT PRIMARY KEY, value TEXT NOT NULL, stored_at REAL NOT NULL)"
+        )
+        self._writes = 0
+        self.disk_hits = 0
+
+    def _read(self, key: str) -> Optional[Tuple[float, Any]]:
+        """(stored_at, value) for an entry younger than max_age_seconds, else None."""
+        cutoff = time.time() - self.max_age_seconds
+        entry = self._memory.get(key)
+        if entry is not None:
+            if entry[0] > cutoff:
+                return entry
+            self._memory.pop(key)
+            return None
+
+        with self._lock:
+            row = self._conn.execute(f"SELECT value, stored_at FROM {self._table} WHERE key = ?", (key,)).fetchone()
+        if row is None or row[1] <= cutoff:
+            return None
+        entry = (row[1], json.loads(row[0]))
+        self._memory.put(key, entry)
+        with self._lock:
+            self.disk_hits += 1
+        return entry
+
+    def _write(self, key: str, value: Any) -> None:
+        stored_at = time.time()
+        self._memory.put(key, (stored_at, value))
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self._table} (key, value, stored_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value), stored_at),
+            )
+            self._writes += 1
+            if self._writes % 500 == 0:
+                self._conn.execute(f"DELETE FROM {self._table} WHERE stored_at <= ?", (time.time() - self.max_age_seconds,))
+
+    def delete(self, key: str) -> None:
+        self._memory.pop(key)
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self._table} WHERE key = ?", (key,))
+
+    def stats(self) -> Dict[str, Any]:
+        return {"memory": self._memory.stats(), "disk_hits": self.disk_hits}
+
+
+class ResponseCache(SQLiteLRUStore):
+    """Two-tier cache of JSON-serialisable responses with a TTL."""
+
+    def __init__(self, db_path: str, ttl_seconds: float, memory_entries: int) -> None:
+        self.ttl_seconds = ttl_seconds
+        super().__init__(db_path, "response_entries", ttl_seconds, memory_entries)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._read(key)
+        return entry[1] if entry is not None else None
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        self._write(key, value)
+
+    def stats(self) -> Dict[str, Any]:
+        return {**super().stats(), "ttl_seconds": self.ttl_seconds}
+
+
+_cache: Optional[ResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """Return the process response cache, or None unless RESPONSE_CACHE_ENABLED=1.
+
+    RESPONSE_CACHE_PATH (SQLite file), RESPONSE_CACHE_TTL seconds (default 1 day)
+    and RESPONSE_CACHE_MEMORY_SIZE (default 1024 entries) configure it.
+    """
+    global _cache
+    if os.environ.get("RESPONSE_CACHE_ENABLED", "0") not in ("1", "true", "True"):
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                path = os.environ.get("RESPONSE_CACHE_PATH") or os.path.join(
+                    tempfile.gettempdir(), "handy-response-cache.sqlite3"
+                )
+                _cache = ResponseCache(
+                    path,
+                    ttl_seconds=float(os.environ.get("RESPONSE_CACHE_TTL", str(24 * 3600))),
+                    memory_entries=int(os.environ.get("RESPONSE_CACHE_MEMORY_SIZE", "1024")),
+                )
+    return _cache
+
+
+def hash_text(value: str) -> str:
+    return hashlib.sha256(value.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class CachedResponse:
+    """Response-cache lookup for one deterministic request.
+
+    `status` is the value for the X-Cache response header: HIT, MISS,
+    BYPASS, or None when the request is not cacheable.
+    """
+
+    cache: Optional[ResponseCache]
+    key: Optional[str]
+    bypass: bool
+    status: Optional[str] = None
+
+    async def aget(self) -> Optional[Dict[str, Any]]:
+        if self.cache is None or self.key is None:
+            return None
+        if self.bypass:
+            self.status = "BYPASS"
+            return None
+        # SQLite reads (and the memory promotion) run off the event loop
+        value = await asyncio.to_thread(self.cache.get, self.key)
+        self.status = "HIT" if value is not None else "MISS"
+        return value
+
+    async def astore(self, value: Dict[str, Any]) -> None:
+        if self.cache is not None and self.key is not None:
+            await asyncio.to_thread(self.cache.set, self.key, value)
+
+
+def lookup_response_cache(endpoint: str, cache_control: Optional[str], **parts: Any) -> CachedResponse:
+    """Build the cache lookup for a request; only temperature-0 calls are cached.
+
+    `parts` (temperature, model, prompts, structure hash, image hashes, ...)
+    are hashed together with the endpoint. `Cache-Control: no-cache` skips the lookup
+    but still refreshes the stored response.
+    """
+    cache = get_response_cache()
+    if cache is None or parts.get("temperature") != 0:
+        return CachedResponse(cache=None, key=None, bypass=False)
+    payload = json.dumps({"endpoint": endpoint, **parts}, sort_keys=True, separators=(",", ":"))
+    bypass = "no-cache" in (cache_control or "").lower()
+    return CachedResponse(cache=cache, key=hash_text(payload), bypass=bypass)
@@ -1,9 +1,19 @@
 from __future__ import annotations
 
+import hashlib
+import json
+import os
 from typing import Any, Dict, Tuple, Type
 
 from pydantic import BaseModel, create_model
 
+from .memory_lru import MemoryLRUCache
+
+
+_model_cache: MemoryLRUCache[Type[BaseModel]] = MemoryLRUCache(
+    int(os.environ.get("SCHEMA_MODEL_CACHE_SIZE", "512"))
+)
+
 
 def is_json_schema(obj: Dict[str, Any]) -> bool:
     return obj.get("type") == "object" and isinstance(obj.get("properties"), dict)
@@ -100,11 +110,78 @@ def create_model_from_json_schema(schema: Dict[str, Any]) -> Type[BaseModel]:
     return dynamic
 
 
-def build_pydantic_model(structure: Dict[str, Any]) -> Type[BaseModel]:
-    """Build a Pydantic model from either a JSON Schema or an example dictionary."""
+def _normalize_example(value: Any) -> Any:
+    # Mirror infer_field_type: only the inferred type of a value matters
+    if isinstance(value, bool):
+        return "<bool>"
+    if isinstance(value, int):
+        return "<int>"
+    if isinstance(value, float):
+        return "<float>"
+    if isinstance(value, str):
+        return "<str>"
+    if value is None:
+        return "<null>"
+    if isinstance(value, list):
+        return [_normalize_example(value[0])] if value else []
+    if isinstance(value, dict):
+        return {"<object>": [[k, _normalize_example(v)] for k, v in value.items()]}
+    return "<str>"
+
+
+def _normalize_schema(value: Any) -> Any:
+    # `properties` becomes ordered [name, subschema] pairs so sort_keys cannot reorder fields
+    if isinstance(value, dict):
+        return {
+            key: [[name, _normalize_schema(sub)] for name, sub in sub_value.items()]
+            if key == "properties" and isinstance(sub_value, dict)
+            else _normalize_schema(sub_value)
+            for key, sub_value in value.items()
+        }
+    if isinstance(value, list):
+        return [_normalize_schema(item) for item in value]
+    return value
+
+
+def structure_hash(structure: Dict[str, Any]) -> str:
+    """Canonical hash of a `structure`: structures that build the same model hash equally.
+
+    Example values are reduced to their inferred types, so {"name": "Luka"}
+    and {"name": "Ana"} share a hash. JSON Schemas are hashed with their
+    other keys sorted. Property order is kept in both cases because it is
+    the field order of the model.
+    """
+    if is_json_schema(structure):
+        canonical: Any = {"schema": _normalize_schema(structure)}
+    else:
+        canonical = {"example": _normalize_example(structure)}
+    payload = json.dumps(canonical, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _build_pydantic_model_uncached(structure: Dict[str, Any]) -> Type[BaseModel]:
     if is_json_schema(structure):
         return create_model_from_json_schema(structure)
     if isinstance(structure, dict):
         return create_model_from_example(structure)
     raise ValueError("`structure` must be a JSON Schema object or an example dictionary.")
 
+
+def build_pydantic_model(structure: Dict[str, Any]) -> Type[BaseModel]:
+    """Build a Pydantic model from either a JSON Schema or an example dictionary.
+
+    Built models are cached by structure_hash in a bounded LRU
+    (SCHEMA_MODEL_CACHE_SIZE, default 512) so repeated structures skip
+    create_model and core-schema compilation.
+    """
+    if not isinstance(structure, dict):
+        raise ValueError("`structure` must be a JSON Schema object or an example dictionary.")
+    key = structure_hash(structure)
+    cached = _model_cache.get(key)
+    if cached is not None:
+        return cached
+    return _model_cache.put(key, _build_pydantic_model_uncached(structure))
+
+
+def get_model_cache_info() -> Dict[str, Any]:
+    return _model_cache.stats()
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import hashlib
+import json
+import threading
+from typing import Any, Awaitable, Callable, Dict, TypeVar
+
+T = TypeVar("T")
+
+
+def flight_key(*parts: Any) -> str:
+    """Canonical key for a call: sha256 over the JSON of its parts."""
+    payload = json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SingleFlight:
+    """Collapse concurrent identical calls into one upstream call.
+
+    The first caller for a key runs the call; callers arriving while it is in
+    flight wait for and share its result (or exception). Nothing is kept once
+    the call finishes. `do` covers sync callers on worker threads and `ado`
+    covers coroutines; the two do not share in-flight calls.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self._lock = threading.Lock()
+        self._sync_calls: Dict[str, concurrent.futures.Future] = {}
+        self._async_calls: Dict[str, asyncio.Task] = {}
+        self.calls = 0
+        self.executions = 0
+        self.collapsed = 0
+
+    def do(self, key: str, fn: Callable[[], T]) -> T:
+        with self._lock:
+            self.calls += 1
+            future = self._sync_calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._sync_calls[key] = concurrent.futures.Future()
+                self.executions += 1
+            else:
+                self.collapsed += 1
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn()
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._sync_calls.pop(key, None)
+
+    async def ado(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        with self._lock:
+            self.calls += 1
+            task = self._async_calls.get(key)
+            if task is None:
+                task = self._async_calls[key] = asyncio.ensure_future(fn())
+                task.add_done_callback(lambda _: self._forget(key, task))
+                self.executions += 1
+            else:
+                self.collapsed += 1
+        # Shield so one caller disconnecting does not cancel the shared call
+        return await asyncio.shield(task)
+
+    def _forget(self, key: str, task: asyncio.Task) -> None:
+        with self._lock:
+            if self._async_calls.get(key) is task:
+                del self._async_calls[key]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "executions": self.executions,
+                "collapsed": self.collapsed,
+                "in_flight": len(self._sync_calls) + len(self._async_calls),
+                "collapse_rate": round(self.collapsed / self.calls, 4) if self.calls else 0.0,
+            }
+
+
+_groups: Dict[str, SingleFlight] = {}
+_groups_lock = threading.Lock()
+
+
+def get_single_flight(name: str) -> SingleFlight:
+    group = _groups.get(name)
+    if group is None:
+        with _groups_lock:
+            group = _groups.get(name)
+            if group is None:
+                group = _groups[name] = SingleFlight(name)
+    return group
+
+
+def get_single_flight_stats() -> Dict[str, Dict[str, Any]]:
+    return {name: group.stats() for name, group in _groups.items()}
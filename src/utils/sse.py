@@ -0,0 +1,19 @@
+from __future__ import annotations
+
+import json
+from typing import Any, Optional
+
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    # Disable proxy buffering (nginx, Railway) so events are flushed immediately
+    "X-Accel-Buffering": "no",
+}
+
+
+def format_sse(event: str, data: Any, event_id: Optional[str] = None) -> str:
+    """Encode one Server-Sent Event with a JSON payload; `event_id` is sent
+    back by reconnecting clients as Last-Event-ID."""
+    payload = json.dumps(data, ensure_ascii=False)
+    prefix = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{prefix}event: {event}\ndata: {payload}\n\n"
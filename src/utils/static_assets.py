@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+import importlib.util
+import mimetypes
+import os
+import re
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Mapping, Optional
+
+from fastapi import Request
+from fastapi.responses import Response
+
+from .http_cache import etag_matches
+
+# Brotli is optional: without it assets are only precompressed with gzip
+_HAS_BROTLI = importlib.util.find_spec("brotli") is not None
+
+_MEDIA_TYPES = {
+    ".html": "text/html; charset=utf-8",
+    ".css": "text/css; charset=utf-8",
+    ".js": "text/javascript; charset=utf-8",
+}
+
+# Assets are referenced with a content hash (?v=...), so they never change
+# under a URL; the HTML entry point is always revalidated against its ETag
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+
+@dataclass(frozen=True)
+class StaticAsset:
+    media_type: str
+    etag: str
+    cache_control: str
+    # Encoding ("identity", "gzip", "br") -> body
+    bodies: Mapping[str, bytes] = field(default_factory=dict)
+
+
+def _compress(body: bytes) -> Dict[str, bytes]:
+    bodies = {"identity": body}
+    # Tiny bodies are not worth the decompression round trip
+    if len(body) < 512:
+        return bodies
+    gzipped = gzip.compress(body, compresslevel=9, mtime=0)
+    if len(gzipped) < len(body):
+        bodies["gzip"] = gzipped
+    if _HAS_BROTLI:
+        import brotli
+
+        compressed = brotli.compress(body, quality=11)
+        if len(compressed) < len(body):
+            bodies["br"] = compressed
+    return bodies
+
+
+def _accepted_encodings(header: str) -> Dict[str, float]:
+    accepted: Dict[str, float] = {}
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        if not name:
+            continue
+        quality = 1.0
+        match = re.search(r"q=([0-9.]+)", params)
+        if match:
+            try:
+                quality = float(match.group(1))
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+    return accepted
+
+
+def _choose_encoding(asset: StaticAsset, accept_encoding: str) -> str:
+    accepted = _accepted_encodings(accept_encoding)
+    for encoding in ("br", "gzip"):
+        if encoding in asset.bodies and accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+            return encoding
+    return "identity"
+
+
+class StaticBundle:
+    """A directory of static files loaded, hashed and compressed once.
+
+    `index.html` is the entry point: references to other files of the bundle
+    (`{prefix}/<name>`) are rewritten to `{prefix}/<name>?v=<hash>` so those
+    can be cached as immutable, while the HTML itself is revalidated with
+    its ETag. Every file is kept in memory as identity, gzip and (with the
+    brotli package) br bodies.
+    """
+
+    def __init__(self, directory: Path, prefix: str) -> None:
+        self.directory = directory
+        self.prefix = prefix.rstrip("/")
+        self.assets: Dict[str, StaticAsset] = {}
+        self._load()
+
+    def _load(self) -> None:
+        raw = {path.name: path.read_bytes() for path in sorted(self.directory.iterdir()) if path.is_file()}
+        versions = {name: hashlib.sha256(body).hexdigest()[:16] for name, body in raw.items()}
+
+        for name, body in raw.items():
+            if name == "index.html":
+                continue
+            self.assets[name] = self._asset(name, body, IMMUTABLE_CACHE_CONTROL)
+
+        if "index.html" in raw:
+            html = raw["index.html"].decode("utf-8")
+            for name, version in versions.items():
+                html = html.replace(f"{self.prefix}/{name}\"", f"{self.prefix}/{name}?v={version}\"")
+            self.assets["index.html"] = self._asset("index.html", html.encode("utf-8"), REVALIDATE_CACHE_CONTROL)
+
+        sizes = {name: {enc: len(b) for enc, b in asset.bodies.items()} for name, asset in self.assets.items()}
+        print(f"[STATIC] Loaded {self.directory.name} bundle: {sizes}")
+
+    @staticmethod
+    def _asset(name: str, body: bytes, cache_control: str) -> StaticAsset:
+        suffix = Path(name).suffix
+        media_type = _MEDIA_TYPES.get(suffix) or mimetypes.guess_type(name)[0] or "application/octet-stream"
+        return StaticAsset(
+            media_type=media_type,
+            etag=hashlib.sha256(body).hexdigest()[:32],
+            cache_control=cache_control,
+            bodies=_compress(body),
+        )
+
+    def response(self, name: str, request: Request) -> Optional[Response]:
+        """Response for `name` negotiated against the request, or None if unknown."""
+        asset = self.assets.get(name)
+        if asset is None:
+            return None
+        encoding = _choose_encoding(asset, request.headers.get("accept-encoding", ""))
+        # One ETag per representation, so caches never mix encodings
+        etag = f'"{asset.etag}"' if encoding == "identity" else f'"{asset.etag}-{encoding}"'
+        headers = {"ETag": etag, "Cache-Control": asset.cache_control, "Vary": "Accept-Encoding"}
+
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=headers)
+
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        return Response(content=asset.bodies[encoding], media_type=asset.media_type, headers=headers)
+
+
+_builder_bundle: Optional[StaticBundle] = None
+_builder_lock = threading.Lock()
+
+
+def get_builder_bundle() -> StaticBundle:
+    global _builder_bundle
+    if _builder_bundle is None:
+        with _builder_lock:
+            if _builder_bundle is None:
+                directory = Path(os.environ.get("BUILDER_STATIC_DIR") or Path(__file__).resolve().parent.parent / "static" / "builder")
+                _builder_bundle = StaticBundle(directory, "/builder/assets")
+    return _builder_bundle
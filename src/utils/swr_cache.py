@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, Tuple
+
+from .response_cache import SQLiteLRUStore
+
+FRESH = "HIT"
+STALE = "STALE"
+MISS = "MISS"
+
+
+class SWRCache(SQLiteLRUStore):
+    """TTL cache of JSON-serialisable values with stale-while-revalidate.
+
+    An entry is fresh for `ttl_seconds` after it was stored and may then be
+    served stale for another `stale_seconds` while one background refresh
+    replaces it; after that it is a miss. Storage is the same memory LRU in
+    front of SQLite as ResponseCache. Freshness is computed from the stored
+    time at read time, so TTL changes apply to existing entries.
+    """
+
+    def __init__(self, db_path: str, table: str, ttl_seconds: float, stale_seconds: float, memory_entries: int) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.stale_seconds = stale_seconds
+        super().__init__(db_path, table, ttl_seconds + stale_seconds, memory_entries)
+        self._refreshing: Set[str] = set()
+        self._tasks: Set[asyncio.Task] = set()
+        self.fresh_hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.refresh_failures = 0
+
+    def get(self, key: str) -> Tuple[Optional[Dict[str, Any]], str]:
+        """(value, HIT | STALE) for a usable entry, (None, MISS) otherwise."""
+        entry = self._read(key)
+        state = None
+        if entry is not None:
+            state = FRESH if time.time() - entry[0] < self.ttl_seconds else STALE
+        with self._lock:
+            if state == FRESH:
+                self.fresh_hits += 1
+            elif state == STALE:
+                self.stale_hits += 1
+            else:
+                self.misses += 1
+        if state is None:
+            return None, MISS
+        return entry[1], state
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        self._write(key, value)
+
+    async def aget_or_fetch(
+        self, key: str, fetch: Callable[[], Awaitable[Dict[str, Any]]], bypass: bool = False
+    ) -> Tuple[Dict[str, Any], str]:
+        """Cached value and its status (HIT, STALE, MISS or BYPASS).
+
+        A stale value is returned immediately and refreshed in the background,
+        at most one refresh per key at a time; a miss or bypass awaits `fetch`
+        and stores the result. SQLite reads and writes run in worker threads.
+        """
+        if not bypass:
+            value, state = await asyncio.to_thread(self.get, key)
+            if state == FRESH:
+                return value, state  # type: ignore[return-value]
+            if state == STALE:
+                self._revalidate(key, fetch)
+                return value, state  # type: ignore[return-value]
+        value = await fetch()
+        await asyncio.to_thread(self.set, key, value)
+        return value, "BYPASS" if bypass else MISS
+
+    async def adelete(self, key: str) -> None:
+        await asyncio.to_thread(self.delete, key)
+
+    def _revalidate(self, key: str, fetch: Callable[[], Awaitable[Dict[str, Any]]]) -> None:
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        async def _refresh() -> None:
+            try:
+                value = await fetch()
+                await asyncio.to_thread(self.set, key, value)
+                with self._lock:
+                    self.refreshes += 1
+            except Exception as exc:
+                with self._lock:
+                    self.refresh_failures += 1
+                print(f"[SWR_CACHE] Background refresh of {self._table} entry failed: {exc}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        # Keep a reference so the task is not garbage-collected mid-flight
+        task = asyncio.ensure_future(_refresh())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.fresh_hits + self.stale_hits + self.misses
+            return {
+                "memory": self._memory.stats(),
+                "disk_hits": self.disk_hits,
+                "ttl_seconds": self.ttl_seconds,
+                "stale_seconds": self.stale_seconds,
+                "fresh_hits": self.fresh_hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "hit_rate": round((self.fresh_hits + self.stale_hits) / lookups, 4) if lookups else 0.0,
+                "refreshes": self.refreshes,
+                "refresh_failures": self.refresh_failures,
+                "refreshing": len(self._refreshing),
+            }
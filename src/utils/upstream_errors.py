@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+import math
+from typing import Dict, Optional, Tuple
+
+import openai
+from fastapi import HTTPException
+
+from ..ai_models.upstream_scheduler import retry_after_seconds
+
+
+def upstream_error_status(exc: Exception) -> Tuple[int, Optional[float]]:
+    """(HTTP status, retry-after seconds) to report for a failed request.
+
+    OpenAI rate limits that the upstream scheduler could not absorb within
+    its retries become 429, and upstream 5xx, timeouts and connection
+    failures become 503, both with the server's retry-after when it sent
+    one; anything else is a 500.
+    """
+    if isinstance(exc, openai.APIStatusError):
+        retry_after = retry_after_seconds(exc.response) if exc.response is not None else None
+        if exc.status_code == 429:
+            return 429, retry_after
+        if exc.status_code >= 500:
+            return 503, retry_after
+    if isinstance(exc, openai.APIConnectionError):  # includes APITimeoutError
+        return 503, None
+    return 500, None
+
+
+def upstream_http_exception(exc: Exception) -> HTTPException:
+    """HTTPException for `exc` with the status from upstream_error_status and
+    a Retry-After header (whole seconds) when one is known."""
+    status, retry_after = upstream_error_status(exc)
+    headers: Optional[Dict[str, str]] = None
+    if retry_after is not None:
+        headers = {"Retry-After": str(max(1, math.ceil(retry_after)))}
+    return HTTPException(status_code=status, detail=str(exc), headers=headers)
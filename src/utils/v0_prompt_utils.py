@@ -1,7 +1,14 @@
 from __future__ import annotations
 
+import os
+import threading
+import time
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, Tuple, List
+from types import MappingProxyType
+from typing import Dict, Iterable, Mapping, Optional, Tuple, List
+
+from .guide_ranker import GuideIndex
 
 
 def get_v0_prompt_dir() -> Path:
@@ -9,7 +16,11 @@ def get_v0_prompt_dir() -> Path:
     return Path(__file__).resolve().parents[2] / "v0_prompt"
 
 
-def load_v0_prompt_files() -> Dict[str, str]:
+def get_v0_context_path() -> Path:
+    return Path(__file__).resolve().parents[2] / "v0_prompt.md"
+
+
+def _read_v0_prompt_files() -> Dict[str, str]:
     """Load all .md files in v0_prompt directory as {filename: content}."""
     prompt_dir = get_v0_prompt_dir()
     files: Dict[str, str] = {}
@@ -23,6 +34,99 @@ def load_v0_prompt_files() -> Dict[str, str]:
     return files
 
 
+def format_guides(files: Mapping[str, str], names: Iterable[str]) -> str:
+    """Concatenate guides as "FILE: name\n---\ncontent" blocks, skipping unknown names."""
+    return "\n\n".join(f"FILE: {name}\n---\n{files[name]}" for name in names if name in files)
+
+
+@dataclass(frozen=True)
+class GuideCatalog:
+    """Immutable snapshot of the v0 guides and v0_prompt.md.
+
+    Built once per change on disk; the full selection catalog, the
+    per-guide summaries and the keyword index are precomputed so requests
+    only read from it.
+    """
+
+    files: Mapping[str, str]
+    summaries: Mapping[str, str]
+    full_catalog: str
+    context: str
+    signature: Tuple
+    index: GuideIndex
+
+    def concat(self, names: Iterable[str]) -> str:
+        return format_guides(self.files, names)
+
+
+def _catalog_signature() -> Tuple:
+    # (name, mtime_ns, size) of every guide plus v0_prompt.md; any edit, add or delete changes it
+    entries = []
+    prompt_dir = get_v0_prompt_dir()
+    if prompt_dir.exists():
+        for md_file in sorted(prompt_dir.glob("*.md")):
+            try:
+                st = md_file.stat()
+            except OSError:
+                continue
+            entries.append((md_file.name, st.st_mtime_ns, st.st_size))
+    try:
+        st = get_v0_context_path().stat()
+        entries.append(("v0_prompt.md", st.st_mtime_ns, st.st_size))
+    except OSError:
+        pass
+    return tuple(entries)
+
+
+def _build_catalog(signature: Tuple) -> GuideCatalog:
+    files = _read_v0_prompt_files()
+    context_path = get_v0_context_path()
+    context = context_path.read_text(encoding="utf-8") if context_path.exists() else ""
+    summaries = {name: summarize_for_selection(name, content) for name, content in files.items()}
+    return GuideCatalog(
+        files=MappingProxyType(files),
+        summaries=MappingProxyType(summaries),
+        full_catalog=format_guides(files, files),
+        context=context,
+        signature=signature,
+        index=GuideIndex(files, summaries),
+    )
+
+
+_catalog: Optional[GuideCatalog] = None
+_catalog_checked = 0.0
+_catalog_lock = threading.Lock()
+
+
+def get_guide_catalog() -> GuideCatalog:
+    """Return the current guide catalog, reloading it when files change.
+
+    The directory is stat-polled at most every V0_CATALOG_POLL_SECONDS
+    (default 2). A reload builds a complete new snapshot and swaps the
+    reference, so readers see either the old catalog or the new one.
+    """
+    global _catalog, _catalog_checked
+    now = time.monotonic()
+    interval = float(os.environ.get("V0_CATALOG_POLL_SECONDS", "2"))
+    if _catalog is not None and now - _catalog_checked < interval:
+        return _catalog
+    with _catalog_lock:
+        if _catalog is not None and now - _catalog_checked < interval:
+            return _catalog
+        signature = _catalog_signature()
+        if _catalog is None or signature != _catalog.signature:
+            if _catalog is not None:
+                print(f"[V0_CATALOG] Guides changed on disk, reloading")
+            _catalog = _build_catalog(signature)
+        _catalog_checked = now
+        return _catalog
+
+
+def load_v0_prompt_files() -> Mapping[str, str]:
+    """All v0 guides as a read-only {filename: content} mapping."""
+    return get_guide_catalog().files
+
+
 def summarize_for_selection(filename: str, content: str, max_chars: int = 240) -> str:
     """Produce a short, human-readable one-liner summary for selection display.
 
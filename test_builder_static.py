@@ -0,0 +1,70 @@
+import gzip
+import re
+
+from fastapi.testclient import TestClient
+
+from src.main import app
+
+client = TestClient(app)
+
+
+def test_builder_page_revalidates_with_etag():
+    """/builder carries an ETag per encoding and answers If-None-Match with 304."""
+    print("=== BUILDER PAGE ETAG TEST ===")
+    page = client.get("/builder", headers={"Accept-Encoding": "identity"})
+    etag = page.headers["etag"]
+    print(f"GET /builder: {page.status_code}, ETag {etag}, Cache-Control {page.headers['cache-control']}")
+    assert page.status_code == 200 and "text/html" in page.headers["content-type"]
+    assert page.headers["cache-control"] == "no-cache" and "Accept-Encoding" in page.headers["vary"]
+    assert "cdn.jsdelivr.net" not in page.text
+
+    not_modified = client.get("/builder", headers={"Accept-Encoding": "identity", "If-None-Match": etag})
+    assert not_modified.status_code == 304 and not_modified.content == b""
+    assert not_modified.headers["etag"] == etag
+
+    zipped = client.get("/builder", headers={"Accept-Encoding": "gzip"})
+    assert zipped.headers["content-encoding"] == "gzip" and zipped.headers["etag"] != etag
+    assert zipped.text == page.text
+    stale = client.get("/builder", headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+    assert stale.status_code == 200
+    print("✅ 304 on a matching ETag; each encoding has its own ETag")
+
+
+def test_builder_assets_are_hashed_and_immutable():
+    """Assets (including the vendored marked) are linked by content hash and cached for a year."""
+    print("=== BUILDER ASSETS TEST ===")
+    page = client.get("/builder").text
+    links = re.findall(r'/builder/assets/([\w.-]+)\?v=([0-9a-f]{16})', page)
+    names = {name for name, _ in links}
+    print(f"Linked assets: {sorted(names)}")
+    assert {"builder.css", "builder.js", "marked.js"} <= names
+
+    for name, version in links:
+        raw = client.get(f"/builder/assets/{name}?v={version}", headers={"Accept-Encoding": "gzip"})
+        assert raw.status_code == 200, name
+        assert raw.headers["cache-control"] == "public, max-age=31536000, immutable"
+        assert raw.headers["etag"].startswith(f'"{version}')
+        again = client.get(
+            f"/builder/assets/{name}?v={version}",
+            headers={"Accept-Encoding": "gzip", "If-None-Match": raw.headers["etag"]},
+        )
+        assert again.status_code == 304, name
+
+    marked = client.get("/builder/assets/marked.js", headers={"Accept-Encoding": "gzip"})
+    assert marked.headers["content-type"].startswith("text/javascript")
+    assert "marked - a markdown parser" in marked.text
+    assert len(gzip.compress(marked.content)) < len(marked.content)
+    assert client.get("/builder/assets/missing.js").status_code == 404
+    print("✅ Assets content-hashed, immutable and revalidated by ETag")
+
+
+def main():
+    """Run the /builder static bundle tests."""
+    print("🚀 Testing the /builder static bundle\n")
+    test_builder_page_revalidates_with_etag()
+    test_builder_assets_are_hashed_and_immutable()
+    print("\n✅ Builder static bundle tests completed!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+import asyncio
+import os
+import tempfile
+import time
+
+os.environ.setdefault("EXTRACT_JOBS_PATH", os.path.join(tempfile.mkdtemp(prefix="handy-jobs-test-"), "jobs.sqlite3"))
+os.environ["EXTRACT_JOBS_POLL_INTERVAL"] = "0.05"
+
+from fastapi.testclient import TestClient
+
+import src.service.structured_service as structured_service
+from src.main import app
+
+
+async def _fake_extract(urls, prompt, structure, api_key, max_concurrency, timeout, bypass_cache):
+    """Stand-in for the Firecrawl fan-out: "slow" URLs never finish, "bad" ones fail."""
+    for index, url in enumerate(urls):
+        await asyncio.sleep(30 if url == "slow" else 0.02)
+        error = "Timed out" if url == "bad" else None
+        yield {"index": index, "url": url, "data": None if error else {"title": url}, "error": error, "cache": None}
+
+
+structured_service.astream_extract_with_firecrawl = _fake_extract
+
+BODY = {"urls": ["https://a.example", "bad", "https://c.example"], "prompt": "Get the title", "structure": {"title": "str"}}
+
+
+def _events(client, path, headers=None):
+    """(event, id, data) triples of an SSE stream."""
+    events, current = [], {}
+    with client.stream("GET", path, headers=headers or {}) as stream:
+        for line in stream.iter_lines():
+            if not line:
+                if "event" in current:
+                    events.append((current["event"], current.get("id"), current.get("data")))
+                current = {}
+            elif not line.startswith(":"):
+                field, _, value = line.partition(": ")
+                current[field] = value
+    return events
+
+
+def test_submit_poll_and_follow():
+    """A job returns 202 at once; polling and SSE both see every result."""
+    print("=== EXTRACT JOB SUBMIT/FOLLOW TEST ===")
+    with TestClient(app) as client:
+        submitted = client.post("/extract/jobs", json=BODY)
+        job = submitted.json()
+        print(f"POST /extract/jobs: {submitted.status_code}, Location {submitted.headers['location']}")
+        assert submitted.status_code == 202 and job["status"] in ("queued", "running")
+        assert submitted.headers["location"] == f"/extract/jobs/{job['id']}"
+
+        events = _events(client, f"/extract/jobs/{job['id']}/events")
+        names = [name for name, _, _ in events]
+        print(f"SSE events: {names}")
+        assert names.count("result") == 3 and names[-1] == "done"
+        assert [event_id for name, event_id, _ in events if name == "result"] == ["1", "2", "3"]
+
+        resumed = _events(client, f"/extract/jobs/{job['id']}/events", headers={"Last-Event-ID": "2"})
+        assert [event_id for name, event_id, _ in resumed if name == "result"] == ["3"]
+
+        polled = client.get(f"/extract/jobs/{job['id']}?since=1").json()
+        print(f"Poll: {polled['status']}, {polled['succeeded']} ok / {polled['failed']} failed, next={polled['next']}")
+        assert polled["status"] == "completed" and polled["succeeded"] == 2 and polled["failed"] == 1
+        assert [item["seq"] for item in polled["results"]] == [2, 3] and polled["next"] == 3
+
+        assert client.get("/extract/jobs/unknown").status_code == 404
+    print("✅ Job ran in the background; poll and SSE (with resume) saw every result")
+
+
+def test_cancel():
+    """DELETE cancels a running job once and leaves finished jobs alone."""
+    print("=== EXTRACT JOB CANCEL TEST ===")
+    with TestClient(app) as client:
+        job = client.post("/extract/jobs", json={**BODY, "urls": ["https://a.example", "slow"]}).json()
+        deadline = time.monotonic() + 5
+        while client.get(f"/extract/jobs/{job['id']}").json()["completed"] < 1:
+            assert time.monotonic() < deadline
+            time.sleep(0.02)
+
+        cancelled = client.delete(f"/extract/jobs/{job['id']}").json()
+        print(f"DELETE: {cancelled['status']} after {cancelled['completed']} result(s)")
+        assert cancelled["status"] == "cancelled" and cancelled["completed"] == 1
+        finished_at = cancelled["finished_at"]
+
+        again = client.delete(f"/extract/jobs/{job['id']}").json()
+        assert again["status"] == "cancelled" and again["finished_at"] == finished_at
+        assert client.delete("/extract/jobs/unknown").status_code == 404
+        assert client.get("/metrics").json()["extract_jobs"]["running_here"] == 0
+    print("✅ Cancelled once; repeat DELETE returns the job unchanged")
+
+
+def main():
+    """Run the extract job tests (Firecrawl is stubbed)."""
+    print("🚀 Testing /extract/jobs\n")
+    test_submit_poll_and_follow()
+    test_cancel()
+    print("\n✅ Extract job tests completed!")
+
+
+if __name__ == "__main__":
+    main()
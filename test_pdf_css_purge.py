@@ -0,0 +1,99 @@
+import tempfile
+from pathlib import Path
+
+from src.utils.pdf_utils import (
+    collect_html_class_names,
+    get_assets_dir,
+    get_purge_cache_info,
+    inline_purged_local_stylesheets,
+    purge_stylesheet,
+)
+from src.service.pdf_service import prepare_render
+
+_CSS = """
+/* comment */
+@charset "utf-8";
+h1{margin:0}
+.used{color:red}
+.unused{color:blue}
+.used.also{color:green}
+.used.missing{color:black}
+.other, .used > p{padding:1px}
+.sm\\:p-4{padding:1rem}
+@media (min-width: 640px){.used{margin:1px}.unused{margin:2px}}
+@media print{.unused{display:none}}
+@font-face{font-family:x;src:url(x.woff)}
+"""
+
+
+def test_purge_keeps_used_selectors():
+    """Rules that can match the document's classes survive, the rest go."""
+    print("=== CSS PURGE TEST ===")
+    used = collect_html_class_names('<div class="used also"><p class="sm:p-4">x</p></div>')
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "style.css"
+        path.write_text(_CSS, encoding="utf-8")
+        purged = purge_stylesheet(path, used)
+    print(f"Purged stylesheet: {purged}")
+
+    for kept in ("h1{", ".used{color:red}", ".used.also{", ".other, .used > p{", ".sm\\:p-4{",
+                 "@media (min-width: 640px){.used{margin:1px}}", "@font-face{", '@charset "utf-8";'):
+        assert kept in purged, kept
+    for dropped in (".unused", ".used.missing", "@media print", "comment"):
+        assert dropped not in purged, dropped
+    print("✅ Used selectors kept, unused ones dropped")
+
+
+def test_inlined_tailwind_keeps_used_utilities():
+    """Linked local Tailwind is inlined with only the utilities the page uses."""
+    print("=== TAILWIND INLINE PURGE TEST ===")
+    html = (
+        '<html><head><link rel="stylesheet" href="/assets/tailwind.min.css"></head>'
+        '<body><div class="p-4 flex text-sm">x</div></body></html>'
+    )
+    before = get_purge_cache_info()
+    out = inline_purged_local_stylesheets(html)
+    again = inline_purged_local_stylesheets(html)
+    full = (get_assets_dir() / "tailwind.min.css").stat().st_size
+    print(f"Inlined {len(out)} bytes (stylesheet is {full} bytes)")
+
+    assert "<link" not in out and "<style>" in out
+    assert ".p-4{" in out and ".flex{" in out and ".text-sm{" in out
+    assert ".p-8{" not in out and ".text-xl{" not in out
+    assert len(out) < full // 10
+    assert again == out and get_purge_cache_info()["hits"] > before["hits"]
+    print("✅ Only used utilities inlined; repeat render served from the purge cache")
+
+
+def test_purge_opt_out_and_safelist():
+    """Unquoted classes are seen; safelisted classes survive; purge_css=False keeps the link."""
+    print("=== CSS PURGE OPT-OUT TEST ===")
+    html = (
+        '<html><head><link rel="stylesheet" href="/assets/tailwind.min.css"></head>'
+        '<body><div class=flex>x</div><script>el.classList.add("text-xl")</script></body></html>'
+    )
+    assert collect_html_class_names(html) == {"flex"}
+
+    purged = prepare_render(html, purge_css=True).html
+    assert ".flex{" in purged and ".text-xl{" not in purged
+    kept = prepare_render(html, purge_css=True, safelist=["text-xl"]).html
+    assert ".flex{" in kept and ".text-xl{" in kept
+    print("✅ Safelisted class added by a script survives the purge")
+
+    full = prepare_render(html, purge_css=False)
+    assert "<style>" not in full.html and 'href="file:///app/assets/tailwind.min.css"' in full.html
+    assert full.key != prepare_render(html, purge_css=True).key
+    print("✅ purge_css=False links the full stylesheet")
+
+
+def main():
+    """Run the CSS purge tests (no wkhtmltopdf needed)."""
+    print("🚀 Testing PDF CSS purging\n")
+    test_purge_keeps_used_selectors()
+    test_inlined_tailwind_keeps_used_utilities()
+    test_purge_opt_out_and_safelist()
+    print("\n✅ CSS purge tests completed!")
+
+
+if __name__ == "__main__":
+    main()
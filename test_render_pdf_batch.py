@@ -0,0 +1,119 @@
+import io
+import json
+import os
+import tempfile
+import threading
+import time
+import zipfile
+from contextlib import contextmanager
+
+os.environ.setdefault("PDF_CACHE_DIR", tempfile.mkdtemp(prefix="handy-pdf-test-"))
+
+from fastapi.testclient import TestClient
+
+import src.service.pdf_service as pdf_service
+from src.main import app
+
+release = threading.Event()
+release.set()
+
+
+def _fake_render(prepared, output_path):
+    """Stand-in for wkhtmltopdf; HTML containing FAIL raises, SLOW waits for `release`."""
+    if "FAIL" in prepared.html:
+        raise RuntimeError("wkhtmltopdf exited with code 1")
+    if "SLOW" in prepared.html:
+        release.wait(5)
+    output_path.write_bytes(b"%PDF-1.4\n% " + prepared.key.encode("ascii") + b"\n%%EOF\n")
+    return output_path
+
+
+@contextmanager
+def _stubbed_renderer():
+    # Installed per test: other test modules stub the same renderer at import time
+    original = pdf_service.render_prepared_to_file
+    pdf_service.render_prepared_to_file = _fake_render
+    try:
+        yield
+    finally:
+        pdf_service.render_prepared_to_file = original
+
+
+client = TestClient(app)
+
+
+def test_render_pdf_batch_zip():
+    """The ZIP holds one PDF per document, de-duplicated names, an error entry and a manifest."""
+    print("=== RENDER PDF BATCH TEST ===")
+    documents = [
+        {"name": "invoice", "html": "<html><body>Invoice 1</body></html>"},
+        {"name": "reports/invoice.pdf", "html": "<html><body>Invoice 2</body></html>"},
+        {"html": "<html><body>FAIL</body></html>"},
+        {"name": "summary.pdf", "html": "<html><body>Summary</body></html>"},
+    ]
+    with _stubbed_renderer():
+        response = client.post("/render-pdf/batch", json={"documents": documents, "max_workers": 2})
+    assert response.status_code == 200 and response.headers["content-type"] == "application/zip"
+
+    with zipfile.ZipFile(io.BytesIO(response.content)) as archive:
+        names = set(archive.namelist())
+        print(f"ZIP entries: {sorted(names)}")
+        assert names == {"invoice.pdf", "2-invoice.pdf", "document-3.pdf.error.txt", "summary.pdf", "manifest.json"}
+        for name in ("invoice.pdf", "2-invoice.pdf", "summary.pdf"):
+            assert archive.read(name).startswith(b"%PDF")
+        assert archive.read("invoice.pdf") != archive.read("2-invoice.pdf")
+        print("✅ Duplicate names get an index prefix")
+
+        assert b"wkhtmltopdf exited with code 1" in archive.read("document-3.pdf.error.txt")
+        print("✅ Failed render written as .error.txt without aborting the batch")
+
+        manifest = json.loads(archive.read("manifest.json"))["documents"]
+    assert [entry["index"] for entry in manifest] == [0, 1, 2, 3]
+    assert [entry["name"] for entry in manifest] == ["invoice.pdf", "2-invoice.pdf", "document-3.pdf", "summary.pdf"]
+    assert [entry["success"] for entry in manifest] == [True, True, False, True]
+    assert "wkhtmltopdf exited" in manifest[2]["error"] and manifest[0]["error"] is None
+    print("✅ Manifest lists every document in request order")
+
+
+def test_render_pdf_batch_abandoned():
+    """Handles of renders that finish after the client went away are closed."""
+    print("=== RENDER PDF BATCH ABANDON TEST ===")
+    handles = []
+    original_open = pdf_service.open_cached_render
+
+    def _recording_open(prepared):
+        handle = original_open(prepared)
+        handles.append(handle)
+        return handle
+
+    pdf_service.open_cached_render = _recording_open
+    release.clear()
+    try:
+        with _stubbed_renderer():
+            stream = pdf_service.iter_batch_pdf_zip(
+                [("fast", "<html><body>Fast</body></html>"), ("slow", "<html><body>SLOW</body></html>")], max_workers=2
+            )
+            next(stream)
+            stream.close()
+            release.set()
+            for _ in range(50):
+                if len(handles) == 2 and all(handle.closed for handle in handles):
+                    break
+                time.sleep(0.05)
+    finally:
+        pdf_service.open_cached_render = original_open
+        release.set()
+    assert len(handles) == 2 and all(handle.closed for handle in handles), handles
+    print("✅ Late render's handle closed after the stream was abandoned")
+
+
+def main():
+    """Run the batch render tests (wkhtmltopdf is stubbed)."""
+    print("🚀 Testing /render-pdf/batch\n")
+    test_render_pdf_batch_zip()
+    test_render_pdf_batch_abandoned()
+    print("\n✅ Render PDF batch tests completed!")
+
+
+if __name__ == "__main__":
+    main()
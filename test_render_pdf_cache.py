@@ -0,0 +1,63 @@
+import os
+import tempfile
+
+os.environ.setdefault("PDF_CACHE_DIR", tempfile.mkdtemp(prefix="handy-pdf-test-"))
+
+from fastapi.testclient import TestClient
+
+import src.service.pdf_service as pdf_service
+from src.main import app
+
+renders = []
+
+
+def _fake_render(prepared, output_path):
+    """Stand-in for wkhtmltopdf: a tiny PDF that embeds the render key."""
+    renders.append(prepared.key)
+    output_path.write_bytes(b"%PDF-1.4\n% " + prepared.key.encode("ascii") + b"\n%%EOF\n")
+    return output_path
+
+
+pdf_service.render_prepared_to_file = _fake_render
+client = TestClient(app)
+
+
+def test_render_pdf_etag_and_cache():
+    """Identical HTML is rendered once, and a matching If-None-Match gets 304."""
+    print("=== RENDER PDF ETAG TEST ===")
+    html = "<html><body><h1>Invoice 42</h1></body></html>"
+    renders.clear()
+
+    first = client.post("/render-pdf", json={"html": html})
+    etag = first.headers["etag"]
+    print(f"First render: {first.status_code}, ETag {etag}, {len(first.content)} bytes")
+    assert first.status_code == 200 and first.headers["content-type"] == "application/pdf"
+    assert first.content.startswith(b"%PDF") and first.headers["content-length"] == str(len(first.content))
+
+    second = client.post("/render-pdf", json={"html": html})
+    assert second.status_code == 200 and second.content == first.content and second.headers["etag"] == etag
+    assert len(renders) == 1
+    print("✅ Second request served from the render cache")
+
+    for header in (etag, f"W/{etag}", f'"other", {etag}', "*"):
+        not_modified = client.post("/render-pdf", json={"html": html}, headers={"If-None-Match": header})
+        assert not_modified.status_code == 304 and not_modified.content == b"", header
+        assert not_modified.headers["etag"] == etag
+    assert len(renders) == 1
+    print("✅ If-None-Match answered with 304 without rendering")
+
+    changed = client.post("/render-pdf", json={"html": html.replace("42", "43")}, headers={"If-None-Match": etag})
+    assert changed.status_code == 200 and changed.headers["etag"] != etag
+    assert len(renders) == 2
+    print("✅ Changed HTML gets a new ETag and a fresh render")
+
+
+def main():
+    """Run the render-pdf caching test (wkhtmltopdf is stubbed)."""
+    print("🚀 Testing /render-pdf ETag caching\n")
+    test_render_pdf_etag_and_cache()
+    print("\n✅ Render PDF cache test completed!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+from src.service.schema_generation_service import _apply_app_uuid, _extract_table_names
+
+APP_UUID = "abcd1234"
+
+
+def test_placeholder_substitution_is_case_insensitive():
+    """Any spelling of the placeholder becomes the app UUID."""
+    print("=== UUID PLACEHOLDER TEST ===")
+    sql = _apply_app_uuid("CREATE TABLE users_appuuid (id SERIAL PRIMARY KEY);\nCREATE TABLE posts_APPUUID (id SERIAL);", APP_UUID)
+    print(sql)
+    assert _extract_table_names(sql, APP_UUID) == ["users_abcd1234", "posts_abcd1234"]
+    print("✅ Placeholder replaced regardless of case")
+
+
+def test_missing_suffix_is_added_only_to_names():
+    """Unsuffixed tables and indexes are renamed; keywords, columns and strings are not."""
+    print("=== UUID SUFFIX ENFORCEMENT TEST ===")
+    sql = """CREATE TABLE users_APPUUID (id SERIAL PRIMARY KEY, name VARCHAR(100));
+CREATE TABLE posts (
+    id SERIAL PRIMARY KEY,
+    user_id INTEGER REFERENCES users_APPUUID(id) ON DELETE CASCADE,
+    posts INTEGER DEFAULT 0,
+    body TEXT
+);
+CREATE TABLE IF NOT EXISTS tags_APPUUID_2 (id SERIAL PRIMARY KEY, post_id INTEGER REFERENCES posts(id));
+CREATE INDEX ON posts_APPUUID(user_id);
+CREATE INDEX idx_users_APPUUID_name ON users_APPUUID(name);
+CREATE UNIQUE INDEX posts_idx ON posts(user_id);
+INSERT INTO posts (user_id, posts, body) VALUES (1, 3, 'posts are great');
+INSERT INTO tags_APPUUID_2 (post_id) VALUES (1);"""
+    out = _apply_app_uuid(sql, APP_UUID)
+    print(out)
+
+    assert "ON DELETE CASCADE" in out and "CREATE INDEX ON posts" in out
+    assert "ON_" not in out
+    assert "CREATE TABLE posts_abcd1234 (" in out
+    assert "    posts INTEGER DEFAULT 0," in out
+    assert "INSERT INTO posts_abcd1234 (user_id, posts, body)" in out
+    assert "'posts are great'" in out
+    assert "REFERENCES posts_abcd1234(id)" in out
+    assert "CREATE TABLE IF NOT EXISTS tags_2_abcd1234 (" in out and "INSERT INTO tags_2_abcd1234 " in out
+    assert "CREATE INDEX idx_users_name_abcd1234 ON users_abcd1234(name)" in out
+    assert "CREATE UNIQUE INDEX posts_idx_abcd1234 ON posts_abcd1234(user_id)" in out
+    assert _extract_table_names(out, APP_UUID) == ["users_abcd1234", "posts_abcd1234", "tags_2_abcd1234"]
+    print("✅ Names suffixed; ON DELETE, unnamed indexes, columns and strings untouched")
+
+
+def main():
+    """Run the app UUID suffix tests (no API key needed)."""
+    print("🚀 Testing app UUID suffix enforcement\n")
+    test_placeholder_substitution_is_case_insensitive()
+    test_missing_suffix_is_added_only_to_names()
+    print("\n✅ UUID suffix tests completed!")
+
+
+if __name__ == "__main__":
+    main()
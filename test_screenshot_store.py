@@ -0,0 +1,81 @@
+import base64
+import hashlib
+import os
+import tempfile
+
+os.environ.setdefault("FIRECRAWL_SCREENSHOT_DIR", tempfile.mkdtemp(prefix="handy-screenshots-test-"))
+os.environ.pop("FIRECRAWL_CACHE_ENABLED", None)
+
+from fastapi.testclient import TestClient
+
+import src.service.structured_service as structured_service
+from src.main import app
+from src.service.screenshot_store import get_screenshot_store
+
+PNG = b"\x89PNG\r\n\x1a\n" + bytes(range(256)) * 4
+calls = []
+
+
+async def _fake_screenshot(url, options=None):
+    """Stand-in for Firecrawl's scrape: an inline base64 screenshot."""
+    calls.append(url)
+    return {"success": True, "data": {"screenshot": "data:image/png;base64," + base64.b64encode(PNG).decode("ascii")}}
+
+
+structured_service.ascreenshot_with_firecrawl = _fake_screenshot
+
+
+def test_screenshot_url_delivery_and_etag():
+    """delivery="url" stores the image once; GET /screenshot/{sha256} serves it with ETag/304 and ranges, 404 once evicted."""
+    print("=== SCREENSHOT STORE ETAG TEST ===")
+    digest = hashlib.sha256(PNG).hexdigest()
+    with TestClient(app) as client:
+        inline = client.post("/screenshot", json={"url": "https://example.com"}).json()
+        assert inline["data"]["screenshot"].startswith("data:image/png;base64,")
+
+        referenced = client.post("/screenshot", json={"url": "https://example.com", "delivery": "url"}).json()
+        print(f"delivery=url response: {referenced['data']}")
+        assert referenced["data"]["screenshot_url"] == f"/screenshot/{digest}"
+        assert referenced["data"]["screenshot_sha256"] == digest
+        assert referenced["data"]["screenshot_bytes"] == len(PNG)
+        assert "screenshot" not in referenced["data"]
+
+        image = client.get(f"/screenshot/{digest}")
+        etag = image.headers["etag"]
+        print(f"GET image: {image.status_code}, {image.headers['content-type']}, ETag {etag}")
+        assert image.status_code == 200 and image.content == PNG
+        assert image.headers["content-type"] == "image/png" and etag == f'"{digest}"'
+        assert image.headers["cache-control"] == "public, max-age=31536000, immutable"
+
+        for header in (etag, f"W/{etag}", f'"nope", {etag}'):
+            not_modified = client.get(f"/screenshot/{digest}", headers={"If-None-Match": header})
+            assert not_modified.status_code == 304 and not_modified.content == b"", header
+        assert client.get(f"/screenshot/{digest}", headers={"If-None-Match": '"nope"'}).status_code == 200
+
+        partial = client.get(f"/screenshot/{digest}", headers={"Range": "bytes=0-7"})
+        assert partial.status_code == 206 and partial.content == PNG[:8]
+        assert partial.headers["content-range"] == f"bytes 0-7/{len(PNG)}"
+        tail = client.get(f"/screenshot/{digest}", headers={"Range": "bytes=-4"})
+        assert tail.status_code == 206 and tail.content == PNG[-4:]
+        assert client.get(f"/screenshot/{digest}", headers={"Range": f"bytes={len(PNG)}-"}).status_code == 416
+        stale_range = client.get(f"/screenshot/{digest}", headers={"Range": "bytes=0-7", "If-Range": '"old"'})
+        assert stale_range.status_code == 200 and stale_range.content == PNG
+
+        assert client.get(f"/screenshot/{'0' * 64}").status_code == 404
+        assert client.get("/screenshot/not-a-digest").status_code == 404
+
+        # Blob evicted (file gone) after the response that referenced it was sent
+        get_screenshot_store().blobs.get(digest).unlink()
+        assert client.get(f"/screenshot/{digest}").status_code == 404
+    print("✅ Image stored once, served with a strong ETag, 304 and range support")
+
+
+def main():
+    """Run the screenshot store test (Firecrawl is stubbed)."""
+    print("🚀 Testing the screenshot blob store\n")
+    test_screenshot_url_delivery_and_etag()
+    print("\n✅ Screenshot store test completed!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+import asyncio
+import time
+
+import httpx
+
+from src.ai_models.upstream_scheduler import (
+    PRIORITY_BATCH,
+    PRIORITY_INTERACTIVE,
+    ScheduledAsyncTransport,
+    ScheduledTransport,
+    UpstreamScheduler,
+    upstream_priority,
+)
+
+
+def _scheduler() -> UpstreamScheduler:
+    scheduler = UpstreamScheduler()
+    scheduler.max_retries = 3
+    scheduler.backoff_base = 0.001
+    return scheduler
+
+
+def _request() -> httpx.Request:
+    return httpx.Request("POST", "https://api.openai.com/v1/chat/completions", json={"model": "gpt-4o-mini"})
+
+
+def _responses(*statuses, headers=None):
+    """Mock transport answering with `statuses` in turn (the last one repeats)."""
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        status = statuses[min(len(calls), len(statuses) - 1)]
+        calls.append(time.monotonic())
+        return httpx.Response(status, headers=headers if status != 200 else None, json={})
+
+    return httpx.MockTransport(handler), calls
+
+
+def test_interactive_requests_jump_the_batch_queue():
+    """Queued interactive calls are granted before earlier batch calls."""
+    print("=== SCHEDULER PRIORITY TEST ===")
+
+    async def run():
+        scheduler = _scheduler()
+        budget = scheduler._budget("m")
+        budget.rpm, budget.requests = 1200, 0  # empty bucket, one request every 50ms
+        order = []
+
+        async def call(name, priority):
+            with upstream_priority(priority):
+                await scheduler.acquire("m", 0)
+            order.append(name)
+
+        tasks = [asyncio.create_task(call("batch-1", PRIORITY_BATCH)), asyncio.create_task(call("batch-2", PRIORITY_BATCH))]
+        await asyncio.sleep(0)
+        tasks.append(asyncio.create_task(call("interactive", PRIORITY_INTERACTIVE)))
+        await asyncio.gather(*tasks)
+        return order, scheduler.stats()
+
+    order, stats = asyncio.run(run())
+    print(f"Grant order: {order}")
+    assert order == ["interactive", "batch-1", "batch-2"]
+    assert stats["queued"] == 3 and stats["queue_depth"] == 0
+    print("✅ Interactive request served first")
+
+
+def test_server_errors_are_retried_with_backoff():
+    """5xx responses are retried until success, up to max_retries."""
+    print("=== SCHEDULER RETRY TEST ===")
+    scheduler = _scheduler()
+    inner, calls = _responses(500, 503, 200)
+    response = asyncio.run(ScheduledAsyncTransport(inner, scheduler).handle_async_request(_request()))
+    print(f"Attempts: {len(calls)}, final status: {response.status_code}")
+    assert response.status_code == 200 and len(calls) == 3
+    assert scheduler.stats()["server_errors"] == 2 and scheduler.stats()["retries"] == 2
+
+    inner, calls = _responses(500)
+    response = asyncio.run(ScheduledAsyncTransport(inner, scheduler).handle_async_request(_request()))
+    print(f"Always failing: {len(calls)} attempts, final status: {response.status_code}")
+    assert response.status_code == 500 and len(calls) == scheduler.max_retries + 1
+    print("✅ Retries stop at max_retries")
+
+
+def test_retry_after_is_honoured():
+    """A 429 waits for the server's retry-after before the next attempt."""
+    print("=== SCHEDULER RETRY-AFTER TEST ===")
+    scheduler = _scheduler()
+    inner, calls = _responses(429, 200, headers={"retry-after-ms": "200"})
+    response = asyncio.run(ScheduledAsyncTransport(inner, scheduler).handle_async_request(_request()))
+    gap = calls[1] - calls[0]
+    print(f"Async retry after {gap:.3f}s")
+    assert response.status_code == 200 and gap >= 0.2
+    assert scheduler.stats()["rate_limited"] == 1
+
+    inner, calls = _responses(429, 200, headers={"retry-after": "0.2"})
+    response = ScheduledTransport(inner, scheduler).handle_request(_request())
+    gap = calls[1] - calls[0]
+    print(f"Sync retry after {gap:.3f}s")
+    assert response.status_code == 200 and gap >= 0.2
+
+    scheduler.backoff_max = 0.05
+    assert scheduler.backoff(0, httpx.Response(429, headers={"retry-after": "30"})) == 0.05
+    print("✅ retry-after honoured and capped at OPENAI_BACKOFF_MAX")
+
+
+def main():
+    """Run the upstream scheduler tests (no network or API key needed)."""
+    print("🚀 Testing the OpenAI upstream scheduler\n")
+    test_interactive_requests_jump_the_batch_queue()
+    test_server_errors_are_retried_with_backoff()
+    test_retry_after_is_honoured()
+    print("\n✅ Upstream scheduler tests completed!")
+
+
+if __name__ == "__main__":
+    main()